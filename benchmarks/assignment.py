@@ -0,0 +1,96 @@
+import random
+import time
+
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.elevator_floor_index import ElevatorFloorIndex
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.strategies.assignment import ClosestEmptyStrategy, DirectionalStrategy, ExistingStopStrategy, \
+    MinCostBatchStrategy, VectorizedDirectionalStrategy, VectorizedExistingStopStrategy
+
+
+def busy_fleet(n_elevators: int, n_floors: int, rnd: random.Random):
+    # a fleet of elevators part-way through serving a few passengers each.
+    elevators = [Elevator(num_floors=n_floors, max_capacity=10, stop_time=1) for _ in range(n_elevators)]
+    for e in elevators:
+        e.current_floor = rnd.randint(1, n_floors)
+        for _ in range(rnd.randint(0, 4)):
+            source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+            e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+        for _ in range(rnd.randint(0, n_floors // 2)):
+            e.move()
+    return elevators
+
+
+def assignments_per_second(strategy, elevators, passengers) -> float:
+    # assigns the passengers who arrive during a time-step, as the controller does after the elevators moved.
+    elevators = [e.copy() for e in elevators]
+    elevators_moved = getattr(strategy, "elevators_moved", None)
+    start = time.perf_counter()
+    if elevators_moved is not None:
+        elevators_moved()
+    for passenger in passengers:
+        elevator_index = strategy.assign_elevator(passenger, elevators)
+        if elevator_index is not None:
+            elevators[elevator_index].assign(passenger)
+    return len(passengers) / (time.perf_counter() - start)
+
+
+def indexed_assignments_per_second(strategy, elevators, passengers) -> float:
+    # assigns the passengers with an index of the elevators by floor, kept up to date as the controller does.
+    elevators = [e.copy() for e in elevators]
+    index = ElevatorFloorIndex(elevators)
+    strategy.use_elevator_floor_index(index)
+    start = time.perf_counter()
+    for passenger in passengers:
+        elevator_index = strategy.assign_elevator(passenger, elevators)
+        if elevator_index is not None:
+            elevators[elevator_index].assign(passenger)
+            index.update(elevator_index)
+    return len(passengers) / (time.perf_counter() - start)
+
+
+def batch_assignments_per_second(strategy, elevators, passengers) -> float:
+    elevators = [e.copy() for e in elevators]
+    start = time.perf_counter()
+    strategy.elevators_moved()
+    for passenger, elevator_index in zip(passengers, strategy.assign_batch(passengers, elevators)):
+        if elevator_index is not None:
+            elevators[elevator_index].assign(passenger)
+    return len(passengers) / (time.perf_counter() - start)
+
+
+def main():
+    rnd = random.Random(0)
+    n_floors = 100
+    passengers = [Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+                  for source_floor, destination_floor in (rnd.sample(range(1, n_floors + 1), 2) for _ in range(200))]
+    for n_elevators in [10, 100, 1000, 5000]:
+        elevators = busy_fleet(n_elevators, n_floors, rnd)
+        for strategy, vectorized_strategy in [(DirectionalStrategy(), VectorizedDirectionalStrategy()),
+                                              (ExistingStopStrategy(), VectorizedExistingStopStrategy())]:
+            looping = assignments_per_second(strategy, elevators, passengers)
+            vectorized = assignments_per_second(vectorized_strategy, elevators, passengers)
+            print(f"{n_elevators} elevators, {type(strategy).__name__}: {looping:,.0f} assignments/s looping, "
+                  f"{vectorized:,.0f} assignments/s vectorized")
+
+    for n_elevators in [10, 100, 1000, 5000]:
+        elevators = busy_fleet(n_elevators, n_floors, rnd)
+        for strategy_type in [ClosestEmptyStrategy, DirectionalStrategy]:
+            looping = assignments_per_second(strategy_type(), elevators, passengers)
+            indexed = indexed_assignments_per_second(strategy_type(), elevators, passengers)
+            print(f"{n_elevators} elevators, {strategy_type.__name__}: {looping:,.0f} assignments/s looping, "
+                  f"{indexed:,.0f} assignments/s with an elevator floor index")
+
+    # a burst of lobby calls, with a few calls from other floors.
+    for n_elevators in [10, 100, 1000]:
+        elevators = busy_fleet(n_elevators, n_floors, rnd)
+        burst = [Passenger(id="", source_floor=1 if rnd.random() < 0.9 else rnd.randint(2, n_floors),
+                           destination_floor=rnd.randint(2, n_floors), request_time=0) for _ in range(2 * n_elevators)]
+        sequential = assignments_per_second(ExistingStopStrategy(), elevators, burst)
+        batch = batch_assignments_per_second(MinCostBatchStrategy(), elevators, burst)
+        print(f"{n_elevators} elevators, burst of {len(burst)} calls: {sequential:,.0f} assignments/s with "
+              f"ExistingStopStrategy, {batch:,.0f} assignments/s with MinCostBatchStrategy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import logging
+import time
+
+import numpy as np
+
+from elevator_system_design.batched_controller import BatchedElevatorController
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+def main():
+    n_buildings = 1000
+    n_floors = 60
+    n_elevators = 3
+    max_elevator_capacity = 5
+    logger.setLevel(logging.WARNING)
+    np.random.seed(1231235)
+    passenger_requests = [
+        list(random_uniform_floor_selection_passenger_provider(n=5, p=0.05, n_steps=300, n_floors=n_floors))
+        for _ in range(n_buildings)
+    ]
+
+    start = time.perf_counter()
+    mean_total_times = []
+    for requests in passenger_requests:
+        elevator_system = ElevatorController(
+            n_elevators=n_elevators,
+            n_floors=n_floors,
+            max_elevator_capacity=max_elevator_capacity,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=DirectionalStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=0
+        )
+        elevator_system.handle_passenger_requests(passenger_request_source=iter(requests))
+        mean_total_times.append(elevator_system.total_time_summary.mean())
+    looped = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched_system = BatchedElevatorController(
+        n_buildings=n_buildings,
+        n_elevators=n_elevators,
+        n_floors=n_floors,
+        max_elevator_capacity=max_elevator_capacity,
+        stop_time=0
+    )
+    batched_system.handle_passenger_requests([iter(requests) for requests in passenger_requests])
+    batched = time.perf_counter() - start
+
+    # the two controllers simulate different elevator models, so this compares how many passengers each one simulates per
+    # second over the same requests, not the time to compute the same results.
+    n_passengers = sum(len(batch) for requests in passenger_requests for batch in requests)
+    batched_mean_total_times = [summary.mean() for summary in batched_system.total_time_summaries()]
+    print(f"{n_buildings} buildings, {n_passengers:,} passengers")
+    print(f"ElevatorController model, looped per building: {n_passengers / looped:,.0f} passengers/s "
+          f"(mean total time {np.mean(mean_total_times):.2f})")
+    print(f"BatchedElevatorController model: {n_passengers / batched:,.0f} passengers/s "
+          f"(mean total time {np.mean(batched_mean_total_times):.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import logging
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+import elevator_system_design.elevator_controller
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.elevator import _DIRECTIONS, Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+# measured with this benchmark on the tree just before and just after `Elevator` was slotted and given an int direction,
+# on the same machine: bytes per elevator, elevator ticks/s and controller ticks/s.
+REFERENCE = {"bytes": (1639, 1255), "move": (203_000, 363_000), "controller": (221, 445)}
+
+
+def _get_direction(self) -> int:
+    return self.direction_enum.value
+
+
+def _set_direction(self, direction: int):
+    self.direction_enum = _DIRECTIONS[direction]
+
+
+# an elevator with the same methods as `Elevator`, as it used to be: its state in an attribute dict rather than slots, and
+# its direction stored as a `Direction`, whose value is looked up wherever the elevator now reads the integer. It only
+# approximates the old class, whose attribute dicts took more memory, so the reference is printed too.
+UnslottedEnumElevator = type("UnslottedEnumElevator", (), {
+    **{k: v for k, v in Elevator.__dict__.items() if k not in Elevator.__slots__ + ("__slots__", "__dict__", "__weakref__")},
+    "direction_enum": Direction.IDLE,
+    "_direction": property(_get_direction, _set_direction),
+})
+
+
+@contextmanager
+def controller_elevator_type(elevator_type):
+    # the controller creates its elevators itself.
+    elevator_system_design.elevator_controller.Elevator = elevator_type
+    try:
+        yield
+    finally:
+        elevator_system_design.elevator_controller.Elevator = Elevator
+
+
+def bytes_per_elevator(elevator_type, n: int, n_floors: int) -> float:
+    rnd = random.Random(0)
+    tracemalloc.start()
+    elevators = [elevator_type(num_floors=n_floors, max_capacity=10) for _ in range(n)]
+    for e in elevators:
+        source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+        e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del elevators
+    return size / n
+
+
+def elevator_ticks_per_second(elevator_type, n: int, n_floors: int, n_ticks: int) -> float:
+    # a fleet of elevators moving on their own, each given a new passenger whenever it becomes empty.
+    rnd = random.Random(0)
+    elevators = [elevator_type(num_floors=n_floors, max_capacity=10, stop_time=1) for _ in range(n)]
+    start = time.perf_counter()
+    for _ in range(n_ticks):
+        for e in elevators:
+            if e.is_empty():
+                source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+                e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor,
+                                   request_time=0))
+            e.move()
+    return n * n_ticks / (time.perf_counter() - start)
+
+
+def controller_ticks_per_second(elevator_type, n_elevators: int, n_floors: int) -> float:
+    with controller_elevator_type(elevator_type):
+        controller = ElevatorController(
+            n_elevators=n_elevators,
+            n_floors=n_floors,
+            max_elevator_capacity=10,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=ExistingStopStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1
+        )
+    np.random.seed(0)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=40, p=0.5, n_steps=300,
+                                                                                 n_floors=n_floors))
+    start = time.perf_counter()
+    controller.handle_passenger_requests(iter(passenger_requests))
+    return controller.time / (time.perf_counter() - start)
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    before, after = UnslottedEnumElevator, Elevator
+    print(f"Elevator: {bytes_per_elevator(before, 10_000, 100):.0f} bytes/elevator unslotted with an enum direction, "
+          f"{bytes_per_elevator(after, 10_000, 100):.0f} slotted with an int direction, with one assigned passenger "
+          f"(reference: {REFERENCE['bytes'][0]} -> {REFERENCE['bytes'][1]})")
+    # the runs alternate, so that both see the same machine load.
+    move = {before: [], after: []}
+    controller = {before: [], after: []}
+    for _ in range(3):
+        for elevator_type in [before, after]:
+            move[elevator_type].append(elevator_ticks_per_second(elevator_type, 1_000, 100, 200))
+            controller[elevator_type].append(controller_ticks_per_second(elevator_type, 100, 60))
+    print(f"Elevator.move: {np.median(move[before]):,.0f} elevator ticks/s unslotted with an enum direction, "
+          f"{np.median(move[after]):,.0f} slotted with an int direction "
+          f"({np.median(move[after]) / np.median(move[before]):.2f}x; reference: {REFERENCE['move'][0]:,} -> "
+          f"{REFERENCE['move'][1]:,})")
+    print(f"ElevatorController, 100 elevators: {np.median(controller[before]):,.1f} ticks/s unslotted with an enum "
+          f"direction, {np.median(controller[after]):,.1f} slotted with an int direction "
+          f"({np.median(controller[after]) / np.median(controller[before]):.2f}x; reference: "
+          f"{REFERENCE['controller'][0]} -> {REFERENCE['controller'][1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import random
+import time
+
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.elevator_stop_index import ElevatorStopIndex
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.strategies.assignment import ExistingStopPreferenceStrategy, ExistingStopStrategy
+
+
+def busy_fleet(n_elevators: int, n_floors: int, rnd: random.Random):
+    # a fleet of elevators part-way through serving a few passengers each.
+    elevators = [Elevator(num_floors=n_floors, max_capacity=10, stop_time=1) for _ in range(n_elevators)]
+    for e in elevators:
+        e.current_floor = rnd.randint(1, n_floors)
+        for _ in range(rnd.randint(0, 4)):
+            source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+            e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+        for _ in range(rnd.randint(0, 10)):
+            e.move()
+    return elevators
+
+
+def assignments_per_second(strategy, elevators, passengers, indexed: bool) -> float:
+    elevators = [e.copy() for e in elevators]
+    index = None
+    if indexed:
+        index = ElevatorStopIndex(elevators)
+        strategy.use_elevator_stop_index(index)
+    start = time.perf_counter()
+    for passenger in passengers:
+        elevator_index = strategy.assign_elevator(passenger, elevators)
+        if elevator_index is not None:
+            elevators[elevator_index].assign(passenger)
+            if index is not None:
+                index.update(elevator_index)
+    return len(passengers) / (time.perf_counter() - start)
+
+
+def main():
+    rnd = random.Random(0)
+    for n_floors in [20, 100, 500]:
+        passengers = [Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+                      for source_floor, destination_floor in
+                      (rnd.sample(range(1, n_floors + 1), 2) for _ in range(200))]
+        for n_elevators in [10, 100, 1000, 5000]:
+            elevators = busy_fleet(n_elevators, n_floors, rnd)
+            for strategy_type in [ExistingStopStrategy, ExistingStopPreferenceStrategy]:
+                looping = assignments_per_second(strategy_type(), elevators, passengers, indexed=False)
+                indexed = assignments_per_second(strategy_type(), elevators, passengers, indexed=True)
+                print(f"{n_floors} floors, {n_elevators} elevators, {strategy_type.__name__}: "
+                      f"{looping:,.0f} assignments/s looping, {indexed:,.0f} assignments/s with an elevator stop index")
+
+
+if __name__ == "__main__":
+    main()
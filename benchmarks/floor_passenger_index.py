@@ -0,0 +1,56 @@
+import logging
+import time
+import tracemalloc
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.strategies.assignment import DirectionalStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+def dense_layout(n_elevators: int, n_floors: int):
+    # the previous layout: a list of passengers for every floor of every elevator, for both waiting and embarked passengers.
+    waiting_passengers = [[[] for _ in range(n_floors)] for _ in range(n_elevators)]
+    embarked_passengers = [[[] for _ in range(n_floors)] for _ in range(n_elevators)]
+    return waiting_passengers, embarked_passengers
+
+
+def sparse_controller(n_elevators: int, n_floors: int):
+    return ElevatorController(
+        n_elevators=n_elevators,
+        n_floors=n_floors,
+        max_elevator_capacity=10,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+
+
+def measure(build, *args):
+    start = time.perf_counter()
+    build(*args)
+    duration = time.perf_counter() - start
+    tracemalloc.start()
+    result = build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return duration, peak
+
+
+def main():
+    n_elevators = 500
+    n_floors = 5000
+    logger.setLevel(logging.WARNING)
+
+    dense_time, dense_memory = measure(dense_layout, n_elevators, n_floors)
+    controller_time, controller_memory = measure(sparse_controller, n_elevators, n_floors)
+    print(f"{n_elevators} elevators x {n_floors} floors")
+    print(f"dense per-floor lists alone: {dense_time:.3f}s, {dense_memory / 2 ** 20:.1f} MiB")
+    print(f"ElevatorController with sparse indexes: {controller_time:.3f}s, {controller_memory / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import logging
+import time
+
+import numpy as np
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+def counting(strategy_type):
+    class CountingStrategy(strategy_type):
+        calls = 0
+
+        def assign_elevator(self, passenger, elevators):
+            self.calls += 1
+            return super().assign_elevator(passenger, elevators)
+
+    return CountingStrategy()
+
+
+def run(strategy_type, coalesce_hall_calls: bool, passenger_requests):
+    assignment_strategy = counting(strategy_type)
+    controller = ElevatorController(
+        n_elevators=20,
+        n_floors=60,
+        max_elevator_capacity=10,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=1,
+        coalesce_hall_calls=coalesce_hall_calls
+    )
+    start = time.perf_counter()
+    controller.handle_passenger_requests(iter(passenger_requests))
+    elapsed = time.perf_counter() - start
+    return assignment_strategy.calls, elapsed, controller.get_stats()["total_time"]["mean"]
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    # bursts of about 10 passengers sharing a source and destination floor.
+    np.random.seed(0)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=20, p=0.5, n_steps=300, n_floors=60,
+                                                                             same_floors_per_step=True))
+    for strategy_type in [DirectionalStrategy, ExistingStopStrategy]:
+        for coalesce_hall_calls in [False, True]:
+            calls, elapsed, mean_total_time = run(strategy_type, coalesce_hall_calls, passenger_requests)
+            print(f"{strategy_type.__name__}, coalesce_hall_calls={coalesce_hall_calls}: {calls:,} assign_elevator "
+                  f"calls, {elapsed:.2f}s, mean total time {mean_total_time:.1f} steps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import logging
+import time
+import tracemalloc
+from math import floor
+
+import numpy as np
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, HistoricalDistributionIdleStrategy, \
+    StreamingDistributionIdleStrategy, TimeOfDayIdleStrategy
+
+
+def historical_counts(n_observations: int, n_floors: int):
+    # a lobby-heavy history, most requests coming from the lower floors.
+    rng = np.random.default_rng(0)
+    floors = np.minimum(rng.geometric(4 / n_floors, size=n_observations), n_floors)
+    return np.bincount(floors, minlength=n_floors + 1)[1:].tolist()
+
+
+def strategy_bytes(counts) -> float:
+    tracemalloc.start()
+    strategy = HistoricalDistributionIdleStrategy(historical_counts=counts)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del strategy
+    return size
+
+
+def expanded_bytes(counts) -> float:
+    # the list of every historical observation, as the strategy used to keep it.
+    tracemalloc.start()
+    observations = [i + 1 for i, h in enumerate(counts) for _ in range(h)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del observations
+    return size
+
+
+def positions_per_second(counts, n_elevators: int, n_calls: int) -> float:
+    strategy = HistoricalDistributionIdleStrategy(historical_counts=counts)
+    elevators = [Elevator(num_floors=len(counts), max_capacity=10) for _ in range(n_elevators)]
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        strategy.position_idle_elevators(elevators)
+    return n_calls / (time.perf_counter() - start)
+
+
+def expanded_positions_per_second(counts, n_elevators: int, n_calls: int) -> float:
+    # one `np.quantile` over every historical observation per idle elevator, as the strategy used to do.
+    observations = [i + 1 for i, h in enumerate(counts) for _ in range(h)]
+    elevators = [Elevator(num_floors=len(counts), max_capacity=10) for _ in range(n_elevators)]
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        for i, elevator in enumerate(elevators):
+            elevator.idle_target = floor(np.quantile(observations, (i + 0.5) / n_elevators))
+    return n_calls / (time.perf_counter() - start)
+
+
+class TimedIdleStrategy:
+    # the idle strategy being timed.
+    strategy: object
+    calls: int = 0
+    seconds: float = 0.0
+
+    def __init__(self, strategy, every_step: bool):
+        self.strategy = strategy
+        # positioned on every tick, as the controller used to do.
+        self.position_on_idle_change = not every_step
+
+    def position_idle_elevators(self, elevators):
+        start = time.perf_counter()
+        self.strategy.position_idle_elevators(elevators)
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+
+
+def positioning_microseconds_per_tick(strategy, every_step: bool, n_elevators: int, n_steps: int):
+    np.random.seed(0)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=2, p=0.2, n_steps=n_steps,
+                                                                                 n_floors=60))
+    idle_strategy = TimedIdleStrategy(strategy, every_step)
+    controller = ElevatorController(
+        n_elevators=n_elevators,
+        n_floors=60,
+        max_elevator_capacity=10,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=ExistingStopStrategy(),
+        idle_strategy=idle_strategy,
+        stop_time=1
+    )
+    controller.handle_passenger_requests(iter(passenger_requests))
+    return idle_strategy.seconds / controller.time * 1e6, idle_strategy.calls / controller.time
+
+
+def streaming_requests_per_second(n_floors: int, n_elevators: int, drift_threshold: float, n_requests: int):
+    # one idle positioning per request, as if every request came on its own tick.
+    rng = np.random.default_rng(0)
+    requests = [Passenger(str(t), source_floor=source_floor, destination_floor=source_floor % n_floors + 1,
+                          request_time=t)
+                for t, source_floor in enumerate(rng.integers(1, n_floors + 1, size=n_requests).tolist())]
+    strategy = StreamingDistributionIdleStrategy(n_floors=n_floors, half_life=1000, drift_threshold=drift_threshold)
+    elevators = [Elevator(num_floors=n_floors, max_capacity=10) for _ in range(n_elevators)]
+    start = time.perf_counter()
+    for passenger in requests:
+        strategy.observe_request(passenger)
+        strategy.position_idle_elevators(elevators)
+    return n_requests / (time.perf_counter() - start), strategy.recomputations
+
+
+def time_of_day_ticks_per_second(n_windows: int, n_elevators: int, n_ticks: int):
+    # a day of `n_windows` windows, with the idle set changing on every tick.
+    n_floors = 60
+    counts_by_window = [historical_counts(10_000 + window, n_floors) for window in range(n_windows)]
+    start = time.perf_counter()
+    strategy = TimeOfDayIdleStrategy(historical_counts_by_window=counts_by_window, window_length=n_ticks // n_windows,
+                                     n_elevators=n_elevators)
+    construction = time.perf_counter() - start
+    elevators = [Elevator(num_floors=n_floors, max_capacity=10) for _ in range(n_elevators)]
+    start = time.perf_counter()
+    for t in range(n_ticks):
+        elevators[t % n_elevators].set_targets(([], [], [1] if t % 2 else []))
+        strategy.set_time(t)
+        strategy.position_idle_elevators(elevators)
+    lookup = n_ticks / (time.perf_counter() - start)
+
+    # the quantiles of the window computed on every tick instead.
+    windows = [HistoricalDistributionIdleStrategy(historical_counts=counts) for counts in counts_by_window]
+    start = time.perf_counter()
+    for t in range(n_ticks):
+        elevators[t % n_elevators].set_targets(([], [], [1] if t % 2 else []))
+        idle_elevators = [e for e in elevators if e.is_empty()]
+        targets = windows[strategy.window_at(t)].quantile_floors(
+            (np.arange(len(idle_elevators)) + 0.5) / max(len(idle_elevators), 1))
+        for elevator, target_floor in zip(idle_elevators, targets.tolist()):
+            elevator.idle_target = target_floor
+    on_the_fly = n_ticks / (time.perf_counter() - start)
+    return construction, lookup, on_the_fly
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    n_floors = 60
+    for n_observations in [100_000, 10_000_000]:
+        counts = historical_counts(n_observations, n_floors)
+        print(f"{n_observations:,} observations: {strategy_bytes(counts) / 1e3:,.1f} kB with cumulative counts, "
+              f"{expanded_bytes(counts) / 1e6:,.1f} MB expanded")
+    counts = historical_counts(100_000, n_floors)
+    for n_elevators in [4, 32]:
+        print(f"100,000 observations, {n_elevators} idle elevators: "
+              f"{positions_per_second(counts, n_elevators, 1000):,.0f} calls/s with cumulative counts, "
+              f"{expanded_positions_per_second(counts, n_elevators, 5):,.1f} calls/s expanded")
+    # a quiet building, where the set of empty elevators rarely changes from one tick to the next.
+    for n_elevators in [8, 64]:
+        for strategy_type, args in [(EqualSpreadIdleStrategy, []), (HistoricalDistributionIdleStrategy, [counts])]:
+            changed, changed_calls = positioning_microseconds_per_tick(strategy_type(*args), False, n_elevators, 2000)
+            every, every_calls = positioning_microseconds_per_tick(strategy_type(*args), True, n_elevators, 2000)
+            print(f"{n_elevators} elevators, {strategy_type.__name__}: {changed:,.1f}µs per tick positioning on idle "
+                  f"changes ({changed_calls:.2f} calls per tick), {every:,.1f}µs per tick positioning every tick "
+                  f"({every_calls:.2f} calls per tick)")
+    for n_floors in [60, 1000]:
+        # a drift threshold of 0 computes the targets again on every request.
+        lazy, lazy_recomputations = streaming_requests_per_second(n_floors, 8, 0.05, 20_000)
+        eager, eager_recomputations = streaming_requests_per_second(n_floors, 8, 0.0, 20_000)
+        print(f"{n_floors} floors, streaming: {lazy:,.0f} requests/s with {lazy_recomputations:,} recomputations, "
+              f"{eager:,.0f} requests/s recomputing on every request")
+    for n_windows in [1, 24, 96]:
+        construction, lookup, on_the_fly = time_of_day_ticks_per_second(n_windows, 16, 96_000)
+        print(f"{n_windows} time windows, 16 elevators: tables built in {construction * 1e3:,.1f}ms, {lookup:,.0f} "
+              f"ticks/s looking targets up, {on_the_fly:,.0f} ticks/s computing them on every tick")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import logging
+import time
+
+import numpy as np
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy, \
+    MemoizedAssignmentStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+class LoopingDirectionalStrategy(DirectionalStrategy):
+    # without the index of the elevators by floor, the strategy scores every elevator on each assignment.
+    use_elevator_floor_index = None
+
+
+class LoopingExistingStopStrategy(ExistingStopStrategy):
+    # without the index of the elevators by target floor, the strategy scores every elevator on each assignment.
+    use_elevator_stop_index = None
+
+
+def seconds(assignment_strategy, n_elevators: int, passenger_requests) -> float:
+    controller = ElevatorController(
+        n_elevators=n_elevators,
+        n_floors=60,
+        max_elevator_capacity=10,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=1
+    )
+    start = time.perf_counter()
+    controller.handle_passenger_requests(iter(passenger_requests))
+    return time.perf_counter() - start
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    for n_elevators, n in [(20, 20), (100, 100)]:
+        # bursts of passengers sharing a source and destination floor, enough of them for the elevators to fall behind.
+        np.random.seed(0)
+        passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=n, p=0.5, n_steps=300,
+                                                                                     n_floors=60,
+                                                                                     same_floors_per_step=True))
+        for strategy_type, looping_strategy_type in [(DirectionalStrategy, LoopingDirectionalStrategy),
+                                                     (ExistingStopStrategy, LoopingExistingStopStrategy)]:
+            indexed = seconds(strategy_type(), n_elevators, passenger_requests)
+            looping = seconds(looping_strategy_type(), n_elevators, passenger_requests)
+            memoized_strategy = MemoizedAssignmentStrategy(strategy_type())
+            memoized = seconds(memoized_strategy, n_elevators, passenger_requests)
+            print(f"{n_elevators} elevators, {strategy_type.__name__}: {looping:.2f}s looping, {indexed:.2f}s with the "
+                  f"controller's index, {memoized:.2f}s memoized with {memoized_strategy.hit_rate:.0%} of "
+                  f"{memoized_strategy.hits + memoized_strategy.misses:,} elevator scores reused")
+
+
+if __name__ == "__main__":
+    main()
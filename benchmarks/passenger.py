@@ -0,0 +1,36 @@
+import time
+import tracemalloc
+
+from elevator_system_design.model.passenger import Passenger, PassengerModel
+
+
+def construction_rate(make, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        make(i)
+    return n / (time.perf_counter() - start)
+
+
+def bytes_per_passenger(make, n: int) -> float:
+    tracemalloc.start()
+    passengers = [make(i) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del passengers
+    return size / n
+
+
+def main():
+    n = 200_000
+    forms = {
+        "Passenger record": lambda i: Passenger(id=f"passenger{i}", source_floor=3, destination_floor=17, request_time=i),
+        "validated PassengerModel": lambda i: PassengerModel(id=f"passenger{i}", source_floor=3, destination_floor=17,
+                                                             request_time=i),
+    }
+    for name, make in forms.items():
+        print(f"{name}: {construction_rate(make, n):,.0f} passengers/s, {bytes_per_passenger(make, n):.0f} bytes/passenger "
+              f"(including the id string)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import logging
+import time
+
+import numpy as np
+
+from elevator_system_design.log import logger
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_normal_floor_selection_passenger_provider, \
+    random_uniform_floor_selection_passenger_provider
+
+
+def scalar_uniform_provider(n: int, p: float, n_steps: int, n_floors: int):
+    # a few NumPy scalar draws and rejection loops per time step, as the uniform provider used to do.
+    i = 0
+    for time_step, n_passengers in enumerate(np.random.binomial(n=n, p=p, size=n_steps)):
+        source_floor = round(np.random.uniform(1, n_floors + 1))
+        while source_floor > n_floors:
+            source_floor = round(np.random.uniform(1, n_floors + 1))
+        destination_floor = round(np.random.uniform(1, n_floors + 1))
+        while destination_floor > n_floors or destination_floor == source_floor:
+            destination_floor = round(np.random.uniform(1, n_floors + 1))
+        yield [Passenger(id=f"passenger{i + j}", source_floor=source_floor, destination_floor=destination_floor,
+                         request_time=time_step) for j in range(n_passengers)]
+        i += n_passengers
+
+
+def passengers_per_second(provider) -> float:
+    start = time.perf_counter()
+    n_passengers = sum(len(passenger_batch) for passenger_batch in provider)
+    return n_passengers / (time.perf_counter() - start)
+
+
+def main():
+    logger.setLevel(logging.WARNING)
+    np.random.seed(0)
+    for n, p in [(2, 0.5), (20, 0.5)]:
+        n_steps = int(1_000_000 // (n * p))
+        print(f"{n * p:.0f} passengers per step: "
+              f"{passengers_per_second(random_uniform_floor_selection_passenger_provider(n, p, n_steps, 60)):,.0f} "
+              f"passengers/s uniform, "
+              f"{passengers_per_second(random_normal_floor_selection_passenger_provider(n, p, n_steps, 60)):,.0f} "
+              f"passengers/s normal, "
+              f"{passengers_per_second(scalar_uniform_provider(n, p, n_steps, 60)):,.0f} passengers/s drawing per step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import sys
+from typing import Iterable, List, Iterator, Optional, Sequence, Union, Dict
+
+import numpy as np
+
+from elevator_system_design.log import logger
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.model.system_summary import SystemSummary
+
+# index of the stop flags for each sweep direction in `BatchedElevatorController.stops`.
+UP_SWEEP = 0
+DOWN_SWEEP = 1
+# the initial number of passenger slots, doubled whenever they run out.
+_INITIAL_PASSENGER_SLOTS = 1024
+
+
+class BatchedElevatorController:
+    """
+    A controller simulating many independent buildings at once. The state of every elevator in every building is held in
+    NumPy arrays, and all elevators are advanced with array operations at each time-step.
+
+    This is a simplified elevator model of its own, not a vectorized `ElevatorController`: on the same passengers, its
+    results differ from those of an `ElevatorController` with any assignment and idle strategy. Elevators sweep up and down
+    over the floors to stop at in each direction, kept as flags, and turn around once no flagged floor is left ahead of
+    them, rather than following the three target heaps of the `Elevator` class. A passenger's source floor is flagged when
+    they're assigned an elevator, and their destination floor when they embark. Each passenger is assigned once, on
+    arrival, to the elevator with the lowest cost: its distance to them, plus a penalty if it would have to turn around
+    first or if it is full. Passengers are never reassigned; one who doesn't fit waits for their elevator to come back.
+    Empty elevators spread equally across the floors. The passengers are kept in preallocated arrays, one slot per
+    passenger in the order they requested an elevator, which grow by doubling; delivered passengers are masked out, and
+    the slots are compacted once most of them are delivered.
+    """
+    n_buildings: int
+    n_elevators: np.ndarray
+    n_floors: np.ndarray
+    max_elevator_capacity: np.ndarray
+    stop_time: np.ndarray
+    exists: np.ndarray
+    current_floor: np.ndarray
+    direction: np.ndarray
+    passenger_count: np.ndarray
+    current_stop_remaining: np.ndarray
+    stops: np.ndarray
+    sweep_target: np.ndarray
+    time: int = 0
+
+    def __init__(self,
+                 n_buildings: int,
+                 n_elevators: Union[int, Sequence[int]],
+                 n_floors: Union[int, Sequence[int]],
+                 max_elevator_capacity: Union[int, Sequence[int]],
+                 stop_time: Union[int, Sequence[int]] = 0):
+        """
+        The function initializes a batched controller for a number of buildings. Each configuration parameter is either a
+        single value shared by all buildings, or a sequence with one value per building.
+
+        :param n_buildings: The number of buildings simulated together
+        :type n_buildings: int
+        :param n_elevators: The number of elevators in each building
+        :type n_elevators: Union[int, Sequence[int]]
+        :param n_floors: The number of floors in each building
+        :type n_floors: Union[int, Sequence[int]]
+        :param max_elevator_capacity: The maximum number of passengers each elevator can hold, per building
+        :type max_elevator_capacity: Union[int, Sequence[int]]
+        :param stop_time: The number of time-steps an elevator waits at each floor it stops at, per building. Defaults to 0
+        :type stop_time: Union[int, Sequence[int]] (optional)
+        """
+        self.n_buildings = n_buildings
+        self.n_elevators = np.broadcast_to(np.asarray(n_elevators, dtype=np.int64), (n_buildings,)).copy()
+        self.n_floors = np.broadcast_to(np.asarray(n_floors, dtype=np.int64), (n_buildings,)).copy()
+        self.max_elevator_capacity = np.broadcast_to(np.asarray(max_elevator_capacity, dtype=np.int64), (n_buildings,)).copy()
+        self.stop_time = np.broadcast_to(np.asarray(stop_time, dtype=np.int64), (n_buildings,)).copy()
+        n_cars = int(self.n_elevators.max())
+        top_floor = int(self.n_floors.max())
+        self.exists = np.arange(n_cars)[None, :] < self.n_elevators[:, None]
+        self.direction = np.zeros((n_buildings, n_cars), dtype=np.int64)
+        self.passenger_count = np.zeros((n_buildings, n_cars), dtype=np.int64)
+        self.current_stop_remaining = np.zeros((n_buildings, n_cars), dtype=np.int64)
+        # stops[b, e, sweep, floor] is set if elevator e of building b stops at floor during its upward/downward sweep.
+        self.stops = np.zeros((n_buildings, n_cars, 2, top_floor + 2), dtype=bool)
+        self.sweep_target = np.zeros((n_buildings, n_cars), dtype=np.int64)
+        self.current_floor = np.ones((n_buildings, n_cars), dtype=np.int64)
+        self.current_floor = self._idle_targets(self.exists)
+        self.sweep_target[:] = self.current_floor
+
+        self._passengers: Dict[str, np.ndarray] = {
+            "building": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "elevator": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "source_floor": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "destination_floor": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "direction": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "request_time": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=np.int64),
+            "embarked": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=bool),
+            # whether the passenger of the slot is yet to be delivered.
+            "live": np.zeros(_INITIAL_PASSENGER_SLOTS, dtype=bool),
+        }
+        # the number of slots in use, delivered passengers included, and the number of passengers yet to be delivered.
+        self._n_slots = 0
+        self._n_live = 0
+        self._wait_time = self._new_accumulators()
+        self._total_time = self._new_accumulators()
+        self._no_action = np.zeros(n_buildings, dtype=np.int64)
+
+    def _new_accumulators(self) -> Dict[str, np.ndarray]:
+        return {
+            "min": np.full(self.n_buildings, sys.maxsize, dtype=np.int64),
+            "max": np.full(self.n_buildings, -1, dtype=np.int64),
+            "sum": np.zeros(self.n_buildings, dtype=np.int64),
+            "n": np.zeros(self.n_buildings, dtype=np.int64),
+        }
+
+    def _idle_targets(self, empty: np.ndarray) -> np.ndarray:
+        """
+        The function spreads the empty elevators of each building equally across its floors.
+
+        :param empty: A boolean array flagging the empty elevators of each building
+        :type empty: np.ndarray
+        :return: the idle target floor of each elevator. Targets of elevators which aren't empty are meaningless.
+        """
+        rank = np.cumsum(empty, axis=1) - 1
+        n_empty = np.maximum(empty.sum(axis=1, keepdims=True), 1)
+        return np.round((rank + 0.5) * self.n_floors[:, None] / n_empty).astype(np.int64)
+
+    @staticmethod
+    def _include(accumulators: Dict[str, np.ndarray], buildings: np.ndarray, times: np.ndarray):
+        np.minimum.at(accumulators["min"], buildings, times)
+        np.maximum.at(accumulators["max"], buildings, times)
+        np.add.at(accumulators["sum"], buildings, times)
+        np.add.at(accumulators["n"], buildings, 1)
+
+    def request_elevators(self, buildings: np.ndarray, passengers: List[Passenger]):
+        """
+        The function assigns each passenger to an elevator of their building and flags their source floor as a stop.
+
+        :param buildings: The building of each passenger
+        :type buildings: np.ndarray
+        :param passengers: The passengers requesting an elevator at this time-step
+        :type passengers: List[Passenger]
+        """
+        if len(passengers) == 0:
+            return
+        source = np.fromiter((p.source_floor for p in passengers), dtype=np.int64, count=len(passengers))
+        destination = np.fromiter((p.destination_floor for p in passengers), dtype=np.int64, count=len(passengers))
+        request_time = np.fromiter((p.request_time for p in passengers), dtype=np.int64, count=len(passengers))
+        no_action = source == destination
+        if no_action.any():
+            logger.warning(f"{int(no_action.sum())} passengers have the same source and destination floors! Nothing to do.")
+            np.add.at(self._no_action, buildings[no_action], 1)
+            buildings, source, destination, request_time = \
+                buildings[~no_action], source[~no_action], destination[~no_action], request_time[~no_action]
+        direction = np.where(destination > source, 1, -1)
+
+        floor = self.current_floor[buildings]
+        elevator_direction = self.direction[buildings]
+        distance = np.abs(source[:, None] - floor)
+        top_floor = self.n_floors[buildings][:, None]
+        on_the_way = (elevator_direction == 0) | \
+            ((elevator_direction == direction[:, None]) & ((source[:, None] - floor) * elevator_direction >= 0))
+        cost = distance + np.where(on_the_way, 0, np.where(elevator_direction == direction[:, None], 2, 1) * top_floor)
+        cost += np.where(self.passenger_count[buildings] >= self.max_elevator_capacity[buildings][:, None], 4 * top_floor, 0)
+        cost = np.where(self.exists[buildings], cost, np.iinfo(np.int64).max)
+        elevator = np.argmin(cost, axis=1)
+
+        idle = self.direction[buildings, elevator] == 0
+        heading = np.where(source > self.current_floor[buildings, elevator], 1,
+                           np.where(source < self.current_floor[buildings, elevator], -1, direction))
+        self.direction[buildings[idle], elevator[idle]] = heading[idle]
+        self.stops[buildings, elevator, np.where(direction > 0, UP_SWEEP, DOWN_SWEEP), source] = True
+
+        self._append_passengers({
+            "building": buildings,
+            "elevator": elevator,
+            "source_floor": source,
+            "destination_floor": destination,
+            "direction": direction,
+            "request_time": request_time,
+            "embarked": False,
+            "live": True,
+        }, len(buildings))
+
+    def _append_passengers(self, values: Dict[str, Union[np.ndarray, bool]], n_passengers: int):
+        """
+        The function writes new passengers to the slots after the last one in use, doubling the slots if they run out.
+        """
+        start, end = self._n_slots, self._n_slots + n_passengers
+        n_slots = len(self._passengers["building"])
+        if end > n_slots:
+            n_slots = max(2 * n_slots, end)
+            for k, v in self._passengers.items():
+                grown = np.zeros(n_slots, dtype=v.dtype)
+                grown[:start] = v[:start]
+                self._passengers[k] = grown
+        for k, v in self._passengers.items():
+            v[start:end] = values[k]
+        self._n_slots = end
+        self._n_live += n_passengers
+
+    def _compact_passengers(self):
+        """
+        The function moves the passengers yet to be delivered to the first slots, keeping their order, once most slots in
+        use hold delivered passengers, so that compacting takes amortized constant time per passenger.
+        """
+        if self._n_slots <= 2 * self._n_live:
+            return
+        live = self._passengers["live"][:self._n_slots]
+        for k, v in self._passengers.items():
+            v[:self._n_live] = v[:self._n_slots][live]
+        self._passengers["live"][self._n_live:self._n_slots] = False
+        self._n_slots = self._n_live
+
+    def _serve_floors(self):
+        """
+        The function drops off embarked passengers at their destination floor, and picks up waiting passengers whose
+        elevator is on their source floor and heading in their direction, as long as the elevator has room for them.
+        """
+        p = {k: v[:self._n_slots] for k, v in self._passengers.items()}
+        floor = self.current_floor[p["building"], p["elevator"]]
+        arrived = p["live"] & p["embarked"] & (floor == p["destination_floor"])
+        if arrived.any():
+            self._include(self._total_time, p["building"][arrived], self.time - p["request_time"][arrived])
+            np.subtract.at(self.passenger_count, (p["building"][arrived], p["elevator"][arrived]), 1)
+            p["live"][arrived] = False
+            self._n_live -= int(arrived.sum())
+
+        boarding = p["live"] & ~p["embarked"] & (floor == p["source_floor"]) & \
+            (self.direction[p["building"], p["elevator"]] == p["direction"])
+        candidates = np.flatnonzero(boarding)
+        if len(candidates) > 0:
+            # passengers board their elevator in the order they requested it, until it is full.
+            car = p["building"][candidates] * self.stops.shape[1] + p["elevator"][candidates]
+            order = np.lexsort((p["request_time"][candidates], car))
+            candidates, car = candidates[order], car[order]
+            group_start = np.flatnonzero(np.r_[True, car[1:] != car[:-1]])
+            rank = np.arange(len(car)) - np.repeat(group_start, np.diff(np.r_[group_start, len(car)]))
+            room = (self.max_elevator_capacity[:, None] - self.passenger_count).ravel()[car]
+            embarking = candidates[rank < room]
+            buildings, elevators = p["building"][embarking], p["elevator"][embarking]
+            p["embarked"][embarking] = True
+            self._include(self._wait_time, buildings, self.time - p["request_time"][embarking])
+            np.add.at(self.passenger_count, (buildings, elevators), 1)
+            sweep = np.where(p["direction"][embarking] > 0, UP_SWEEP, DOWN_SWEEP)
+            self.stops[buildings, elevators, sweep, p["destination_floor"][embarking]] = True
+
+        # the current floor has been served in the direction of travel, except for passengers who didn't fit.
+        moving = np.nonzero(self.direction != 0)
+        self.stops[moving[0], moving[1], np.where(self.direction[moving] > 0, UP_SWEEP, DOWN_SWEEP),
+                   self.current_floor[moving]] = False
+        if len(candidates) > 0:
+            left_behind = candidates[rank >= room]
+            self.stops[p["building"][left_behind], p["elevator"][left_behind],
+                       np.where(p["direction"][left_behind] > 0, UP_SWEEP, DOWN_SWEEP),
+                       p["source_floor"][left_behind]] = True
+        self._compact_passengers()
+
+    def _move(self):
+        """
+        The function moves every elevator by one time-step: elevators which are stopped count down their stop time, others
+        continue their sweep, turn around at its end, or drift toward their idle target once they have nothing left to do.
+        """
+        top_floor = self.stops.shape[-1] - 1
+        stopped = self.current_stop_remaining > 0
+        self.current_stop_remaining[stopped] -= 1
+
+        any_stop = self.stops[:, :, UP_SWEEP] | self.stops[:, :, DOWN_SWEEP]
+        has_stops = any_stop.any(axis=2)
+        highest = top_floor - np.argmax(any_stop[..., ::-1], axis=2)
+        lowest = np.argmax(any_stop, axis=2)
+        floor = self.current_floor
+        ahead = np.where(self.direction > 0, highest > floor, lowest < floor) & has_stops
+        up_here = np.take_along_axis(self.stops[:, :, UP_SWEEP], floor[..., None], axis=2)[..., 0]
+        down_here = np.take_along_axis(self.stops[:, :, DOWN_SWEEP], floor[..., None], axis=2)[..., 0]
+
+        ready = ~stopped & self.exists
+        # elevators which were given stops while idle head toward the closest one.
+        starting = ready & (self.direction == 0) & has_stops
+        up_distance = np.where(highest > floor, highest - floor, top_floor + 1)
+        down_distance = np.where(lowest < floor, floor - lowest, top_floor + 1)
+        heading = np.where(up_distance == down_distance, np.where(up_here, 1, -1), np.where(up_distance < down_distance, 1, -1))
+        self.direction[starting] = heading[starting]
+        ahead = np.where(self.direction > 0, highest > floor, lowest < floor) & has_stops
+
+        # at the end of a sweep, stop on the spot if the current floor is flagged, turning around if it is flagged for the
+        # other direction. Otherwise turn around and head for the remaining stops, or go idle if there are none.
+        sweep_over = ready & (self.direction != 0) & ~ahead
+        same_way_here = np.where(self.direction > 0, up_here, down_here)
+        other_way_here = np.where(self.direction > 0, down_here, up_here)
+        stop_here = sweep_over & (same_way_here | other_way_here)
+        self.direction[sweep_over & ~same_way_here & has_stops] *= -1
+        self.direction[sweep_over & ~has_stops] = 0
+        self.current_stop_remaining[stop_here] = np.broadcast_to(self.stop_time[:, None], floor.shape)[stop_here]
+
+        idle = self.exists & (self.direction == 0) & ~has_stops & (self.passenger_count == 0)
+        idle_target = np.clip(self._idle_targets(idle), 1, self.n_floors[:, None])
+        moving = ready & ~stop_here & (self.direction != 0)
+        self.current_floor = floor + np.where(moving, self.direction, 0) + \
+            np.where(ready & idle, np.sign(idle_target - floor), 0)
+        self.sweep_target = np.where(self.direction > 0, highest, np.where(self.direction < 0, lowest, idle_target))
+
+        # stop on arrival at a flagged floor, turning around if it is the end of the sweep.
+        floor = self.current_floor
+        up_here = np.take_along_axis(self.stops[:, :, UP_SWEEP], floor[..., None], axis=2)[..., 0]
+        down_here = np.take_along_axis(self.stops[:, :, DOWN_SWEEP], floor[..., None], axis=2)[..., 0]
+        ahead = np.where(self.direction > 0, highest > floor, lowest < floor)
+        stop_here = moving & np.where(self.direction > 0, up_here, down_here)
+        turn = moving & ~stop_here & ~ahead & np.where(self.direction > 0, down_here, up_here)
+        self.direction[turn] *= -1
+        stopping = stop_here | turn
+        self.current_stop_remaining[stopping] = np.broadcast_to(self.stop_time[:, None], floor.shape)[stopping]
+        stopping_at = np.nonzero(stopping)
+        self.stops[stopping_at[0], stopping_at[1], np.where(self.direction[stopping_at] > 0, UP_SWEEP, DOWN_SWEEP),
+                   floor[stopping_at]] = False
+
+    def step(self):
+        """
+        The function serves the current floor of every elevator, moves every elevator, and updates the time.
+        """
+        self._serve_floors()
+        self._move()
+        self.time += 1
+
+    def handle_passenger_requests(self, passenger_request_sources: Sequence[Iterable[List[Passenger]]]):
+        """
+        The function handles the passenger requests of every building, stepping all buildings together until every
+        passenger has been delivered to their destination. Each building has its own passenger request source, with the
+        same contract as the `passenger_request_source` of `ElevatorController.handle_passenger_requests`: an iterator
+        yielding one batch of passengers per time-step. The sources are read in lockstep, one batch from each building per
+        time-step, and a building whose source is exhausted gets no more passengers while the others go on.
+
+        :param passenger_request_sources: The passenger request source of each building, in the order of the buildings
+        :type passenger_request_sources: Sequence[Iterable[List[Passenger]]]
+        """
+        assert len(passenger_request_sources) == self.n_buildings
+        sources: List[Optional[Iterator[List[Passenger]]]] = [iter(s) for s in passenger_request_sources]
+        while any(s is not None for s in sources):
+            buildings = []
+            passengers = []
+            for b in range(self.n_buildings):
+                if sources[b] is None:
+                    continue
+                batch = next(sources[b], None)
+                if batch is None:
+                    sources[b] = None
+                    continue
+                if len(batch):
+                    buildings.extend([b] * len(batch))
+                    passengers.extend(batch)
+            self.request_elevators(np.asarray(buildings, dtype=np.int64), passengers)
+            self.step()
+        logger.info(f"all passengers acknowledged at step {self.time}")
+        while self._n_live > 0:
+            self.step()
+        logger.info(f"all passengers delivered to their destinations at step {self.time}")
+
+    def _summaries(self, accumulators: Dict[str, np.ndarray]) -> List[SystemSummary]:
+        summaries = []
+        for b in range(self.n_buildings):
+            summary = SystemSummary()
+            summary.min_value = int(accumulators["min"][b])
+            summary.max_value = int(accumulators["max"][b])
+            summary.sum = int(accumulators["sum"][b])
+            summary.n = int(accumulators["n"][b])
+            summary.no_action_passengers = int(self._no_action[b])
+            summaries.append(summary)
+        return summaries
+
+    def wait_time_summaries(self) -> List[SystemSummary]:
+        """
+        The function returns the wait time summary of each building.
+        :return: a list with one `SystemSummary` per building.
+        """
+        return self._summaries(self._wait_time)
+
+    def total_time_summaries(self) -> List[SystemSummary]:
+        """
+        The function returns the total time summary of each building.
+        :return: a list with one `SystemSummary` per building.
+        """
+        return self._summaries(self._total_time)
+
+    def get_stats(self) -> List[Dict[str, Dict[str, Union[int, float]]]]:
+        """
+        The function `get_stats` returns the wait time and total time summaries of each building, in the same format as
+        `ElevatorController.get_stats`.
+        :return: a list with one dictionary per building, with the keys 'wait_time' and 'total_time'.
+        """
+        return [{'wait_time': wait.__dict__(), 'total_time': total.__dict__()}
+                for wait, total in zip(self.wait_time_summaries(), self.total_time_summaries())]
@@ -0,0 +1,300 @@
+import os
+import pickle
+import random
+import struct
+from array import array
+from typing import TYPE_CHECKING, Any, List, Protocol, Tuple
+
+import numpy as np
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.floor_passenger_index import FloorPassengerIndex
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.model.pending_passenger_queue import PendingPassengerQueue
+from elevator_system_design.model.system_summary import SystemSummary
+
+if TYPE_CHECKING:
+    from elevator_system_design.elevator_controller import ElevatorController
+
+CHECKPOINT_MAGIC = b"ELEVCKPT"
+CHECKPOINT_VERSION = 2
+
+# time, acknowledged passengers, handled passenger batches
+_CONTROLLER = struct.Struct("<qqq")
+# min, max, sum, n, no action passengers
+_SUMMARY = struct.Struct("<qqqqq")
+# num floors, max capacity, stop time, passenger count, current floor, current stop remaining, direction, has idle
+# target, idle target, dispatch version, availability version, state version
+_ELEVATOR = struct.Struct("<iiiiiibBiqqq")
+# source floor, destination floor, request time, id length
+_PASSENGER = struct.Struct("<iiqI")
+_COUNT = struct.Struct("<I")
+_KEY = struct.Struct("<Ii")
+_REFUSED_AT = struct.Struct("<Bq")
+# numpy's MT19937 position, has gauss, cached gaussian
+_NUMPY_STATE = struct.Struct("<iid")
+# python's random version, has gauss next, gauss next
+_PYTHON_STATE = struct.Struct("<iBd")
+_BLOB = struct.Struct("<Q")
+
+
+class CheckpointingStrategy(Protocol):
+    def get_checkpoint_state(self) -> Any:
+        """
+        The function returns the state the strategy learned or cached during the run, which the simulation depends on.
+        It is pickled into the checkpoint, so it mustn't refer to the elevators or the controller.
+
+        :return: the state of the strategy.
+        """
+        ...
+
+    def set_checkpoint_state(self, state: Any):
+        """
+        The function sets the strategy back to a state returned by `get_checkpoint_state`, when a run is restored.
+
+        :param state: The state of the strategy at the checkpoint
+        :type state: Any
+        """
+        ...
+
+
+class _Writer:
+    def __init__(self):
+        self.chunks = []
+
+    def pack(self, s: struct.Struct, *values):
+        self.chunks.append(s.pack(*values))
+
+    def ints(self, values: List[int], typecode: str = "i"):
+        self.pack(_COUNT, len(values))
+        self.chunks.append(array(typecode, values).tobytes())
+
+    def passenger(self, p: Passenger):
+        passenger_id = p.id.encode()
+        self.pack(_PASSENGER, p.source_floor, p.destination_floor, p.request_time, len(passenger_id))
+        self.chunks.append(passenger_id)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, s: struct.Struct) -> Tuple[Any, ...]:
+        values = s.unpack_from(self.data, self.offset)
+        self.offset += s.size
+        return values
+
+    def ints(self, typecode: str = "i") -> List[int]:
+        n, = self.unpack(_COUNT)
+        values = array(typecode)
+        end = self.offset + n * values.itemsize
+        values.frombytes(self.data[self.offset:end])
+        self.offset = end
+        return values.tolist()
+
+    def passenger(self) -> Passenger:
+        source_floor, destination_floor, request_time, id_length = self.unpack(_PASSENGER)
+        passenger_id = bytes(self.data[self.offset:self.offset + id_length]).decode()
+        self.offset += id_length
+        return Passenger(id=passenger_id, source_floor=source_floor, destination_floor=destination_floor,
+                         request_time=request_time)
+
+
+def _write_summary(w: _Writer, summary: SystemSummary):
+    w.pack(_SUMMARY, summary.min_value, summary.max_value, summary.sum, summary.n, summary.no_action_passengers)
+
+
+def _read_summary(r: _Reader) -> SystemSummary:
+    summary = SystemSummary()
+    summary.min_value, summary.max_value, summary.sum, summary.n, summary.no_action_passengers = r.unpack(_SUMMARY)
+    return summary
+
+
+def _write_elevator(w: _Writer, e: Elevator):
+    w.pack(_ELEVATOR, e.num_floors, e.max_capacity, e.stop_time, e.passenger_count, e.current_floor,
+           e.current_stop_remaining, e.direction_value, e.idle_target is not None, e.idle_target or 0,
+           e.dispatch_version, e.availability_version, e.state_version)
+    for heap in e.targets:
+        w.ints(heap)
+
+
+def _read_elevator(r: _Reader) -> Elevator:
+    num_floors, max_capacity, stop_time, passenger_count, current_floor, current_stop_remaining, direction, \
+        has_idle_target, idle_target, dispatch_version, availability_version, state_version = r.unpack(_ELEVATOR)
+    e = Elevator(num_floors=num_floors, max_capacity=max_capacity, stop_time=stop_time)
+    e.passenger_count = passenger_count
+    e.current_floor = current_floor
+    e.current_stop_remaining = current_stop_remaining
+    e.direction = Direction(direction)
+    e.idle_target = idle_target if has_idle_target else None
+    e.dispatch_version = dispatch_version
+    e.availability_version = availability_version
+    # the heaps are stored in their internal order, so they don't need to be heapified again.
+    e.set_targets((r.ints(), r.ints(), r.ints()))
+    e.state_version = state_version
+    return e
+
+
+def _write_floor_passenger_index(w: _Writer, index: FloorPassengerIndex):
+    items = list(index.items())
+    w.pack(_COUNT, len(items))
+    for (elevator_index, floor), passengers in items:
+        w.pack(_KEY, elevator_index, floor)
+        w.pack(_COUNT, len(passengers))
+        for p in passengers:
+            w.passenger(p)
+
+
+def _read_floor_passenger_index(r: _Reader) -> FloorPassengerIndex:
+    index = FloorPassengerIndex()
+    n_floors, = r.unpack(_COUNT)
+    for _ in range(n_floors):
+        elevator_index, floor = r.unpack(_KEY)
+        n_passengers, = r.unpack(_COUNT)
+        index.extend(elevator_index, floor, [r.passenger() for _ in range(n_passengers)])
+    return index
+
+
+def _write_pending_passengers(w: _Writer, pending_passengers: PendingPassengerQueue):
+    w.pack(_COUNT, len(pending_passengers))
+    for p, refused_at in pending_passengers.items():
+        w.passenger(p)
+        w.pack(_REFUSED_AT, refused_at is not None, refused_at or 0)
+
+
+def _read_pending_passengers(r: _Reader) -> PendingPassengerQueue:
+    pending_passengers = PendingPassengerQueue()
+    n_passengers, = r.unpack(_COUNT)
+    for _ in range(n_passengers):
+        p = r.passenger()
+        has_refused_at, refused_at = r.unpack(_REFUSED_AT)
+        pending_passengers.add(p, refused_at=refused_at if has_refused_at else None)
+    return pending_passengers
+
+
+def _write_strategy_states(w: _Writer, strategies: List[Any]):
+    states = []
+    for strategy in strategies:
+        get_checkpoint_state = getattr(strategy, "get_checkpoint_state", None)
+        states.append(None if get_checkpoint_state is None else get_checkpoint_state())
+    blob = pickle.dumps(states, protocol=pickle.HIGHEST_PROTOCOL)
+    w.pack(_BLOB, len(blob))
+    w.chunks.append(blob)
+
+
+def _read_strategy_states(r: _Reader) -> List[Any]:
+    n_bytes, = r.unpack(_BLOB)
+    states = pickle.loads(r.data[r.offset:r.offset + n_bytes])
+    r.offset += n_bytes
+    return states
+
+
+def _write_random_states(w: _Writer):
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    w.pack(_NUMPY_STATE, pos, has_gauss, cached_gaussian)
+    w.ints(keys.tolist(), "I")
+    version, internal_state, gauss_next = random.getstate()
+    w.pack(_PYTHON_STATE, version, gauss_next is not None, gauss_next or 0.0)
+    w.ints(list(internal_state), "I")
+
+
+def _read_random_states(r: _Reader) -> Tuple[tuple, tuple]:
+    pos, has_gauss, cached_gaussian = r.unpack(_NUMPY_STATE)
+    numpy_state = ("MT19937", np.array(r.ints("I"), dtype=np.uint32), pos, has_gauss, cached_gaussian)
+    version, has_gauss_next, gauss_next = r.unpack(_PYTHON_STATE)
+    python_state = (version, tuple(r.ints("I")), gauss_next if has_gauss_next else None)
+    return numpy_state, python_state
+
+
+def set_random_states(numpy_state: tuple, python_state: tuple):
+    """
+    The function sets the global `numpy.random` and `random` generators to the states read by `read_checkpoint`.
+
+    :param numpy_state: The state of the `numpy.random` generator
+    :type numpy_state: tuple
+    :param python_state: The state of the `random` generator
+    :type python_state: tuple
+    """
+    np.random.set_state(numpy_state)
+    random.setstate(python_state)
+
+
+def write_checkpoint(controller: "ElevatorController", path: str):
+    """
+    The function writes a binary snapshot of the state of a running simulation: the elevators, the waiting, embarked and
+    pending passengers, the summaries, how far the passenger request source has been read, the state of the global
+    `numpy.random` and `random` generators the random passenger providers draw from, and the pickled state of the
+    strategies implementing the `CheckpointingStrategy` hooks. The snapshot is written to a temporary file first, so a
+    crash while checkpointing leaves the previous checkpoint intact.
+
+    :param controller: The controller to snapshot
+    :type controller: ElevatorController
+    :param path: The path of the checkpoint file
+    :type path: str
+    """
+    w = _Writer()
+    w.chunks.append(CHECKPOINT_MAGIC)
+    w.pack(_COUNT, CHECKPOINT_VERSION)
+    w.pack(_CONTROLLER, controller.time, controller.acknowledged_passengers, controller.handled_passenger_batches)
+    _write_summary(w, controller.wait_time_summary)
+    _write_summary(w, controller.total_time_summary)
+    w.pack(_COUNT, len(controller.elevators))
+    for e in controller.elevators:
+        _write_elevator(w, e)
+    w.ints([int(empty) for empty in controller._idle_positioned_for], "B")
+    _write_floor_passenger_index(w, controller.waiting_passengers)
+    _write_floor_passenger_index(w, controller.embarked_passengers)
+    _write_pending_passengers(w, controller.pending_passengers)
+    _write_random_states(w)
+    _write_strategy_states(w, [controller.assignment_strategy, controller.idle_strategy])
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(w.chunks))
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(controller: "ElevatorController", path: str) -> Tuple[tuple, tuple]:
+    """
+    The function restores the state of a simulation written by `write_checkpoint` into a controller, replacing its
+    elevators, passengers and summaries. The strategies of the controller implementing the `CheckpointingStrategy` hooks
+    are set back to their state at the checkpoint, and the others are left as they are. Checkpoints contain pickled
+    strategy states, so only restore checkpoints from a trusted source.
+
+    :param controller: The controller to restore the simulation into
+    :type controller: ElevatorController
+    :param path: The path of the checkpoint file
+    :type path: str
+    :return: the states of the `numpy.random` and `random` generators when the checkpoint was taken, to be set once the
+    passenger request source has been brought back to its position.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError(f"{path} is not an elevator simulation checkpoint")
+    r = _Reader(data)
+    r.offset = len(CHECKPOINT_MAGIC)
+    version, = r.unpack(_COUNT)
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version {version} in {path}, expected {CHECKPOINT_VERSION}")
+
+    controller.time, controller.acknowledged_passengers, controller.handled_passenger_batches = r.unpack(_CONTROLLER)
+    controller.wait_time_summary = _read_summary(r)
+    controller.total_time_summary = _read_summary(r)
+    n_elevators, = r.unpack(_COUNT)
+    controller.elevators = [_read_elevator(r) for _ in range(n_elevators)]
+    controller._idle_positioned_for = [bool(empty) for empty in r.ints("B")]
+    controller.waiting_passengers = _read_floor_passenger_index(r)
+    controller.embarked_passengers = _read_floor_passenger_index(r)
+    controller.pending_passengers = _read_pending_passengers(r)
+    random_states = _read_random_states(r)
+    strategy_states = _read_strategy_states(r)
+    if r.offset != len(data):
+        raise ValueError(f"unexpected trailing data in checkpoint {path}")
+    for strategy, state in zip([controller.assignment_strategy, controller.idle_strategy], strategy_states):
+        set_checkpoint_state = getattr(strategy, "set_checkpoint_state", None)
+        if set_checkpoint_state is not None and state is not None:
+            set_checkpoint_state(state)
+    return random_states
@@ -1,8 +1,20 @@
-from typing import List, Set, Iterator
+import copy
+import os
+import pickle
+from heapq import heapify, heappop, heappush
+from itertools import islice
+from time import monotonic
+from typing import Any, Callable, Dict, List, Iterator, Optional, Sequence, Set, Tuple
 
+from elevator_system_design.checkpoint import read_checkpoint, set_random_states, write_checkpoint
 from elevator_system_design.log import logger
 from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.elevator_floor_index import ElevatorFloorIndex
+from elevator_system_design.model.elevator_stop_index import ElevatorStopIndex
+from elevator_system_design.model.floor_passenger_index import FloorPassengerIndex
+from elevator_system_design.model.hall_call import HallCall
 from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.model.pending_passenger_queue import PendingPassengerQueue
 from elevator_system_design.model.system_summary import SystemSummary
 from elevator_system_design.strategies.assignment import ElevatorAssignmentStrategy
 from elevator_system_design.strategies.elevator_controller_persistence import ElevatorControllerPersistenceStrategy, \
@@ -15,13 +27,40 @@ class ElevatorController:
     assignment_strategy: ElevatorAssignmentStrategy
     idle_strategy: ElevatorIdleStrategy
     state_persistence_strategy: ElevatorControllerPersistenceStrategy
-    waiting_passengers: List[List[List[Passenger]]]
-    embarked_passengers: List[List[List[Passenger]]]
+    waiting_passengers: FloorPassengerIndex
+    embarked_passengers: FloorPassengerIndex
     num_floors: int
-    pending_passengers: Set[Passenger] = set()
+    pending_passengers: PendingPassengerQueue
     time: int = 0
     wait_time_summary: SystemSummary
     total_time_summary: SystemSummary
+    event_driven: bool = False
+    coalesce_hall_calls: bool = False
+    # how many passengers and batches of passengers have been read from the passenger request source.
+    acknowledged_passengers: int = 0
+    handled_passenger_batches: int = 0
+    _idle_positioned_for: List[bool]
+    # the time-step at which each elevator next needs a full step (None if never), planned from the elevator's dispatch
+    # version and idle target, and a heap of the planned (time-step, elevator index, only the end of a stop) entries, some
+    # of them stale.
+    _next_event_at: List[Optional[int]]
+    _planned_with: List[Tuple[int, Optional[int]]]
+    _next_events: List[Tuple[int, int, bool]]
+    # the elevators whose next event must be planned again before skipping ahead.
+    _replanned: Set[int]
+    _n_idle_elevators: int = 0
+    # incremented whenever an elevator becomes empty or stops being empty.
+    _idle_set_version: int = 0
+    # the idle strategy which last positioned the idle elevators, and the idle set version at the time.
+    _idle_positioned_at: Optional[Tuple[ElevatorIdleStrategy, int]] = None
+    # the index of the elevators by floor, maintained for assignment strategies which use one.
+    _elevator_floor_index: Optional[ElevatorFloorIndex] = None
+    # the index of the elevators by target floor, maintained for assignment strategies which use one.
+    _elevator_stop_index: Optional[ElevatorStopIndex] = None
+    _restored_random_states: Optional[Tuple[tuple, tuple]] = None
+    _checkpoint_path: Optional[str] = None
+    _checkpoint_interval: float = 0.0
+    _next_checkpoint: float = 0.0
 
     def __init__(self,
                  n_elevators: int,
@@ -30,7 +69,9 @@ class ElevatorController:
                  assignment_strategy: ElevatorAssignmentStrategy,
                  idle_strategy: ElevatorIdleStrategy,
                  stop_time: int = 0,
-                 persistence_strategy: ElevatorControllerPersistenceStrategy = NoopPersistenceStrategy()):
+                 persistence_strategy: ElevatorControllerPersistenceStrategy = NoopPersistenceStrategy(),
+                 event_driven: bool = False,
+                 coalesce_hall_calls: bool = False):
         """
         The function initializes an elevator controller with a specified number of elevators, floors, maximum elevator
         capacity, assignment strategy, idle strategy, stop time, and persistence strategy.
@@ -60,20 +101,62 @@ class ElevatorController:
         elevator controller. The `ElevatorControllerPersistenceStrategy` class is an abstract base class that provides
         methods for saving and loading the
         :type persistence_strategy: ElevatorControllerPersistenceStrategy
+        :param event_driven: The `event_driven` parameter is an optional parameter that selects the discrete-event engine
+        in `handle_passenger_requests`. Instead of running a full step for every time-step, the controller jumps over
+        stretches of time in which no passenger arrives, none is pending and no elevator reaches a floor where it picks up
+        or drops off a passenger or changes its plan. The resulting statistics are the same as those of the step-by-step
+        simulation, defaults to False
+        :type event_driven: bool (optional)
+        :param coalesce_hall_calls: The `coalesce_hall_calls` parameter is an optional parameter that groups the
+        passengers requesting an elevator together who wait on the same floor to go in the same direction into a single
+        hall call. The assignment strategy is asked for an elevator once per hall call, as if for its first passenger, and
+        the elevator takes as many of the hall call's passengers as it has room for, the rest forming a new hall call.
+        This changes which elevators are picked, so the statistics differ from those of the uncoalesced simulation,
+        defaults to False
+        :type coalesce_hall_calls: bool (optional)
         """
         self.elevators = [Elevator(num_floors=n_floors, max_capacity=max_elevator_capacity, stop_time=stop_time) for _ in range(n_elevators)]
         self.state_persistence_strategy = persistence_strategy
         self.assignment_strategy = assignment_strategy
         self.idle_strategy = idle_strategy
-        self.waiting_passengers = [[[] for _ in range(n_floors)] for _ in range(n_elevators)]
-        self.embarked_passengers = [[[] for _ in range(n_floors)] for _ in range(n_elevators)]
+        self.waiting_passengers = FloorPassengerIndex()
+        self.embarked_passengers = FloorPassengerIndex()
+        self.pending_passengers = PendingPassengerQueue()
         self.wait_time_summary = SystemSummary()
         self.total_time_summary = SystemSummary()
+        self.event_driven = event_driven
+        self.coalesce_hall_calls = coalesce_hall_calls
+        self._idle_positioned_for = []
+        self._n_idle_elevators = len([e for e in self.elevators if e.is_idle()])
 
         # set up the initial elevator distribution across the floors.
         self.idle_strategy.position_idle_elevators(self.elevators)
         for e in self.elevators:
             e.current_floor = e.idle_target
+        self._index_elevators()
+        self._replan_all()
+
+    def all_delivered(self) -> bool:
+        """
+        The function checks whether every passenger acknowledged so far has been taken care of: delivered to their
+        destination, or already on it when they requested an elevator.
+        :return: True if no acknowledged passenger is left to deliver.
+        """
+        summary = self.total_time_summary
+        return summary.n + summary.no_action_passengers >= self.acknowledged_passengers
+
+    def dispatch_version(self) -> int:
+        """
+        The function returns the dispatch version of the elevators, which changes whenever an elevator changes in a way
+        that may let the assignment strategy accept a passenger it refused. Strategies with a truthy
+        `retry_on_availability_change` attribute only accept a refused passenger once an elevator changes direction, frees
+        capacity or becomes empty; other strategies are retried on any change to an elevator's targets, direction or
+        passenger count.
+        :return: the sum of the elevators' dispatch or availability versions.
+        """
+        if getattr(self.assignment_strategy, "retry_on_availability_change", False):
+            return sum(e.availability_version for e in self.elevators)
+        return sum(e.dispatch_version for e in self.elevators)
 
     def request_elevator(self, passenger: Passenger):
         """
@@ -87,41 +170,157 @@ class ElevatorController:
         """
         elevator_index = self.assignment_strategy.assign_elevator(passenger, elevators=self.elevators)
         if elevator_index is None:
-            self.pending_passengers.add(passenger)
+            self.pending_passengers.add(passenger, refused_at=self.dispatch_version())
             return
+        self._assign(passenger, elevator_index)
+
+    def request_elevators(self, passengers: List[Passenger]):
+        """
+        The function requests elevators for several passengers at once. If the assignment strategy has an `assign_batch`
+        method, the passengers are assigned together with it. Otherwise, they are requested one by one with
+        `request_elevator`, or one hall call at a time with `request_hall_call` if hall calls are coalesced.
+
+        :param passengers: The passengers requesting an elevator
+        :type passengers: List[Passenger]
+        """
+        assign_batch = getattr(self.assignment_strategy, "assign_batch", None)
+        if assign_batch is None:
+            if self.coalesce_hall_calls:
+                hall_calls: Dict[Tuple[int, int], List[Passenger]] = {}
+                for passenger in passengers:
+                    hall_calls.setdefault((passenger.source_floor, passenger.direction.value), []).append(passenger)
+                for hall_call in hall_calls.values():
+                    self.request_hall_call(hall_call)
+                return
+            for passenger in passengers:
+                self.request_elevator(passenger)
+            return
+        if len(passengers) == 0:
+            return
+        elevator_indexes = assign_batch(passengers, self.elevators)
+        refused = []
+        for passenger, elevator_index in zip(passengers, elevator_indexes):
+            if elevator_index is None:
+                refused.append(passenger)
+            else:
+                self._assign(passenger, elevator_index)
+        if len(refused):
+            refused_at = self.dispatch_version()
+            for passenger in refused:
+                self.pending_passengers.add(passenger, refused_at=refused_at)
+
+    def request_hall_call(self, passengers: List[Passenger]):
+        """
+        The function requests an elevator for a hall call: passengers waiting on the same floor to go in the same
+        direction. The assignment strategy picks an elevator for the first passenger, and the elevator is assigned as many
+        passengers as it has uncommitted room for: its capacity, less the passengers on board and those assigned to it who
+        are still waiting. The passengers left over form a new hall call, until every passenger is assigned or the
+        assignment strategy refuses the hall call or picks an elevator without uncommitted room, in which case its remaining
+        passengers are added to the pending list, to be requested again once an elevator's plan changes. Passengers who
+        don't fit in the elevator when it arrives, e.g. because it picked up passengers of other hall calls on the way,
+        are added to the pending list as usual.
+
+        :param passengers: The passengers of the hall call, in the order in which they requested an elevator
+        :type passengers: List[Passenger]
+        """
+        hall_call: Optional[HallCall] = HallCall(passengers)
+        while hall_call is not None:
+            elevator_index = self.assignment_strategy.assign_elevator(hall_call.passengers[0], elevators=self.elevators)
+            if elevator_index is None:
+                self._add_pending_hall_call(hall_call)
+                return
+            elevator = self.elevators[elevator_index]
+            room = elevator.max_capacity - elevator.passenger_count - self.waiting_passengers.count(elevator_index)
+            if room <= 0:
+                self._add_pending_hall_call(hall_call)
+                return
+            assigned, hall_call = hall_call.split(room)
+            self._assign_hall_call(assigned, elevator_index)
+
+    def _add_pending_hall_call(self, hall_call: HallCall):
+        """
+        The function adds the passengers of a hall call that couldn't be assigned to the pending list.
+        """
+        refused_at = self.dispatch_version()
+        for passenger in hall_call.passengers:
+            self.pending_passengers.add(passenger, refused_at=refused_at)
+
+    def _assign_hall_call(self, hall_call: HallCall, elevator_index: int):
+        """
+        The function assigns every passenger of a hall call to the elevator picked by the assignment strategy, like
+        `_assign` but updating the elevator's targets and indexes once for the whole hall call.
+        """
+        for passenger in hall_call.passengers:
+            if passenger in self.pending_passengers:
+                self.pending_passengers.remove(passenger)
+        elevator = self.elevators[elevator_index]
+        was_idle = elevator.is_idle()
+        was_empty = elevator.is_empty()
+        assert elevator.assign_hall_call(hall_call)
+        self._n_idle_elevators += elevator.is_idle() - was_idle
+        self._idle_set_version += was_empty
+        self._update_indexes(elevator_index)
+        self._replanned.add(elevator_index)
+        self.waiting_passengers.extend(elevator_index, hall_call.source_floor, hall_call.passengers)
+
+    def _assign(self, passenger: Passenger, elevator_index: int):
+        """
+        The function assigns a passenger to the elevator picked by the assignment strategy.
+        """
         if passenger in self.pending_passengers:
             self.pending_passengers.remove(passenger)
-        assert self.elevators[elevator_index].assign(passenger)
-        self.waiting_passengers[elevator_index][passenger.source_floor - 1].append(passenger)
+        elevator = self.elevators[elevator_index]
+        was_idle = elevator.is_idle()
+        was_empty = elevator.is_empty()
+        assert elevator.assign(passenger)
+        self._n_idle_elevators += elevator.is_idle() - was_idle
+        self._idle_set_version += was_empty
+        self._update_indexes(elevator_index)
+        self._replanned.add(elevator_index)
+        self.waiting_passengers.add(elevator_index, passenger.source_floor, passenger)
 
     def step(self):
         """
         The function iterates through each elevator, disembarks passengers on the current floor, embarks waiting passengers,
         moves the elevator, and updates the time.
         """
-        self.idle_strategy.position_idle_elevators(self.elevators)
+        self._position_idle_elevators()
         for i in range(len(self.elevators)):
             elevator = self.elevators[i]
-            while len(self.embarked_passengers[i][elevator.current_floor - 1]):
-                p = self.embarked_passengers[i][elevator.current_floor - 1].pop()
+            for p in reversed(self.embarked_passengers.take(i, elevator.current_floor)):
                 elevator.disembark(p)
                 logger.debug(f"elevator {i} dropped off {p.id} on floor {elevator.current_floor} after {self.time - p.request_time} steps. direction: {elevator.direction} remaining targets: {elevator.targets}")
                 self.total_time_summary.include(self.time - p.request_time)
-            while len(self.waiting_passengers[i][elevator.current_floor - 1]):
-                p = self.waiting_passengers[i][elevator.current_floor - 1].pop()
+            floor = elevator.current_floor
+            passing_through = []
+            for p in reversed(self.waiting_passengers.take(i, floor)):
                 if elevator.embark(p):
                     logger.debug(f"elevator {i} picked up {p.id} on floor {elevator.current_floor} after {self.time - p.request_time} steps heading {elevator.direction} to {p.destination_floor}")
-                    self.embarked_passengers[i][p.destination_floor - 1].append(p)
+                    self.embarked_passengers.add(i, p.destination_floor, p)
                     self.wait_time_summary.include(self.time - p.request_time)
+                elif elevator.can_accommodate() and elevator.direction_value * p.direction_value < 0:
+                    passing_through.append(p)
                 else:
                     self.pending_passengers.add(p)
-            elevator.move()
-        for pending_passenger in sorted(self.pending_passengers, key=lambda p: p.request_time):
-            self.request_elevator(pending_passenger)
+            self._move_elevator(i, elevator.move)
+            if passing_through:
+                self._keep_passed_through_passengers(i, floor, passing_through)
+            next_event_at = self._next_event_at[i]
+            if (next_event_at is not None and next_event_at <= self.time) or \
+                    self._planned_with[i] != (elevator.dispatch_version, elevator.idle_target):
+                self._replanned.add(i)
+        self._elevators_moved()
+        # assignment strategies only accept a passenger they refused once an elevator's dispatch version has changed.
+        if len(self.pending_passengers):
+            self.request_elevators(self.pending_passengers.to_retry(self.dispatch_version()))
         self.time += 1
         self.state_persistence_strategy.persist(self.time, self.elevators)
 
-    def handle_passenger_requests(self, passenger_request_source: Iterator[List[Passenger]]):
+    def handle_passenger_requests(self,
+                                  passenger_request_source: Iterator[List[Passenger]],
+                                  checkpoint_path: Optional[str] = None,
+                                  checkpoint_interval: float = 300.0,
+                                  until: Optional[int] = None):
         """
         The function handles passenger requests by processing each batch of requests, assigning elevators to passengers, and
         delivering passengers to their destinations.
@@ -129,29 +328,562 @@ class ElevatorController:
         :param passenger_request_source: The `passenger_request_source` parameter is an iterator that yields batches of
         passenger requests. Each batch is a list of `Passenger` objects
         :type passenger_request_source: Iterator[List[Passenger]]
+        :param checkpoint_path: The path of a file to which a checkpoint of the run is written every `checkpoint_interval`
+        seconds, so that it can be resumed with `restore` after a crash. Defaults to None, for no checkpoints
+        :type checkpoint_path: Optional[str] (optional)
+        :param checkpoint_interval: The wall-clock time in seconds between checkpoints. Defaults to 300
+        :type checkpoint_interval: float (optional)
+        :param until: The time-step at which to stop the run, e.g. at the end of a warm-up. Handling the rest of the same
+        passenger request source later continues the run. Defaults to None, to run until every passenger is delivered
+        :type until: Optional[int] (optional)
         """
-        self.state_persistence_strategy.persist(self.time, self.elevators)
-        total_passengers = 0
+        passenger_request_source = self._start_passenger_requests(passenger_request_source)
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_interval = checkpoint_interval
+        self._next_checkpoint = monotonic() + checkpoint_interval
+        if self.event_driven:
+            self._handle_passenger_requests_event_driven(passenger_request_source, until)
+            return
+        if self._reached(until):
+            return
         for passenger_batch in passenger_request_source:
-            total_passengers += len(passenger_batch)
-            for passenger in passenger_batch:
-                if passenger.source_floor == passenger.destination_floor:
-                    logger.warn(f"Passenger with id {passenger.id} has the same source and destination floors! "
-                                f"Nothing to do.")
-                    self.wait_time_summary.no_action()
-                    self.total_time_summary.no_action()
-                    continue
-                self.request_elevator(passenger)
+            self.request_passenger_batch(passenger_batch)
             self.step()
-        logger.info(f"all {total_passengers} passengers acknowledged at step {self.time}")
+            self._checkpoint_if_due()
+            if self._reached(until):
+                return
+        logger.info(f"all {self.acknowledged_passengers} passengers acknowledged at step {self.time}")
         while len(self.pending_passengers):
             self.step()
-        logger.info(f"all {total_passengers} passengers assigned to an elevator at step {self.time}")
-        while self.total_time_summary.n < total_passengers:
+            self._checkpoint_if_due()
+            if self._reached(until):
+                return
+        logger.info(f"all {self.acknowledged_passengers} passengers assigned to an elevator at step {self.time}")
+        while not self.all_delivered():
             self.step()
+            self._checkpoint_if_due()
             if self.time % 1000 == 0:
-                logger.info(f"time: {self.time}; embarked_passengers: {sum([len(p) for l in self.embarked_passengers for p in l])}; waiting_passengers: {sum([len(w) for l in self.waiting_passengers for w in l])}; idle_elevators: {len([e for e in self.elevators if e.is_idle()])}", flush=True)
-        logger.info(f"all {total_passengers} passengers delivered to their destinations at step {self.time}")
+                self._log_progress()
+            if self._reached(until):
+                return
+        logger.info(f"all {self.acknowledged_passengers} passengers delivered to their destinations at step {self.time}")
+
+    def _handle_passenger_requests_event_driven(self,
+                                                passenger_request_source: Iterator[List[Passenger]],
+                                                until: Optional[int] = None):
+        """
+        The function handles passenger requests like `handle_passenger_requests`, but only runs a full step at the
+        time-steps where something can happen: a passenger arrives or is pending, or an elevator reaches a floor where it
+        picks up or drops off a passenger, stops, or changes its plan. The quiet time-steps in between are skipped in one go.
+
+        :param passenger_request_source: The `passenger_request_source` parameter is an iterator that yields batches of
+        passenger requests. Each batch is a list of `Passenger` objects
+        :type passenger_request_source: Iterator[List[Passenger]]
+        :param until: The time-step at which to stop the run. Defaults to None, to run until every passenger is delivered
+        :type until: Optional[int] (optional)
+        """
+        if self._reached(until):
+            return
+        quiet_steps = 0
+        for passenger_batch in passenger_request_source:
+            self.acknowledged_passengers += len(passenger_batch)
+            self.handled_passenger_batches += 1
+            if len(passenger_batch) == 0:
+                # empty batches are only counted, so that the next arrival is known before skipping ahead.
+                quiet_steps += 1
+                if self._reached(until, self.time + quiet_steps):
+                    self._run_quiet_steps(quiet_steps)
+                    return
+                continue
+            self._run_quiet_steps(quiet_steps)
+            quiet_steps = 0
+            self._request_batch(passenger_batch)
+            self._full_step()
+            self._checkpoint_if_due()
+            if self._reached(until):
+                return
+        self._run_quiet_steps(quiet_steps)
+        logger.info(f"all {self.acknowledged_passengers} passengers acknowledged at step {self.time}")
+        while len(self.pending_passengers):
+            self._full_step()
+            self._checkpoint_if_due()
+            if self._reached(until):
+                return
+        logger.info(f"all {self.acknowledged_passengers} passengers assigned to an elevator at step {self.time}")
+        while not self.all_delivered():
+            last_time = self.time
+            quiet_steps = self._quiet_steps_available(limit=None if until is None else until - self.time)
+            if quiet_steps is None:
+                undelivered = self.acknowledged_passengers - self.total_time_summary.n - \
+                    self.total_time_summary.no_action_passengers
+                logger.error(f"{undelivered} passengers can't be delivered: "
+                             f"no elevator will reach them at step {self.time}")
+                break
+            if quiet_steps == 0:
+                self._full_step()
+            else:
+                self._skip_steps(quiet_steps)
+            self._checkpoint_if_due()
+            if self.time // 1000 > last_time // 1000:
+                self._log_progress()
+            if self._reached(until):
+                return
+        logger.info(f"all {self.acknowledged_passengers} passengers delivered to their destinations at step {self.time}")
+
+    def _reached(self, until: Optional[int], time: Optional[int] = None) -> bool:
+        """
+        The function checks whether a run stopping at time-step `until` has reached it, at the current time-step or at
+        `time` if given.
+        """
+        return until is not None and (self.time if time is None else time) >= until
+
+    def _start_passenger_requests(self, passenger_request_source: Iterator[List[Passenger]]) -> Iterator[List[Passenger]]:
+        """
+        The function prepares the passenger request source of a run. A run restored from a checkpoint drops the batches
+        handled before the checkpoint, with the source's `skip_batches` hook if it has one, as the random passenger
+        providers do, and sets the random generators back to their state at the checkpoint. Other runs read the source
+        from where it is, and keep counting the passengers and batches read from it.
+
+        :param passenger_request_source: The `passenger_request_source` parameter is an iterator that yields batches of
+        passenger requests
+        :type passenger_request_source: Iterator[List[Passenger]]
+        :return: the passenger request source, positioned at the next batch to handle.
+        """
+        skip_batches = getattr(passenger_request_source, "skip_batches", None)
+        passenger_request_source = iter(passenger_request_source)
+        # the elevators may have been changed since the last run.
+        self._replan_all()
+        if self.time == 0:
+            self.state_persistence_strategy.persist(self.time, self.elevators)
+        if self._restored_random_states is None:
+            return passenger_request_source
+        if skip_batches is not None:
+            skip_batches(self.handled_passenger_batches)
+        else:
+            next(islice(passenger_request_source, self.handled_passenger_batches, self.handled_passenger_batches), None)
+        set_random_states(*self._restored_random_states)
+        self._restored_random_states = None
+        return passenger_request_source
+
+    def _checkpoint_if_due(self):
+        """
+        The function writes a checkpoint of the run if checkpoints are enabled and the checkpoint interval has elapsed.
+        """
+        if self._checkpoint_path is not None and monotonic() >= self._next_checkpoint:
+            self.checkpoint(self._checkpoint_path)
+            self._next_checkpoint = monotonic() + self._checkpoint_interval
+
+    def checkpoint(self, path: str):
+        """
+        The function writes a compact, versioned binary checkpoint of the simulation, from which it can be resumed with
+        `restore`. Only the state of the strategies implementing the `CheckpointingStrategy` hooks of
+        `elevator_system_design.checkpoint` is part of the checkpoint.
+
+        :param path: The path of the checkpoint file, which is replaced atomically
+        :type path: str
+        """
+        write_checkpoint(self, path)
+
+    def restore(self, path: str):
+        """
+        The function restores the simulation from a checkpoint written by `checkpoint`, keeping the strategies of this
+        controller, which should be configured as in the checkpointed run. The strategies implementing the
+        `CheckpointingStrategy` hooks are set back to their state at the checkpoint; the others must not depend on
+        anything learned during the run. Calling `handle_passenger_requests` next with the passenger request source of the
+        checkpointed run, created the same way (e.g. after seeding `numpy.random` with the same seed), continues the run
+        exactly where the checkpoint was taken.
+
+        :param path: The path of the checkpoint file
+        :type path: str
+        """
+        self._restored_random_states = read_checkpoint(self, path)
+        self._n_idle_elevators = len([e for e in self.elevators if e.is_idle()])
+        self._idle_positioned_at = None
+        self._index_elevators()
+        self._replan_all()
+
+    def fork(self,
+             assignment_strategy: Optional[ElevatorAssignmentStrategy] = None,
+             idle_strategy: Optional[ElevatorIdleStrategy] = None,
+             persistence_strategy: ElevatorControllerPersistenceStrategy = NoopPersistenceStrategy()) -> "ElevatorController":
+        """
+        The function clones the simulation in its current state, e.g. at the end of a warm-up run with `until`, so that the
+        clone can continue with other strategies without affecting this simulation. The elevators, passenger lists and
+        summaries are copied, and the immutable passengers are shared. To continue both runs with the same passengers, give
+        each one its own copy of the rest of the passenger request source, e.g. with `itertools.tee`.
+
+        :param assignment_strategy: The assignment strategy of the clone. Defaults to a copy of this simulation's strategy
+        :type assignment_strategy: Optional[ElevatorAssignmentStrategy] (optional)
+        :param idle_strategy: The idle strategy of the clone. Defaults to a copy of this simulation's strategy
+        :type idle_strategy: Optional[ElevatorIdleStrategy] (optional)
+        :param persistence_strategy: The persistence strategy of the clone. Defaults to `NoopPersistenceStrategy`
+        :type persistence_strategy: ElevatorControllerPersistenceStrategy (optional)
+        :return: the clone of the simulation.
+        """
+        clone = copy.copy(self)
+        clone.elevators = [e.copy() for e in self.elevators]
+        clone.waiting_passengers = self.waiting_passengers.copy()
+        clone.embarked_passengers = self.embarked_passengers.copy()
+        clone.pending_passengers = self.pending_passengers.copy()
+        clone.wait_time_summary = self.wait_time_summary.copy()
+        clone.total_time_summary = self.total_time_summary.copy()
+        clone._idle_positioned_for = list(self._idle_positioned_for)
+        clone.assignment_strategy = copy.deepcopy(self.assignment_strategy) if assignment_strategy is None \
+            else assignment_strategy
+        clone.idle_strategy = copy.deepcopy(self.idle_strategy) if idle_strategy is None else idle_strategy
+        clone.state_persistence_strategy = persistence_strategy
+        clone._index_elevators()
+        clone._replan_all()
+        return clone
+
+    def fork_processes(self, branches: Sequence[Callable[["ElevatorController"], Any]]) -> List[Any]:
+        """
+        The function runs each branch on its own clone of the simulation in a child process created with `os.fork`, so the
+        branches run in parallel and only pay for the memory pages they change. Each branch is called with the controller
+        as it is in the child, along with anything else in memory such as the passenger request source, and may change its
+        strategies before continuing the run. Only available on platforms with `os.fork`.
+
+        :param branches: The functions to run in the child processes. Their return values must be picklable
+        :type branches: Sequence[Callable[[ElevatorController], Any]]
+        :return: the return values of the branches, in order.
+        """
+        children = []
+        for branch in branches:
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                exit_code = 1
+                try:
+                    try:
+                        result = (True, branch(self))
+                    except Exception as e:
+                        result = (False, f"{type(e).__name__}: {e}")
+                    with os.fdopen(write_fd, "wb") as f:
+                        pickle.dump(result, f)
+                    exit_code = 0
+                finally:
+                    os._exit(exit_code)
+            os.close(write_fd)
+            children.append((pid, read_fd))
+        results = []
+        errors = []
+        for pid, read_fd in children:
+            with os.fdopen(read_fd, "rb") as f:
+                data = f.read()
+            os.waitpid(pid, 0)
+            succeeded, result = pickle.loads(data) if data else (False, "the branch process died")
+            if not succeeded:
+                errors.append(result)
+            results.append(result)
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(branches)} branches failed: {'; '.join(errors)}")
+        return results
+
+    def request_passenger_batch(self, passenger_batch: List[Passenger]):
+        """
+        The function acknowledges a batch of passengers arriving during the current time-step and requests an elevator
+        for each of them, as `handle_passenger_requests` does for every batch of its source before stepping. Front ends
+        driving the simulation themselves, such as `RealTimeElevatorController`, call it before each `step`.
+
+        :param passenger_batch: The passengers arriving during the current time-step
+        :type passenger_batch: List[Passenger]
+        """
+        self.acknowledged_passengers += len(passenger_batch)
+        self.handled_passenger_batches += 1
+        self._request_batch(passenger_batch)
+
+    def _request_batch(self, passenger_batch: List[Passenger]):
+        """
+        The function requests an elevator for every passenger of a batch, ignoring passengers who are already on their
+        destination floor. If the idle strategy has an `observe_request` method, it observes every passenger requesting an
+        elevator first.
+
+        :param passenger_batch: The `passenger_batch` parameter is a list of `Passenger` objects requesting an elevator
+        during the same time-step
+        :type passenger_batch: List[Passenger]
+        """
+        observe_request = getattr(self.idle_strategy, "observe_request", None)
+        passengers = []
+        for passenger in passenger_batch:
+            if passenger.source_floor == passenger.destination_floor:
+                logger.warning(f"Passenger with id {passenger.id} has the same source and destination floors! "
+                               f"Nothing to do.")
+                self.wait_time_summary.no_action()
+                self.total_time_summary.no_action()
+                continue
+            if observe_request is not None and observe_request(passenger):
+                # the idle targets may have changed, so the idle elevators are positioned again on the next step.
+                self._idle_positioned_at = None
+            passengers.append(passenger)
+        self.request_elevators(passengers)
+
+    def _full_step(self):
+        """
+        The function runs a full step, remembering which elevators were empty when the idle strategy positioned them.
+        """
+        self._idle_positioned_for = [e.is_empty() for e in self.elevators]
+        self.step()
+
+    def _run_quiet_steps(self, n_steps: int):
+        """
+        The function runs `n_steps` time-steps during which no passenger arrives, skipping over them wherever possible.
+
+        :param n_steps: The number of time-steps without passenger arrivals
+        :type n_steps: int
+        """
+        while n_steps > 0:
+            quiet_steps = self._quiet_steps_available(limit=n_steps)
+            if quiet_steps == 0:
+                self._full_step()
+                n_steps -= 1
+            else:
+                self._skip_steps(quiet_steps)
+                n_steps -= quiet_steps
+
+    def _quiet_steps_available(self, limit: Optional[int] = None) -> Optional[int]:
+        """
+        The function computes how many of the upcoming time-steps can be skipped because a full step would do nothing but
+        move the elevators: no passenger is pending, the set of empty elevators is the one the idle strategy last positioned,
+        no elevator stops or reaches a floor where it picks up or drops off a passenger, and the idle targets of an idle
+        strategy with a `steps_until_change` method don't change. The next event of each elevator is kept in a heap and
+        only planned again once the elevator is assigned a passenger or a full step changes its plan, so this doesn't scan
+        every elevator's travel.
+
+        :param limit: The `limit` parameter caps the number of time-steps to look ahead, typically the number of time-steps
+        until the next passenger arrives
+        :type limit: Optional[int]
+        :return: the number of time-steps that can be skipped, 0 if the next time-step needs a full step, or None if nothing
+        will ever happen again.
+        """
+        if len(self.pending_passengers) or [e.is_empty() for e in self.elevators] != self._idle_positioned_for:
+            return 0
+        for i in self._replanned:
+            self._plan_next_event(i)
+        self._replanned.clear()
+        next_events = self._next_events
+        while len(next_events):
+            t, i, stop_ends = next_events[0]
+            if self._next_event_at[i] != t:
+                heappop(next_events)
+            elif stop_ends and t <= self.time:
+                # the elevator's travel after a stop is only known once the stop is over, without a full step.
+                heappop(next_events)
+                self._plan_next_event(i)
+            else:
+                break
+        quiet_steps = limit
+        if len(next_events) and (quiet_steps is None or next_events[0][0] - self.time < quiet_steps):
+            quiet_steps = next_events[0][0] - self.time
+        steps_until_change = getattr(self.idle_strategy, "steps_until_change", None)
+        if steps_until_change is not None and quiet_steps is not None:
+            # the idle elevators are positioned again by a full step once their idle targets change.
+            quiet_steps = min(quiet_steps, steps_until_change(self.time))
+        return quiet_steps
+
+    def _replan_all(self):
+        """
+        The function forgets the planned next event of every elevator, so they are all planned again before skipping ahead.
+        """
+        self._next_event_at = [None] * len(self.elevators)
+        self._planned_with = [(-1, None)] * len(self.elevators)
+        self._next_events = []
+        self._replanned = set(range(len(self.elevators)))
+
+    def _plan_next_event(self, elevator_index: int):
+        """
+        The function plans the time-step at which an elevator next needs a full step: it has passengers to pick up or drop
+        off on its floor, reaches a floor where it does, or stops. Until then, every step only moves it along its planned
+        travel, so the plan holds until the elevator is assigned a passenger or its dispatch version or idle target change.
+        An elevator dwelling at a stop is planned again at the end of the stop, when its next travel is known.
+
+        :param elevator_index: The index of the elevator to plan
+        :type elevator_index: int
+        """
+        elevator = self.elevators[elevator_index]
+        self._planned_with[elevator_index] = (elevator.dispatch_version, elevator.idle_target)
+        steps = self._steps_to_next_event(elevator_index)
+        self._next_event_at[elevator_index] = None if steps is None else self.time + steps
+        if steps is None:
+            return
+        if len(self._next_events) > 4 * len(self.elevators):
+            # drop the stale entries, so the heap doesn't grow with the number of plans.
+            self._next_events = [event for event in self._next_events if self._next_event_at[event[1]] == event[0]]
+            heapify(self._next_events)
+        stop_ends = elevator.current_stop_remaining > 0 and steps == elevator.current_stop_remaining
+        heappush(self._next_events, (self.time + steps, elevator_index, stop_ends))
+
+    def _steps_to_next_event(self, elevator_index: int) -> Optional[int]:
+        """
+        The function computes the number of time-steps until an elevator next needs a full step, as planned by
+        `_plan_next_event`.
+        :return: the number of time-steps, or None if the elevator is resting and nothing will happen to it.
+        """
+        elevator = self.elevators[elevator_index]
+        if self._has_passengers_on_floor(elevator_index, elevator.current_floor):
+            return 0
+        steps_to_stop, floors = elevator.planned_travel()
+        if steps_to_stop == 0:
+            return 0
+        for steps, floor in enumerate(floors, 1):
+            if steps_to_stop is not None and steps >= steps_to_stop:
+                break
+            if self._has_passengers_on_floor(elevator_index, floor):
+                return steps
+        return steps_to_stop
+
+    def _has_passengers_on_floor(self, elevator_index: int, floor: int) -> bool:
+        """
+        The function checks whether an elevator has passengers to pick up or drop off on a floor.
+        """
+        return self.waiting_passengers.has_passengers(elevator_index, floor) or \
+            self.embarked_passengers.has_passengers(elevator_index, floor)
+
+    def _skip_steps(self, n_steps: int):
+        """
+        The function advances the simulation by `n_steps` quiet time-steps, as found by `_quiet_steps_available`, only
+        moving the elevators which aren't resting at their idle target. If the persistence strategy can record skipped
+        time-steps from the elevators' planned travel, every elevator is advanced in a single call. Otherwise the strategy
+        must see the elevators at every skipped time-step, so they are advanced and persisted one time-step at a time, and
+        the skip only saves the embarking, disembarking and reassignment of a full step: persistence strategies without a
+        `persist_skipped` method get little speedup from the event-driven engine.
+
+        :param n_steps: The number of quiet time-steps to skip
+        :type n_steps: int
+        """
+        moving = [i for i, e in enumerate(self.elevators) if e.planned_travel() != (None, range(0))]
+        persist_skipped = getattr(self.state_persistence_strategy, "persist_skipped", None)
+        if persist_skipped is None:
+            for _ in range(n_steps):
+                for i in moving:
+                    self._move_elevator(i, self.elevators[i].advance, 1)
+                self.time += 1
+                self.state_persistence_strategy.persist(self.time, self.elevators)
+            self._elevators_moved()
+            return
+        persist_skipped(self.time, n_steps, self.elevators)
+        for i in moving:
+            self._move_elevator(i, self.elevators[i].advance, n_steps)
+        self.time += n_steps
+        self._elevators_moved()
+
+    def _elevators_moved(self):
+        """
+        The function tells the assignment strategy that the elevators moved, if it has an `elevators_moved` hook, e.g. to
+        refresh a view of the fleet it keeps between assignments.
+        """
+        elevators_moved = getattr(self.assignment_strategy, "elevators_moved", None)
+        if elevators_moved is not None:
+            elevators_moved()
+
+    def _keep_passed_through_passengers(self, elevator_index: int, floor: int, passengers: List[Passenger]):
+        """
+        The function decides what becomes of the passengers an elevator passed by on their floor, heading the other way.
+        Sending them back to the pending list could have them reassigned to another elevator passing by the wrong way,
+        forever, so they keep waiting for the elevator as long as it will still pick them up: it still has their floor as
+        a target in their direction, or it turned around on their floor and can take them on the next step. Otherwise, they
+        are added to the pending list, as any passenger the elevator couldn't take. This keeps a passenger waiting longer
+        than before this rule, so results differ from runs without it wherever an elevator passes a waiting passenger.
+
+        :param elevator_index: The index of the elevator which passed the passengers by
+        :type elevator_index: int
+        :param floor: The floor of the passengers, where the elevator was before it moved
+        :type floor: int
+        :param passengers: The passengers the elevator passed by, in the order in which they were waiting
+        :type passengers: List[Passenger]
+        """
+        elevator = self.elevators[elevator_index]
+        kept = []
+        for p in passengers:
+            if elevator.has_target_with_direction(p.source_floor, p.direction) or \
+                    (elevator.current_floor == floor and elevator.direction_value == p.direction_value):
+                kept.append(p)
+            else:
+                self.pending_passengers.add(p)
+        self.waiting_passengers.extend(elevator_index, floor, reversed(kept))
+
+    def _move_elevator(self, elevator_index: int, move: Callable[..., Any], *args):
+        """
+        The function moves an elevator with one of its movement methods, keeping count of the idle elevators, of changes to
+        the set of empty elevators, and the indexes of the elevators up to date.
+        """
+        elevator = self.elevators[elevator_index]
+        was_idle = elevator.is_idle()
+        was_empty = elevator.is_empty()
+        move(*args)
+        self._n_idle_elevators += elevator.is_idle() - was_idle
+        self._idle_set_version += was_empty != elevator.is_empty()
+        self._update_indexes(elevator_index)
+
+    def _position_idle_elevators(self):
+        """
+        The function asks the idle strategy to position the idle elevators. Idle strategies with a truthy
+        `position_on_idle_change` attribute position the elevators from the set of empty elevators alone, so they are only
+        asked again once an elevator has become empty or stopped being empty since they last positioned them. Idle
+        strategies with a `set_time` method are told the time first, and asked again if their idle targets changed with it.
+        """
+        idle_strategy = self.idle_strategy
+        set_time = getattr(idle_strategy, "set_time", None)
+        if set_time is not None and set_time(self.time):
+            self._idle_positioned_at = None
+        if getattr(idle_strategy, "position_on_idle_change", False) and self._idle_positioned_at is not None:
+            positioned_by, idle_set_version = self._idle_positioned_at
+            if positioned_by is idle_strategy and idle_set_version == self._idle_set_version:
+                return
+        idle_strategy.position_idle_elevators(self.elevators)
+        self._idle_positioned_at = (idle_strategy, self._idle_set_version)
+
+    def _index_elevators(self):
+        """
+        The function builds the indexes of the elevators by floor and by target floor which the assignment strategy uses,
+        as told by its `use_elevator_floor_index` and `use_elevator_stop_index` hooks, and hands them to the strategy.
+        """
+        use_elevator_floor_index = getattr(self.assignment_strategy, "use_elevator_floor_index", None)
+        self._elevator_floor_index = None
+        if use_elevator_floor_index is not None:
+            self._elevator_floor_index = ElevatorFloorIndex(self.elevators)
+            use_elevator_floor_index(self._elevator_floor_index)
+        use_elevator_stop_index = getattr(self.assignment_strategy, "use_elevator_stop_index", None)
+        self._elevator_stop_index = None
+        if use_elevator_stop_index is not None:
+            self._elevator_stop_index = ElevatorStopIndex(self.elevators)
+            use_elevator_stop_index(self._elevator_stop_index)
+
+    def _update_indexes(self, elevator_index: int):
+        """
+        The function updates an elevator's entries in the indexes of the elevators, after it moved or was assigned a
+        passenger.
+        """
+        if self._elevator_floor_index is not None:
+            self._elevator_floor_index.update(elevator_index)
+        if self._elevator_stop_index is not None:
+            self._elevator_stop_index.update(elevator_index)
+
+    def _log_progress(self):
+        """
+        The function logs how many passengers are embarked and waiting, and how many elevators are idle.
+        """
+        metrics = self.metrics()
+        logger.info(f"time: {self.time}; embarked_passengers: {metrics['embarked_passengers']}; waiting_passengers: {metrics['waiting_passengers']}; idle_elevators: {metrics['idle_elevators']}")
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        The function returns a snapshot of the live counters of the simulation. The counters are kept up to date as
+        passengers and elevators change state, so this is cheap enough to be polled at any frequency, including from a
+        monitoring thread or a callback while `handle_passenger_requests` is running. A snapshot taken from another thread
+        in the middle of a step may mix counters from before and after parts of that step.
+        :return: a dictionary with the current time, the number of passengers waiting for their assigned elevator, embarked,
+        pending an assignment, delivered and without anything to do, and the number of idle elevators.
+        """
+        return {
+            "time": self.time,
+            "waiting_passengers": len(self.waiting_passengers),
+            "embarked_passengers": len(self.embarked_passengers),
+            "pending_passengers": len(self.pending_passengers),
+            "delivered_passengers": self.total_time_summary.n,
+            "no_action_passengers": self.total_time_summary.no_action_passengers,
+            "idle_elevators": self._n_idle_elevators,
+        }
 
     def get_stats(self):
         """
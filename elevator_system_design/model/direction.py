@@ -5,6 +5,9 @@ class Direction(Enum):
     UP = 1
     DOWN = -1
     IDLE = 0
+    # members are singletons, so hashing them by identity agrees with their equality, and is much cheaper than the enum's
+    # default hash of the member's name wherever directions are looked up in a dict.
+    __hash__ = object.__hash__
 
     def reverse(self) -> "Direction":
         """
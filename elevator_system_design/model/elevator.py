@@ -1,8 +1,10 @@
+from copy import copy
 from heapq import heappop, heappush
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 from elevator_system_design.log import logger
 from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.hall_call import HallCall
 from elevator_system_design.model.passenger import Passenger
 
 
@@ -28,16 +30,44 @@ class InvalidEmbarkRequest(Exception):
         return json.dumps(self.__dict__, indent=2)
 
 
+# the directions by their value, so that `_DIRECTIONS[direction]` maps an integer direction back to its `Direction`.
+_DIRECTIONS = (Direction.IDLE, Direction.UP, Direction.DOWN)
+# the value of each direction, looked up once rather than through the enum's `value` on every call.
+_DIRECTION_VALUES = {direction: direction.value for direction in Direction}
+
+
 class Elevator:
+    """
+    An elevator's state. Fleets of thousands of elevators are simulated at once, so the state is kept in slots rather than
+    an attribute dict, and the direction is stored as its integer value (1 up, -1 down, 0 idle), which the elevator's own
+    arithmetic uses directly. The `direction` property converts it to and from a `Direction`.
+    """
+    __slots__ = ("num_floors", "max_capacity", "stop_time", "targets", "_target_floors", "_target_max", "passenger_count",
+                 "current_floor", "current_stop_remaining", "_direction", "idle_target", "dispatch_version",
+                 "availability_version", "state_version")
     num_floors: int
     max_capacity: int
     stop_time: int
     targets: Tuple[List[int], List[int], List[int]]
-    passenger_count: int = 0
-    current_floor: int = 1
-    current_stop_remaining: int = 0
-    direction: Direction = Direction.IDLE
-    idle_target: Optional[int] = None
+    # the floors of each heap of targets, so that a floor is only pushed once per sweep and can be looked up in O(1).
+    _target_floors: Tuple[Set[int], Set[int], Set[int]]
+    # the largest signed floor of each heap of targets, or None if it is empty.
+    _target_max: List[Optional[int]]
+    passenger_count: int
+    current_floor: int
+    current_stop_remaining: int
+    # the value of the elevator's `Direction`.
+    _direction: int
+    idle_target: Optional[int]
+    # incremented whenever the targets, direction or passenger count change, i.e. whenever an assignment strategy may
+    # accept a passenger it refused before.
+    dispatch_version: int
+    # incremented whenever the elevator may become available to more passengers: its direction changes, a passenger
+    # disembarks, or it becomes empty.
+    availability_version: int
+    # incremented whenever the dispatch version or the current floor change, i.e. whenever the elevator's state as seen by
+    # an assignment strategy may have changed.
+    state_version: int
 
     def __init__(self, num_floors: int, max_capacity: int, stop_time: int = 0):
         """
@@ -57,20 +87,82 @@ class Elevator:
         self.num_floors = num_floors
         self.max_capacity = max_capacity
         self.targets = ([], [], [])
+        self._target_floors = (set(), set(), set())
+        self._target_max = [None, None, None]
+        self.passenger_count = 0
+        self.current_floor = 1
+        self.current_stop_remaining = 0
+        self._direction = 0
+        self.idle_target = None
+        self.dispatch_version = 0
+        self.availability_version = 0
+        self.state_version = 0
+
+    @property
+    def direction(self) -> Direction:
+        return _DIRECTIONS[self._direction]
+
+    @direction.setter
+    def direction(self, direction: Direction):
+        self._direction = direction.value
+
+    @property
+    def direction_value(self) -> int:
+        """
+        The elevator's direction as an integer: 1 when going up, -1 when going down and 0 when idle. It is cheaper to read
+        than `direction.value`, for strategies which compare it with every elevator.
+        """
+        return self._direction
+
+    def set_targets(self, targets: Tuple[List[int], List[int], List[int]]):
+        """
+        The function replaces the elevator's targets, e.g. when restoring a saved elevator.
+
+        :param targets: The heaps of signed target floors of the next sweep in the current direction, the sweep in the
+        opposite direction and the current sweep
+        :type targets: Tuple[List[int], List[int], List[int]]
+        """
+        self.targets = targets
+        self._target_floors = (set(targets[0]), set(targets[1]), set(targets[2]))
+        self._target_max = [max(heap) if heap else None for heap in targets]
+        self.state_version += 1
+
+    def _push_target(self, sweep: int, target: int):
+        """
+        The function adds a signed target floor to one of the heaps of targets, unless that sweep already stops there.
+        """
+        floors = self._target_floors[sweep]
+        if target not in floors:
+            floors.add(target)
+            heappush(self.targets[sweep], target)
+            target_max = self._target_max[sweep]
+            if target_max is None or target > target_max:
+                self._target_max[sweep] = target
+
+    def copy(self) -> "Elevator":
+        """
+        The function copies the elevator, so that the copy can move and take passengers independently of this elevator.
+        :return: a copy of the elevator.
+        """
+        elevator = copy(self)
+        elevator.targets = tuple(list(heap) for heap in self.targets)
+        elevator._target_floors = tuple(set(floors) for floors in self._target_floors)
+        elevator._target_max = list(self._target_max)
+        return elevator
 
     def is_empty(self) -> bool:
         """
         The function `is_empty` checks if all the elevator is empty and has no target floors.
         :return: a boolean value indicating whether the elevator has any target floors.
         """
-        return sum([len(h) for h in self.targets]) == 0
+        return not any(self.targets)
 
     def is_idle(self) -> bool:
         """
         The function checks if the elevator is idle.
         :return: a boolean value, specifically whether the direction is equal to the IDLE direction.
         """
-        return self.direction == Direction.IDLE
+        return self._direction == 0
 
     def can_accommodate(self) -> bool:
         """
@@ -91,8 +183,9 @@ class Elevator:
         :type direction: Direction
         :return: a boolean value.
         """
-        target_with_dir = target * direction.value
-        return any([target_with_dir in h for h in self.targets])
+        target_with_dir = target * _DIRECTION_VALUES[direction]
+        cur_dir_below_cur_floor, opposite_dir, cur_dir = self._target_floors
+        return target_with_dir in cur_dir or target_with_dir in opposite_dir or target_with_dir in cur_dir_below_cur_floor
 
     def distance_from(self, target: int, direction: Direction) -> int:
         """
@@ -107,40 +200,85 @@ class Elevator:
         :type direction: Direction
         :return: an integer value, which represents the distance from the current floor to the target floor.
         """
-        if self.direction == Direction.IDLE:
+        elevator_direction = self._direction
+        if elevator_direction == 0:
             return abs(target - self.current_floor)
-        target_with_dir = target * direction.value
-        if self.current_floor * self.direction.value < target_with_dir:
-            return abs(target - self.current_floor) + sum({1 for t in self.targets[-1] if t <= target_with_dir}) * self.stop_time
-        end_of_current_sweep = abs(max(abs(max(self.targets[-1]) if self.targets[-1] else 0) * self.direction.value, abs(max(self.targets[1]) if self.targets[1] else 0) * self.direction.value))
-        distance_to_turn = abs(self.current_floor - abs(end_of_current_sweep)) + len(set(self.targets[-1])) * self.stop_time
-        if direction != self.direction:
-            distance_from_turn_to_target = abs(abs(end_of_current_sweep) - target) + sum({1 for t in self.targets[1] if t <= target_with_dir}) * self.stop_time
+        target_direction = _DIRECTION_VALUES[direction]
+        target_with_dir = target * target_direction
+        cur_dir_below_cur_floor, opposite_dir, cur_dir = self.targets
+        # the heaps are min-heaps whose floors are distinct and whose largest floor is cached, so each term is O(1).
+        stops_in_cur_dir = 1 if cur_dir and cur_dir[0] <= target_with_dir else 0
+        if self.current_floor * elevator_direction < target_with_dir:
+            return abs(target - self.current_floor) + stops_in_cur_dir * self.stop_time
+        max_below_cur_floor, max_opposite_dir, max_cur_dir = self._target_max
+        end_of_current_sweep = abs(max(abs(max_cur_dir or 0) * elevator_direction, abs(max_opposite_dir or 0) * elevator_direction))
+        distance_to_turn = abs(self.current_floor - end_of_current_sweep) + len(self._target_floors[-1]) * self.stop_time
+        if target_direction != elevator_direction:
+            stops_in_opposite_dir = 1 if opposite_dir and opposite_dir[0] <= target_with_dir else 0
+            distance_from_turn_to_target = abs(end_of_current_sweep - target) + stops_in_opposite_dir * self.stop_time
             return distance_to_turn + distance_from_turn_to_target
-        end_of_next_sweep = abs(max(abs(max(self.targets[0]) if self.targets[0] else 0) * self.direction.value, abs(max(self.targets[1]) if self.targets[1] else 0) * self.direction.value))
-        distance_to_next_turn = abs(abs(end_of_next_sweep) - abs(end_of_current_sweep)) + len(set(self.targets[1])) * self.stop_time
-        distance_from_next_turn_to_target = abs(abs(end_of_next_sweep) - target) + sum({1 for t in self.targets[0] if t <= target_with_dir}) * self.stop_time
+        end_of_next_sweep = abs(max(abs(max_below_cur_floor or 0) * elevator_direction, abs(max_opposite_dir or 0) * elevator_direction))
+        distance_to_next_turn = abs(end_of_next_sweep - end_of_current_sweep) + len(self._target_floors[1]) * self.stop_time
+        stops_below_cur_floor = 1 if cur_dir_below_cur_floor and cur_dir_below_cur_floor[0] <= target_with_dir else 0
+        distance_from_next_turn_to_target = abs(end_of_next_sweep - target) + stops_below_cur_floor * self.stop_time
         return distance_to_turn + distance_to_next_turn + distance_from_next_turn_to_target
 
+    def planned_travel(self) -> Tuple[Optional[int], range]:
+        """
+        The function describes what the elevator will do over the next time-steps if nothing external changes it. While
+        cruising toward the head of its current sweep, dwelling at a stop or drifting toward its idle target, each call to
+        `move` only shifts the elevator by one floor or counts down the remaining stop time, so the upcoming time-steps can
+        be predicted without simulating them.
+        :return: a tuple of the number of time-steps until the elevator's next stop (0 if its next step can't be predicted,
+        None if it is resting and won't stop again until a passenger is assigned), and the floors it will be on at the start
+        of each of the predicted time-steps.
+        """
+        cur_dir = self.targets[-1]
+        direction = self._direction
+        if self.is_empty() and direction == 0 and self.current_stop_remaining == 0:
+            if self.idle_target is None:
+                return None, range(0)
+            idle_target = max(1, min(self.num_floors, self.idle_target))
+            step = 1 if idle_target > self.current_floor else -1
+            return None, range(self.current_floor + step, idle_target + step, step)
+        if len(cur_dir) == 0 or cur_dir[0] <= self.current_floor * direction:
+            return 0, range(0)
+        if self.current_stop_remaining > 0:
+            return self.current_stop_remaining, range(0)
+        if direction == 0 or cur_dir[0] * direction < 0:
+            return 0, range(0)
+        ticks_to_stop = cur_dir[0] - self.current_floor * direction
+        return ticks_to_stop, range(self.current_floor + direction, self.current_floor + direction * (ticks_to_stop + 1), direction)
+
     def adjust_targets(self):
         """
         The function adjusts the elevator's target floors based on its current direction and floor.
         """
         cur_dir_below_cur_floor, opposite_dir, cur_dir = self.targets
+        direction = self._direction
         for _ in range(3):
-            while len(cur_dir) and cur_dir[0] <= self.current_floor * self.direction.value:
+            while len(cur_dir) and cur_dir[0] <= self.current_floor * direction:
                 self.current_stop_remaining = self.stop_time
-                heappop(cur_dir)
+                self._target_floors[-1].discard(heappop(cur_dir))
+                if not cur_dir:
+                    self._target_max[-1] = None
+                self.dispatch_version += 1
             if len(cur_dir) > 0:
                 break
-            opposite_start = self.current_floor * -self.direction.value
+            opposite_start = self.current_floor * -direction
             if len(opposite_dir):
-                opposite_start = opposite_dir[0] * -self.direction.value
-            if (opposite_start - self.current_floor) * self.direction.value > 0:
-                heappush(cur_dir, opposite_start * self.direction.value)
+                opposite_start = opposite_dir[0] * -direction
+            if (opposite_start - self.current_floor) * direction > 0:
+                self._push_target(-1, opposite_start * direction)
+                self.dispatch_version += 1
             else:
-                self.direction = self.direction.reverse()
+                if cur_dir_below_cur_floor or opposite_dir:
+                    self.dispatch_version += 1
+                direction = -direction
+                self._direction = direction
                 self.targets = ([], cur_dir_below_cur_floor, opposite_dir)
+                self._target_floors = (set(), self._target_floors[0], self._target_floors[1])
+                self._target_max = [None, self._target_max[0], self._target_max[1]]
                 cur_dir_below_cur_floor, opposite_dir, cur_dir = self.targets
 
     def move(self):
@@ -149,6 +287,20 @@ class Elevator:
         This can be considered to be the movement achieved in one time-step for this elevator.
         :return: The code does not explicitly return anything.
         """
+        direction = self._direction
+        was_empty = self.is_empty()
+        floor, dispatch_version = self.current_floor, self.dispatch_version
+        self._move()
+        if self._direction != direction or (not was_empty and self.is_empty()):
+            self.dispatch_version += 1
+            self.availability_version += 1
+        if self.current_floor != floor or self.dispatch_version != dispatch_version:
+            self.state_version += 1
+
+    def _move(self):
+        """
+        The function moves the elevator by one time-step, as described in `move`.
+        """
         self.adjust_targets()
         cur_dir_below_cur_floor, opposite_dir, cur_dir = self.targets
         if self.current_stop_remaining > 0:
@@ -156,7 +308,7 @@ class Elevator:
             return
 
         if self.is_empty():
-            self.direction = Direction.IDLE
+            self._direction = 0
             if self.idle_target is None:
                 return
             if self.is_empty() and self.idle_target < self.current_floor:
@@ -164,12 +316,50 @@ class Elevator:
             if self.is_empty() and self.idle_target > self.current_floor:
                 self.current_floor = max(1, min(self.num_floors, self.current_floor + 1))
         elif cur_dir[0] > 0:
-            self.direction = Direction.UP
+            self._direction = 1
         elif cur_dir[0] < 0:
-            self.direction = Direction.DOWN
-        self.current_floor = max(1, min(self.num_floors, self.current_floor + self.direction.value))
+            self._direction = -1
+        self.current_floor = max(1, min(self.num_floors, self.current_floor + self._direction))
         self.adjust_targets()
 
+    def advance(self, dt: int) -> Optional[int]:
+        """
+        The function advances the elevator by `dt` time-steps, with the same outcome as calling `move` `dt` times. Rather
+        than moving one floor at a time, it computes where the elevator lands from the head of its current sweep, the
+        remaining stop time and its idle target, so its cost grows with the number of stops instead of the distance
+        travelled.
+
+        :param dt: The `dt` parameter is the number of time-steps to advance the elevator by
+        :type dt: int
+        :return: the number of time-steps until the elevator's next stop, as returned by `planned_travel`.
+        """
+        floor, dispatch_version = self.current_floor, self.dispatch_version
+        while dt > 0:
+            steps_to_stop, floors = self.planned_travel()
+            if steps_to_stop is None:
+                if len(floors) > 0:
+                    self.current_floor = floors[min(dt, len(floors)) - 1]
+                break
+            if steps_to_stop == 0:
+                self.move()
+                dt -= 1
+            elif self.current_stop_remaining > 0:
+                elapsed = min(dt, steps_to_stop)
+                self.current_stop_remaining -= elapsed
+                dt -= elapsed
+            elif dt >= steps_to_stop:
+                # cruise to the floor just before the stop, and let `move` handle arriving there.
+                if steps_to_stop > 1:
+                    self.current_floor = floors[-2]
+                self.move()
+                dt -= steps_to_stop
+            else:
+                self.current_floor = floors[dt - 1]
+                dt = 0
+        if self.current_floor != floor or self.dispatch_version != dispatch_version:
+            self.state_version += 1
+        return self.planned_travel()[0]
+
     def assign(self, passenger: Passenger) -> bool:
         """
         The `assign` function assigns a passenger to an elevator and updates the elevator's targets based on the passenger's
@@ -179,25 +369,61 @@ class Elevator:
         :type passenger: Passenger
         :return: a boolean value, which is always True.
         """
-        cur_dir_below_cur_floor, opposite_dir, cur_dir = self.targets
+        direction = self._direction
+        passenger_direction = passenger.direction_value
         if self.is_empty() and passenger.source_floor > self.current_floor:
-            self.direction = Direction.UP
-            heappush(cur_dir, passenger.source_floor)
+            self._direction = 1
+            self._push_target(-1, passenger.source_floor)
         elif self.is_empty() and passenger.source_floor < self.current_floor:
-            self.direction = Direction.DOWN
-            heappush(cur_dir, passenger.source_floor * -1)
-
-        if passenger.direction.value * self.direction.value < 0:
-            heappush(opposite_dir, passenger.source_floor * passenger.direction.value)
-            heappush(opposite_dir, passenger.destination_floor * passenger.direction.value)
-        elif (passenger.source_floor - self.current_floor) * self.direction.value <= 0:
-            heappush(cur_dir_below_cur_floor, passenger.source_floor * passenger.direction.value)
-            heappush(cur_dir_below_cur_floor, passenger.destination_floor * passenger.direction.value)
-        else:
-            heappush(cur_dir, passenger.source_floor * passenger.direction.value)
-            heappush(cur_dir, passenger.destination_floor * passenger.direction.value)
+            self._direction = -1
+            self._push_target(-1, passenger.source_floor * -1)
+        elif self.is_empty() and direction == 0:
+            # an idle elevator waiting on the passenger's floor takes their direction, otherwise `embark` would refuse them
+            # on every step while it stays idle.
+            self._direction = passenger_direction
+
+        sweep = self._sweep_of(passenger)
+        self._push_target(sweep, passenger.source_floor * passenger_direction)
+        self._push_target(sweep, passenger.destination_floor * passenger_direction)
+        self.dispatch_version += 1
+        self.state_version += 1
+        if self._direction != direction:
+            self.availability_version += 1
+        return True
+
+    def assign_hall_call(self, hall_call: HallCall) -> bool:
+        """
+        The function assigns every passenger of a hall call to the elevator at once, with the same targets as assigning them
+        one after the other with `assign`, but the hall call's floor and each of its passengers' destination floors are
+        only pushed once, and the elevator's versions are only incremented once per hall call.
+
+        :param hall_call: The hall call to assign
+        :type hall_call: HallCall
+        :return: a boolean value, which is always True.
+        """
+        passengers = hall_call.passengers
+        self.assign(passengers[0])
+        if len(passengers) > 1:
+            # the passengers share their floor and direction, so they all go in the sweep of the first one.
+            sweep = self._sweep_of(passengers[0])
+            for destination_floor in dict.fromkeys(p.destination_floor for p in passengers[1:]):
+                self._push_target(sweep, destination_floor * passengers[0].direction_value)
+            self.dispatch_version += 1
+            self.state_version += 1
         return True
 
+    def _sweep_of(self, passenger: Passenger) -> int:
+        """
+        The function finds the heap of targets in which an assigned passenger's floors go: 1 if the passenger goes the
+        other way, 0 if the elevator is past their floor in their direction, and -1 for the current sweep.
+        """
+        passenger_direction = passenger.direction_value
+        if passenger_direction * self._direction < 0:
+            return 1
+        if (passenger.source_floor - self.current_floor) * self._direction <= 0:
+            return 0
+        return -1
+
     def embark(self, passenger: Passenger) -> bool:
         """
         The `embark` function checks if the elevator can accommodate a passenger, if it is on the correct floor and
@@ -217,11 +443,13 @@ class Elevator:
         if not self.can_accommodate():
             logger.debug(f"Elevator is too full to embark passenger {passenger.id}")
             return False
-        if passenger.direction != self.direction:
+        if passenger.direction_value != self._direction:
             logger.debug(f"Elevator is moving in the wrong direction to embark passenger {passenger.id}: "
                          f"passenger direction: {passenger.direction}; elevator direction: {self.direction}")
             return False
         self.passenger_count += 1
+        self.dispatch_version += 1
+        self.state_version += 1
         return True
 
     def disembark(self, passenger: Passenger):
@@ -238,3 +466,6 @@ class Elevator:
                                           passenger_dest_floor=passenger.destination_floor,
                                           current_elevator_floor=self.current_floor)
         self.passenger_count -= 1
+        self.dispatch_version += 1
+        self.availability_version += 1
+        self.state_version += 1
@@ -0,0 +1,128 @@
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+from elevator_system_design.model.elevator import Elevator
+
+EMPTY = "empty"
+IDLE = "idle"
+UP = "up"
+DOWN = "down"
+_DIRECTION_STATES = {0: IDLE, 1: UP, -1: DOWN}
+
+
+class ElevatorFloorIndex:
+    """
+    The elevators of a fleet ordered by their current floor, in one sorted list per state: empty, and idle, going up or
+    going down, so that the nearest elevator in a state can be found by bisection instead of scanning the fleet. An
+    elevator is in one of the idle, up and down lists, and also in the empty list while it has no targets. The owner of
+    the index must call `update` whenever an elevator moves or is assigned a passenger.
+    """
+    # the elevators the index describes, so that users can check that it is the index of their elevators.
+    elevators: List[Elevator]
+    # (floor, elevator index) pairs, sorted, for each state.
+    _floors: Dict[str, List[Tuple[int, int]]]
+    # the (floor, direction state, is empty) key under which each elevator is indexed.
+    _keys: List[Tuple[int, str, bool]]
+
+    def __init__(self, elevators: List[Elevator]):
+        self.elevators = elevators
+        self._floors = {EMPTY: [], IDLE: [], UP: [], DOWN: []}
+        self._keys = []
+        for i, elevator in enumerate(elevators):
+            key = self._key(elevator)
+            self._keys.append(key)
+            self._add(i, key)
+        for floors in self._floors.values():
+            floors.sort()
+
+    def __reduce__(self):
+        # the index must be kept up to date by the owner of the elevators, so copies start out describing no elevators.
+        return ElevatorFloorIndex, ([],)
+
+    @staticmethod
+    def _key(elevator: Elevator) -> Tuple[int, str, bool]:
+        return elevator.current_floor, _DIRECTION_STATES[elevator.direction_value], elevator.is_empty()
+
+    def _add(self, i: int, key: Tuple[int, str, bool]):
+        floor, direction_state, is_empty = key
+        insort(self._floors[direction_state], (floor, i))
+        if is_empty:
+            insort(self._floors[EMPTY], (floor, i))
+
+    def _remove(self, i: int, key: Tuple[int, str, bool]):
+        floor, direction_state, is_empty = key
+        floors = self._floors[direction_state]
+        del floors[bisect_left(floors, (floor, i))]
+        if is_empty:
+            floors = self._floors[EMPTY]
+            del floors[bisect_left(floors, (floor, i))]
+
+    def update(self, elevator_index: int):
+        """
+        The function moves an elevator to its place for its current floor, direction and targets.
+
+        :param elevator_index: The index of the elevator which moved or was assigned a passenger
+        :type elevator_index: int
+        """
+        key = self._key(self.elevators[elevator_index])
+        if key != self._keys[elevator_index]:
+            self._remove(elevator_index, self._keys[elevator_index])
+            self._add(elevator_index, key)
+            self._keys[elevator_index] = key
+
+    def nearest(self,
+                state: str,
+                floor: int,
+                below: bool = True,
+                at: bool = True,
+                above: bool = True,
+                accept: Optional[Callable[[Elevator], bool]] = None) -> Optional[Tuple[int, int]]:
+        """
+        The function finds the elevator in a state which is nearest to a floor, among the elevators accepted by a
+        predicate. Elevators which aren't accepted are skipped one by one, so the predicate should reject few of the
+        elevators near the floor.
+
+        :param state: The state of the elevators to look for: `EMPTY`, `IDLE`, `UP` or `DOWN`
+        :type state: str
+        :param floor: The floor to look around
+        :type floor: int
+        :param below: Whether to consider the elevators below the floor. Defaults to True
+        :type below: bool (optional)
+        :param at: Whether to consider the elevators on the floor. Defaults to True
+        :type at: bool (optional)
+        :param above: Whether to consider the elevators above the floor. Defaults to True
+        :type above: bool (optional)
+        :param accept: A predicate which the elevator must satisfy. Defaults to accepting every elevator
+        :type accept: Optional[Callable[[Elevator], bool]] (optional)
+        :return: the distance to the nearest elevator and its index, with the lowest index among equally near elevators,
+        or None if there is no such elevator.
+        """
+        floors = self._floors[state]
+        start = bisect_left(floors, (floor, -1))
+        end = bisect_left(floors, (floor + 1, -1))
+        if at:
+            for j in range(start, end):
+                i = floors[j][1]
+                if accept is None or accept(self.elevators[i]):
+                    return 0, i
+        nearest = None
+        if above:
+            for j in range(end, len(floors)):
+                elevator_floor, i = floors[j]
+                if accept is None or accept(self.elevators[i]):
+                    nearest = elevator_floor - floor, i
+                    break
+        if below:
+            nearest_floor = None
+            for j in range(start - 1, -1, -1):
+                elevator_floor, i = floors[j]
+                if nearest_floor is not None and elevator_floor != nearest_floor:
+                    break
+                if nearest is not None and floor - elevator_floor > nearest[0]:
+                    break
+                if accept is None or accept(self.elevators[i]):
+                    # elevators on the same floor are visited by decreasing index, so keep looking for a lower one.
+                    nearest_floor = elevator_floor
+                    if nearest is None or (floor - elevator_floor, i) < nearest:
+                        nearest = floor - elevator_floor, i
+        return nearest
@@ -0,0 +1,79 @@
+from typing import AbstractSet, Dict, FrozenSet, List, Set
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.elevator import Elevator
+
+_NO_ELEVATORS: FrozenSet[int] = frozenset()
+
+
+class ElevatorStopIndex:
+    """
+    The elevators of a fleet by the signed floors they plan to stop at, so that the elevators which already stop at a floor
+    in a direction are found with a dictionary lookup instead of asking every elevator. The owner of the index must call
+    `update` whenever an elevator moves or is assigned a passenger. An elevator's targets are only read again when its
+    `dispatch_version` has changed.
+    """
+    # the elevators the index describes, so that users can check that it is the index of their elevators.
+    elevators: List[Elevator]
+    # the elevators with no targets.
+    empty_elevators: Set[int]
+    # the elevators with each signed target floor.
+    _stopping_at: Dict[int, Set[int]]
+    # the signed target floors of each elevator, and the dispatch version they were read at.
+    _targets: List[FrozenSet[int]]
+    _dispatch_versions: List[int]
+
+    def __init__(self, elevators: List[Elevator]):
+        self.elevators = elevators
+        self.empty_elevators = set()
+        self._stopping_at = {}
+        self._targets = [frozenset()] * len(elevators)
+        self._dispatch_versions = [-1] * len(elevators)
+        for i in range(len(elevators)):
+            self.empty_elevators.add(i)
+            self.update(i)
+
+    def __reduce__(self):
+        # the index must be kept up to date by the owner of the elevators, so copies start out describing no elevators.
+        return ElevatorStopIndex, ([],)
+
+    def update(self, elevator_index: int):
+        """
+        The function brings an elevator's entries up to date with its targets.
+
+        :param elevator_index: The index of the elevator which moved or was assigned a passenger
+        :type elevator_index: int
+        """
+        elevator = self.elevators[elevator_index]
+        if elevator.dispatch_version == self._dispatch_versions[elevator_index]:
+            return
+        self._dispatch_versions[elevator_index] = elevator.dispatch_version
+        old_targets = self._targets[elevator_index]
+        targets = frozenset().union(*elevator.targets)
+        if targets == old_targets:
+            return
+        self._targets[elevator_index] = targets
+        for target in old_targets - targets:
+            stopping_at = self._stopping_at[target]
+            stopping_at.discard(elevator_index)
+            if not stopping_at:
+                del self._stopping_at[target]
+        for target in targets - old_targets:
+            self._stopping_at.setdefault(target, set()).add(elevator_index)
+        if targets:
+            self.empty_elevators.discard(elevator_index)
+        else:
+            self.empty_elevators.add(elevator_index)
+
+    def elevators_stopping_at(self, target: int, direction: Direction) -> AbstractSet[int]:
+        """
+        The function finds the elevators which already have a target in the provided direction, as
+        `Elevator.has_target_with_direction` does for one elevator.
+
+        :param target: The target floor
+        :type target: int
+        :param direction: The direction in which the target floor is served
+        :type direction: Direction
+        :return: the indexes of the elevators, which must not be modified.
+        """
+        return self._stopping_at.get(target * direction.value, _NO_ELEVATORS)
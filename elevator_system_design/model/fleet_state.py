@@ -0,0 +1,186 @@
+from typing import List, Optional
+
+import numpy as np
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.elevator import Elevator
+
+# the head of an empty heap of targets, which is never at or before any target.
+_NO_TARGET = np.iinfo(np.int64).max
+
+
+class FleetState:
+    """
+    A NumPy view of the state of a fleet of elevators, with one row per elevator, so that assignment strategies can score
+    every elevator at once. The rows derived from an elevator's targets and passenger count are only rebuilt when its
+    `dispatch_version` changes. The current floors and directions are read from every elevator on each update, unless
+    the view is told when the elevators move with `elevators_moved`: from then on, they are only read from every elevator
+    after a move, and in between from the elevators marked with `mark_changed`.
+    """
+    current_floor: np.ndarray
+    direction: np.ndarray
+    # the number of passengers each elevator can still take.
+    headroom: np.ndarray
+    stop_time: np.ndarray
+    # the smallest signed floor of each heap of targets, with one row per heap in the order of `Elevator.targets`, or
+    # `_NO_TARGET` if it is empty.
+    sweep_heads: np.ndarray
+    # the largest signed floor of each heap of targets, or 0 if it is empty.
+    sweep_ends: np.ndarray
+    # the number of stops of each heap of targets.
+    stop_counts: np.ndarray
+    # whether each elevator has a target on each signed floor, offset by `num_floors` so that floor -num_floors is column 0.
+    stops: np.ndarray
+    num_floors: int
+    _dispatch_versions: np.ndarray
+    _elevators: Optional[List[Elevator]]
+    # whether every move of the elevators is reported with `elevators_moved`.
+    _tracking_moves: bool
+    # the elevators which may have changed since the last update, or None if any of them may have.
+    _changed: Optional[List[int]]
+
+    def __init__(self):
+        self._elevators = None
+        self._tracking_moves = False
+        self._changed = None
+
+    def __getstate__(self):
+        # the arrays describe the elevators of one controller, so copies rebuild them from the elevators they are given.
+        return {"_tracking_moves": self._tracking_moves}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._tracking_moves = state["_tracking_moves"]
+
+    def elevators_moved(self):
+        """
+        The function reports that the elevators moved, so that the next update reads every elevator. Once it has been
+        called, every later move of the elevators must be reported too.
+        """
+        self._tracking_moves = True
+        self._changed = None
+
+    def mark_changed(self, elevator_index: Optional[int]):
+        """
+        The function reports that an elevator may change before the next update, e.g. because it was picked for a passenger.
+
+        :param elevator_index: The index of the elevator, or None for no elevator
+        :type elevator_index: Optional[int]
+        """
+        if elevator_index is not None and self._changed is not None:
+            self._changed.append(elevator_index)
+
+    def update(self, elevators: List[Elevator]):
+        """
+        The function brings the arrays up to date with the elevators. The arrays are rebuilt from scratch when given a
+        different list of elevators. Otherwise, the current floors and directions are read again, and the rows of the
+        elevators whose dispatch version changed are rebuilt, either for every elevator or, when moves are tracked and the
+        elevators haven't moved since the last update, for the elevators marked with `mark_changed`.
+
+        :param elevators: The `elevators` parameter is the list of `Elevator` objects to describe
+        :type elevators: List[Elevator]
+        """
+        n = len(elevators)
+        if elevators is not self._elevators or n != len(self._dispatch_versions):
+            self._rebuild(elevators)
+            self._changed = None
+        if self._changed is not None:
+            for i in self._changed:
+                e = elevators[i]
+                self.current_floor[i] = e.current_floor
+                self.direction[i] = e.direction_value
+                if e.dispatch_version != self._dispatch_versions[i]:
+                    self._update_row(i, e)
+                    self._dispatch_versions[i] = e.dispatch_version
+        else:
+            self.current_floor = np.array([e.current_floor for e in elevators], dtype=np.int64)
+            self.direction = np.array([e.direction_value for e in elevators], dtype=np.int64)
+            dispatch_versions = np.array([e.dispatch_version for e in elevators], dtype=np.int64)
+            for i in np.flatnonzero(dispatch_versions != self._dispatch_versions).tolist():
+                self._update_row(i, elevators[i])
+            self._dispatch_versions = dispatch_versions
+        self._changed = [] if self._tracking_moves else None
+
+    def _rebuild(self, elevators: List[Elevator]):
+        n = len(elevators)
+        self._elevators = elevators
+        self.num_floors = max((e.num_floors for e in elevators), default=0)
+        self.headroom = np.zeros(n, dtype=np.int64)
+        self.stop_time = np.fromiter((e.stop_time for e in elevators), np.int64, n)
+        self.sweep_heads = np.full((3, n), _NO_TARGET, dtype=np.int64)
+        self.sweep_ends = np.zeros((3, n), dtype=np.int64)
+        self.stop_counts = np.zeros((3, n), dtype=np.int64)
+        self.stops = np.zeros((n, 2 * self.num_floors + 1), dtype=bool)
+        # no dispatch version is negative, so every row is filled in by the first update.
+        self._dispatch_versions = np.full(n, -1, dtype=np.int64)
+
+    def _update_row(self, i: int, elevator: Elevator):
+        self.headroom[i] = elevator.max_capacity - elevator.passenger_count
+        stops = self.stops[i]
+        stops[:] = False
+        for sweep, heap in enumerate(elevator.targets):
+            # the floors of a heap are distinct, so its length is its number of stops.
+            self.sweep_heads[sweep, i] = heap[0] if heap else _NO_TARGET
+            self.sweep_ends[sweep, i] = max(heap) if heap else 0
+            self.stop_counts[sweep, i] = len(heap)
+            for target in heap:
+                stops[target + self.num_floors] = True
+
+    def has_target_with_direction(self, target: int, direction: Direction) -> np.ndarray:
+        """
+        The function checks which elevators already have a target in the provided direction, as
+        `Elevator.has_target_with_direction` does for one elevator.
+
+        :param target: The target floor
+        :type target: int
+        :param direction: The direction in which the target floor is served
+        :type direction: Direction
+        :return: a boolean array with one value per elevator.
+        """
+        column = target * direction.value + self.num_floors
+        if not 0 <= column < self.stops.shape[1]:
+            return np.zeros(len(self.stops), dtype=bool)
+        return self.stops[:, column]
+
+    def distance_from(self, target: int, direction: Direction, elevator_indexes: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        The function calculates the distance of the elevators from a target floor, as `Elevator.distance_from` does for
+        one elevator.
+
+        :param target: The target floor
+        :type target: int
+        :param direction: The direction in which the elevators need to reach the target floor
+        :type direction: Direction
+        :param elevator_indexes: The indexes of the elevators whose distance to calculate. Defaults to every elevator
+        :type elevator_indexes: Optional[np.ndarray] (optional)
+        :return: an integer array with one distance per elevator.
+        """
+        floor, elevator_direction, stop_time = self.current_floor, self.direction, self.stop_time
+        sweep_heads, sweep_ends, stop_counts = self.sweep_heads, self.sweep_ends, self.stop_counts
+        if elevator_indexes is not None:
+            floor, elevator_direction, stop_time = floor[elevator_indexes], elevator_direction[elevator_indexes], \
+                stop_time[elevator_indexes]
+            sweep_heads, sweep_ends, stop_counts = sweep_heads[:, elevator_indexes], sweep_ends[:, elevator_indexes], \
+                stop_counts[:, elevator_indexes]
+        target_direction = direction.value
+        target_with_dir = target * target_direction
+        below_cur_floor_head, opposite_dir_head, cur_dir_head = sweep_heads
+        below_cur_floor_end, opposite_dir_end, cur_dir_end = sweep_ends
+        _, opposite_dir_count, cur_dir_count = stop_counts
+
+        distance_to_target = np.abs(target - floor)
+        ahead_in_current_sweep = distance_to_target + (cur_dir_head <= target_with_dir) * stop_time
+        end_of_current_sweep = np.abs(np.maximum(np.abs(cur_dir_end) * elevator_direction,
+                                                 np.abs(opposite_dir_end) * elevator_direction))
+        distance_to_turn = np.abs(floor - end_of_current_sweep) + cur_dir_count * stop_time
+        in_opposite_sweep = distance_to_turn + np.abs(end_of_current_sweep - target) + \
+            (opposite_dir_head <= target_with_dir) * stop_time
+        end_of_next_sweep = np.abs(np.maximum(np.abs(below_cur_floor_end) * elevator_direction,
+                                              np.abs(opposite_dir_end) * elevator_direction))
+        in_next_sweep = distance_to_turn + np.abs(end_of_next_sweep - end_of_current_sweep) + \
+            opposite_dir_count * stop_time + np.abs(end_of_next_sweep - target) + \
+            (below_cur_floor_head <= target_with_dir) * stop_time
+
+        distance = np.where(elevator_direction != target_direction, in_opposite_sweep, in_next_sweep)
+        distance = np.where(floor * elevator_direction < target_with_dir, ahead_in_current_sweep, distance)
+        return np.where(elevator_direction == 0, distance_to_target, distance)
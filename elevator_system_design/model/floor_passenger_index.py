@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from elevator_system_design.model.passenger import Passenger
+
+
+class FloorPassengerIndex:
+    """
+    The passengers of each elevator, grouped by the floor where the elevator picks them up or drops them off. Only the
+    floors with passengers on them are stored, so the index stays small in tall buildings with large fleets, where most
+    floors of most elevators have nobody on them.
+    """
+    _passengers: Dict[Tuple[int, int], List[Passenger]]
+    # the number of passengers of each elevator with any.
+    _count_by_elevator: Dict[int, int]
+    _count: int = 0
+
+    def __init__(self):
+        self._passengers = {}
+        self._count_by_elevator = {}
+
+    def add(self, elevator_index: int, floor: int, passenger: Passenger):
+        """
+        The function adds a passenger to an elevator's floor.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :param floor: The floor where the elevator picks the passenger up or drops them off
+        :type floor: int
+        :param passenger: The passenger to add
+        :type passenger: Passenger
+        """
+        passengers = self._passengers.get((elevator_index, floor))
+        if passengers is None:
+            self._passengers[(elevator_index, floor)] = [passenger]
+        else:
+            passengers.append(passenger)
+        self._count += 1
+        self._count_by_elevator[elevator_index] = self._count_by_elevator.get(elevator_index, 0) + 1
+
+    def extend(self, elevator_index: int, floor: int, passengers: Iterable[Passenger]):
+        """
+        The function adds several passengers to an elevator's floor, in order.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :param floor: The floor where the elevator picks the passengers up or drops them off
+        :type floor: int
+        :param passengers: The passengers to add
+        :type passengers: Iterable[Passenger]
+        """
+        for passenger in passengers:
+            self.add(elevator_index, floor, passenger)
+
+    def take(self, elevator_index: int, floor: int) -> Sequence[Passenger]:
+        """
+        The function removes every passenger from an elevator's floor.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :param floor: The floor to clear
+        :type floor: int
+        :return: the passengers who were on the floor, in the order in which they were added.
+        """
+        passengers = self._passengers.pop((elevator_index, floor), None)
+        if passengers is None:
+            return ()
+        self._count -= len(passengers)
+        count = self._count_by_elevator[elevator_index] - len(passengers)
+        if count:
+            self._count_by_elevator[elevator_index] = count
+        else:
+            del self._count_by_elevator[elevator_index]
+        return passengers
+
+    def get(self, elevator_index: int, floor: int) -> Sequence[Passenger]:
+        """
+        The function returns the passengers on an elevator's floor, without removing them.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :param floor: The floor to look up
+        :type floor: int
+        :return: the passengers on the floor, in the order in which they were added.
+        """
+        return tuple(self._passengers.get((elevator_index, floor), ()))
+
+    def has_passengers(self, elevator_index: int, floor: int) -> bool:
+        """
+        The function checks whether an elevator has any passenger on a floor.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :param floor: The floor to look up
+        :type floor: int
+        :return: a boolean value indicating whether there is a passenger on the floor.
+        """
+        return (elevator_index, floor) in self._passengers
+
+    def count(self, elevator_index: int) -> int:
+        """
+        The function counts the passengers of an elevator, on every floor.
+
+        :param elevator_index: The index of the elevator
+        :type elevator_index: int
+        :return: the number of passengers of the elevator.
+        """
+        return self._count_by_elevator.get(elevator_index, 0)
+
+    def items(self) -> Iterator[Tuple[Tuple[int, int], Sequence[Passenger]]]:
+        """
+        The function iterates over the floors with passengers on them.
+        :return: an iterator of ((elevator index, floor), passengers) pairs.
+        """
+        return iter(self._passengers.items())
+
+    def copy(self) -> "FloorPassengerIndex":
+        """
+        The function copies the index. The passengers themselves are immutable, and shared with the copy.
+        :return: a copy of the index.
+        """
+        index = FloorPassengerIndex()
+        index._passengers = {key: list(passengers) for key, passengers in self._passengers.items()}
+        index._count = self._count
+        index._count_by_elevator = dict(self._count_by_elevator)
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Passenger]:
+        return (p for passengers in self._passengers.values() for p in passengers)
@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.passenger import Passenger
+
+
+class HallCall:
+    """
+    The passengers waiting on the same floor to go in the same direction, who share a single call for an elevator like the
+    button press they would share in a lobby. A hall call is assigned to an elevator as a whole, and split when the
+    elevator doesn't have room for all of its passengers.
+    """
+    __slots__ = ("source_floor", "direction", "passengers")
+    source_floor: int
+    direction: Direction
+    # the passengers of the hall call, in the order in which they requested an elevator.
+    passengers: List[Passenger]
+
+    def __init__(self, passengers: List[Passenger]):
+        """
+        The function creates a hall call from its passengers.
+
+        :param passengers: The passengers of the hall call, in the order in which they requested an elevator. There must be
+        at least one, and they must share their source floor and direction
+        :type passengers: List[Passenger]
+        """
+        if len(passengers) == 0:
+            raise ValueError("a hall call needs at least one passenger")
+        self.source_floor = passengers[0].source_floor
+        self.direction = passengers[0].direction
+        if any(p.source_floor != self.source_floor or p.direction != self.direction for p in passengers):
+            raise ValueError("the passengers of a hall call must share their source floor and direction")
+        self.passengers = passengers
+
+    def split(self, n_passengers: int) -> Tuple["HallCall", Optional["HallCall"]]:
+        """
+        The function splits the hall call after its first passengers.
+
+        :param n_passengers: The number of passengers to keep in the first hall call, at least one
+        :type n_passengers: int
+        :return: a hall call with the first `n_passengers` passengers, and one with the rest of them or None if there are
+        none left.
+        """
+        if n_passengers >= len(self.passengers):
+            return self, None
+        return HallCall(self.passengers[:n_passengers]), HallCall(self.passengers[n_passengers:])
+
+    def __len__(self) -> int:
+        return len(self.passengers)
@@ -1,25 +1,58 @@
-from dataclasses import dataclass
+from collections import namedtuple
+from typing import Iterable
 
 from pydantic import BaseModel
 
 from elevator_system_design.model.direction import Direction
 
 
-@dataclass(unsafe_hash=True, frozen=True)
-class Passenger(BaseModel):
+class Passenger(namedtuple("_PassengerRecord",
+                                 ["id", "source_floor", "destination_floor", "request_time", "direction", "direction_value"])):
+    """
+    A passenger request, as a compact immutable record. Passengers are created by the million and hashed by the controller,
+    so the record is a tuple with no validation, and the passenger's direction of travel is computed once when it is
+    created. Use `PassengerModel` to validate passenger requests from untrusted input.
+    """
+    __slots__ = ()
     id: str
     source_floor: int
     destination_floor: int
     request_time: int  # the time step at which they requested the elevator
+    # the passenger's direction of travel: Direction.DOWN if the source floor is above the destination floor, otherwise
+    # Direction.UP.
+    direction: Direction
+    # the integer value of the passenger's direction (1 up, -1 down), like `Elevator.direction_value`, for the arithmetic of
+    # elevators and strategies.
+    direction_value: int
 
-    @property
-    def direction(self) -> Direction:
+    def __new__(cls, id: str, source_floor: int, destination_floor: int, request_time: int) -> "Passenger":
+        if source_floor > destination_floor:
+            return tuple.__new__(cls, (id, source_floor, destination_floor, request_time, Direction.DOWN, -1))
+        return tuple.__new__(cls, (id, source_floor, destination_floor, request_time, Direction.UP, 1))
+
+    @classmethod
+    def _make(cls, iterable: Iterable) -> "Passenger":
+        # the direction is always derived from the floors, so that `_replace` can't make it inconsistent.
+        id, source_floor, destination_floor, request_time, *_ = iterable
+        return cls(id, source_floor, destination_floor, request_time)
+
+    def __getnewargs__(self):
+        return tuple(self[:4])
+
+
+class PassengerModel(BaseModel):
+    """
+    The validated form of a passenger request, for the boundary where requests come from untrusted input such as files or
+    network messages. Values are checked and coerced (e.g. "5" to 5) before being turned into a `Passenger`.
+    """
+    id: str
+    source_floor: int
+    destination_floor: int
+    request_time: int
+
+    def to_passenger(self) -> Passenger:
         """
-        The function determines the passenger's direction of travel based on the source and destination floors.
-        :return: the direction in which the passenger wants to move. If the source floor is greater than the destination
-        floor, it will return Direction.DOWN. Otherwise, it will return Direction.UP.
+        The function converts the validated request into the passenger record used by the simulation.
+        :return: the passenger.
         """
-        if self.source_floor > self.destination_floor:
-            return Direction.DOWN
-        else:
-            return Direction.UP
+        return Passenger(self.id, self.source_floor, self.destination_floor, self.request_time)
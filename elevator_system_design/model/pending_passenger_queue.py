@@ -0,0 +1,117 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from elevator_system_design.model.passenger import Passenger
+
+
+class PendingPassengerQueue:
+    """
+    The passengers waiting to be assigned an elevator, in the order in which they are retried: by request time, then by
+    the order in which they became pending. Each passenger is kept with the dispatch version of the elevators at which an
+    assignment was last refused to them, so they are only retried once the elevators have changed since. The passengers
+    are bucketed by that version, so listing the passengers to retry only visits the buckets of older versions, and adding
+    or removing a passenger takes constant time. The order is only established for the passengers being retried.
+    """
+    # entries are [request_time, sequence number, passenger, dispatch version at which assignment was refused]
+    _entries_by_passenger: Dict[Passenger, list]
+    _buckets: Dict[Optional[int], Dict[Passenger, list]]
+    _sequence: int = 0
+
+    def __init__(self):
+        self._entries_by_passenger = {}
+        self._buckets = {}
+
+    def add(self, passenger: Passenger, refused_at: Optional[int] = None):
+        """
+        The function adds a passenger to the queue, or records a new refusal for a passenger already in the queue without
+        changing their position.
+
+        :param passenger: The passenger waiting to be assigned an elevator
+        :type passenger: Passenger
+        :param refused_at: The dispatch version of the elevators at which an assignment was refused to the passenger, or
+        None if the passenger must be retried at the next opportunity. Defaults to None
+        :type refused_at: Optional[int] (optional)
+        """
+        entry = self._entries_by_passenger.get(passenger)
+        if entry is None:
+            entry = [passenger.request_time, self._sequence, passenger, refused_at]
+            self._sequence += 1
+            self._entries_by_passenger[passenger] = entry
+        elif entry[3] == refused_at:
+            return
+        else:
+            self._remove_from_bucket(entry)
+            entry[3] = refused_at
+        self._buckets.setdefault(refused_at, {})[passenger] = entry
+
+    def _remove_from_bucket(self, entry: list):
+        """
+        The function removes an entry from the bucket of the dispatch version at which it was refused, dropping the
+        bucket once it is empty.
+        """
+        bucket = self._buckets[entry[3]]
+        del bucket[entry[2]]
+        if len(bucket) == 0:
+            del self._buckets[entry[3]]
+
+    def remove(self, passenger: Passenger):
+        """
+        The function removes a passenger from the queue.
+
+        :param passenger: The passenger to remove, who must be in the queue
+        :type passenger: Passenger
+        """
+        self._remove_from_bucket(self._entries_by_passenger.pop(passenger))
+
+    def to_retry(self, dispatch_version: int) -> List[Passenger]:
+        """
+        The function lists the passengers whose assignment was refused before the elevators last changed. The passengers
+        refused at the current dispatch version aren't visited, so this takes constant time while the elevators don't
+        change.
+
+        :param dispatch_version: The current dispatch version of the elevators
+        :type dispatch_version: int
+        :return: the passengers to retry, in order.
+        """
+        if len(self._buckets.get(dispatch_version, ())) == len(self._entries_by_passenger):
+            return []
+        entries = [entry for refused_at, bucket in self._buckets.items() if refused_at != dispatch_version
+                   for entry in bucket.values()]
+        entries.sort()
+        return [entry[2] for entry in entries]
+
+    def items(self) -> Iterator[Tuple[Passenger, Optional[int]]]:
+        """
+        The function iterates over the passengers in the order in which they are retried, with the dispatch version at
+        which an assignment was last refused to them. Adding them in this order to an empty queue recreates this queue.
+        :return: an iterator of (passenger, refused_at) pairs.
+        """
+        return ((entry[2], entry[3]) for entry in sorted(self._entries_by_passenger.values()))
+
+    def copy(self) -> "PendingPassengerQueue":
+        """
+        The function copies the queue. The passengers themselves are immutable, and shared with the copy.
+        :return: a copy of the queue.
+        """
+        queue = PendingPassengerQueue()
+        for passenger, entry in self._entries_by_passenger.items():
+            entry = list(entry)
+            queue._entries_by_passenger[passenger] = entry
+            queue._buckets.setdefault(entry[3], {})[passenger] = entry
+        queue._sequence = self._sequence
+        return queue
+
+    def clear(self):
+        """
+        The function removes every passenger from the queue.
+        """
+        self._entries_by_passenger.clear()
+        self._buckets.clear()
+
+    def __contains__(self, passenger: Passenger) -> bool:
+        return passenger in self._entries_by_passenger
+
+    def __len__(self) -> int:
+        return len(self._entries_by_passenger)
+
+    def __iter__(self) -> Iterator[Passenger]:
+        return (entry[2] for entry in sorted(self._entries_by_passenger.values()))
@@ -27,6 +27,19 @@ class SystemSummary:
         """
         self.no_action_passengers += 1
 
+    def copy(self) -> "SystemSummary":
+        """
+        The function copies the summary, so that the copy can include more times independently of this summary.
+        :return: a copy of the summary.
+        """
+        summary = SystemSummary()
+        summary.min_value = self.min_value
+        summary.max_value = self.max_value
+        summary.sum = self.sum
+        summary.n = self.n
+        summary.no_action_passengers = self.no_action_passengers
+        return summary
+
     def mean(self) -> float:
         """
         The mean function calculates the average of a set of times.
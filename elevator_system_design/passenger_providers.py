@@ -1,10 +1,11 @@
 from csv import DictReader
+from math import erf, sqrt
 from typing import Iterator, List, IO, Optional
 
 import numpy as np
 
 from elevator_system_design.log import logger
-from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.model.passenger import Passenger, PassengerModel
 
 
 def csv_passenger_provider(f: IO) -> Iterator[List[Passenger]]:
@@ -20,10 +21,10 @@ def csv_passenger_provider(f: IO) -> Iterator[List[Passenger]]:
     i = 0
     passengers = []
     for p_dict in reader:
-        passenger = Passenger(request_time=int(p_dict.get("time")),
-                              id=p_dict.get("id"),
-                              source_floor=int(p_dict.get("source")),
-                              destination_floor=int(p_dict.get("dest")))
+        passenger = PassengerModel(request_time=p_dict.get("time"),
+                                   id=p_dict.get("id"),
+                                   source_floor=p_dict.get("source"),
+                                   destination_floor=p_dict.get("dest")).to_passenger()
         while passenger.request_time > i:
             yield passengers
             passengers = []
@@ -35,11 +36,152 @@ def csv_passenger_provider(f: IO) -> Iterator[List[Passenger]]:
     yield passengers
 
 
-def random_uniform_floor_selection_passenger_provider(n: int, p: float, n_steps: int, n_floors: int) -> Iterator[
+def _normal_floor_probabilities(n_floors: int, mean_floor: float, std: float) -> np.ndarray:
+    """
+    The function computes the probability of each floor for a normally distributed floor rounded to the nearest floor,
+    before truncating it to the floors of the building.
+    """
+    edges = np.arange(n_floors + 1) + 0.5
+    if std == 0:
+        cdf = (edges > mean_floor).astype(np.float64)
+    else:
+        cdf = np.array([0.5 * (1 + erf((edge - mean_floor) / (std * sqrt(2)))) for edge in edges.tolist()])
+    return np.diff(cdf)
+
+
+def _sample_floors(probabilities: np.ndarray, size: int) -> np.ndarray:
+    """
+    The function draws floors from their probabilities by inverse transform sampling over the cumulative probabilities,
+    which truncates the distribution to the floors of the building without rejecting any draw.
+    """
+    cumulative = np.cumsum(probabilities)
+    floors = np.searchsorted(cumulative, np.random.random(size) * cumulative[-1], side="right") + 1
+    return np.minimum(floors, len(probabilities))
+
+
+def _sample_other_floors(probabilities: np.ndarray, source_floors: np.ndarray) -> np.ndarray:
+    """
+    The function draws a floor from their probabilities for each source floor, rejecting and drawing again the floors
+    equal to their source floor, all at once.
+    """
+    floors = _sample_floors(probabilities, len(source_floors))
+    rejected = np.flatnonzero(floors == source_floors)
+    while len(rejected):
+        floors[rejected] = _sample_floors(probabilities, len(rejected))
+        rejected = rejected[floors[rejected] == source_floors[rejected]]
+    return floors
+
+
+def _check_floor_probabilities(source_probabilities: np.ndarray, destination_probabilities: np.ndarray):
+    """
+    The function checks that passengers can be drawn from the floor probabilities: some floor must be a possible source
+    floor, and every possible source floor must leave another possible destination floor.
+    """
+    if source_probabilities.sum() <= 0 or destination_probabilities.sum() <= 0:
+        raise ValueError("no floor of the building can be drawn as a source or destination floor")
+    possible_sources = source_probabilities > 0
+    if np.any(destination_probabilities.sum() - destination_probabilities[possible_sources] <= 0):
+        raise ValueError("a source floor can be drawn which is the only possible destination floor")
+
+
+class _RandomFloorSelectionPassengerProvider:
+    """
+    The randomly sampled passengers of each time step, drawing the number of passengers and their floors for `block_size`
+    time steps at once. The floor probabilities must have been checked with `_check_floor_probabilities`. Its
+    `skip_batches` hook lets a run restored from a checkpoint skip the time steps handled before the checkpoint without
+    creating their passengers.
+    """
+
+    def __init__(self, n: int, p: float, n_steps: int, source_probabilities: np.ndarray,
+                 destination_probabilities: np.ndarray, block_size: int, same_floors_per_step: bool):
+        self.n = n
+        self.p = p
+        self.n_steps = n_steps
+        self.source_probabilities = source_probabilities
+        self.destination_probabilities = destination_probabilities
+        self.block_size = block_size
+        self.same_floors_per_step = same_floors_per_step
+        # the id number of the first passenger of the current block, and the start of the next block to draw.
+        self._first_id = 0
+        self._next_block_start = 0
+        # the current block: its first time step, the number of passengers and their floors at each of its time steps,
+        # the next time step to yield and the offset of its first passenger.
+        self._block_start = 0
+        self._n_passengers_by_step: List[int] = []
+        self._source_floors: List[int] = []
+        self._destination_floors: List[int] = []
+        self._step = 0
+        self._offset = 0
+
+    def __iter__(self) -> Iterator[List[Passenger]]:
+        return self
+
+    def __next__(self) -> List[Passenger]:
+        if not self._next_step():
+            raise StopIteration
+        n_passengers = self._n_passengers_by_step[self._step]
+        j = self._offset
+        first_id = self._first_id + j
+        batch = [Passenger(f"passenger{first_id + k}", source_floor, destination_floor, self._block_start + self._step)
+                 for k, source_floor, destination_floor in zip(range(n_passengers),
+                                                               self._source_floors[j:j + n_passengers],
+                                                               self._destination_floors[j:j + n_passengers])]
+        self._step += 1
+        self._offset += n_passengers
+        return batch
+
+    def skip_batches(self, n_batches: int):
+        """
+        The function skips time steps without creating their passengers. The blocks of the skipped time steps are still
+        drawn, so that the passengers of the next time steps are those the provider would have yielded.
+
+        :param n_batches: The number of time steps to skip
+        :type n_batches: int
+        """
+        while n_batches > 0 and self._next_step():
+            n_skipped = min(n_batches, len(self._n_passengers_by_step) - self._step)
+            self._offset += sum(self._n_passengers_by_step[self._step:self._step + n_skipped])
+            self._step += n_skipped
+            n_batches -= n_skipped
+
+    def _next_step(self) -> bool:
+        """
+        The function draws the next block once the time steps of the current one are exhausted.
+        :return: whether there is a time step left.
+        """
+        if self._step < len(self._n_passengers_by_step):
+            return True
+        if self._next_block_start >= self.n_steps:
+            return False
+        if self._next_block_start == 0:
+            logger.info("generating randomly sampled passengers for each time step")
+        n_passengers_by_step = np.random.binomial(n=self.n, p=self.p,
+                                                  size=min(self.block_size, self.n_steps - self._next_block_start))
+        n_draws = len(n_passengers_by_step) if self.same_floors_per_step else int(n_passengers_by_step.sum())
+        source_floors = _sample_floors(self.source_probabilities, n_draws)
+        destination_floors = _sample_other_floors(self.destination_probabilities, source_floors)
+        if self.same_floors_per_step:
+            source_floors = np.repeat(source_floors, n_passengers_by_step)
+            destination_floors = np.repeat(destination_floors, n_passengers_by_step)
+        self._first_id += self._offset
+        self._block_start = self._next_block_start
+        self._next_block_start += len(n_passengers_by_step)
+        self._n_passengers_by_step = n_passengers_by_step.tolist()
+        self._source_floors = source_floors.tolist()
+        self._destination_floors = destination_floors.tolist()
+        self._step = 0
+        self._offset = 0
+        return True
+
+
+def random_uniform_floor_selection_passenger_provider(n: int, p: float, n_steps: int, n_floors: int,
+                                                      block_size: int = 4096,
+                                                      same_floors_per_step: bool = False) -> Iterator[
     List[Passenger]]:
     """
     The function generates randomly sampled passengers for each time step, with specified parameters for the number of
-    passengers, probability of a passenger appearing, number of time steps, and number of floors.
+    passengers, probability of a passenger appearing, number of time steps, and number of floors. Every floor is equally
+    likely to be a passenger's source floor, and every other floor is equally likely to be their destination floor.
 
     :param n: The parameter `n` represents the total number of passengers that can be generated, sampled from a binomial distribution
     :type n: int
@@ -50,23 +192,16 @@ def random_uniform_floor_selection_passenger_provider(n: int, p: float, n_steps:
     :type n_steps: int
     :param n_floors: The parameter `n_floors` represents the total number of floors in the building
     :type n_floors: int
+    :param block_size: The number of time steps for which passengers are drawn at once. Defaults to 4096
+    :type block_size: int (optional)
+    :param same_floors_per_step: Whether the passengers arriving during the same time step share their source and
+    destination floors, like a group travelling together, instead of each being drawn independently. Defaults to False
+    :type same_floors_per_step: bool (optional)
     """
-    i = 0
-    logger.info("generating randomly sampled passengers for each time step")
-    for time_step, n_passengers in enumerate(np.random.binomial(n=n, p=p, size=n_steps)):
-        source_floor = round(np.random.uniform(1, n_floors + 1))
-        while source_floor > n_floors:
-            source_floor = round(np.random.uniform(1, n_floors + 1))
-        destination_floor = round(np.random.uniform(1, n_floors + 1))
-        while destination_floor > n_floors or destination_floor == source_floor:
-            destination_floor = round(np.random.uniform(1, n_floors + 1))
-        yield [Passenger(
-            id=f"passenger{i + j}",
-            source_floor=source_floor,
-            destination_floor=destination_floor,
-            request_time=time_step
-        ) for j in range(n_passengers)]
-        i += n_passengers
+    probabilities = np.ones(n_floors)
+    _check_floor_probabilities(probabilities, probabilities)
+    return _RandomFloorSelectionPassengerProvider(n, p, n_steps, probabilities, probabilities, block_size,
+                                                  same_floors_per_step)
 
 
 def random_normal_floor_selection_passenger_provider(
@@ -77,7 +212,24 @@ def random_normal_floor_selection_passenger_provider(
         source_mean_floor: Optional[int] = None,
         source_std: Optional[float] = None,
         destination_mean_floor: Optional[int] = None,
-        destination_std: Optional[float] = None) -> Iterator[List[Passenger]]:
+        destination_std: Optional[float] = None,
+        block_size: int = 4096,
+        same_floors_per_step: bool = False) -> Iterator[List[Passenger]]:
+    """
+    The function generates randomly sampled passengers for each time step, like
+    `random_uniform_floor_selection_passenger_provider`, but with source and destination floors drawn from normal
+    distributions rounded to the nearest floor and truncated to the floors of the building. A passenger's destination
+    floor is never their source floor.
+
+    :param source_mean_floor: The mean of the source floors. Defaults to the middle floor
+    :type source_mean_floor: Optional[int] (optional)
+    :param source_std: The standard deviation of the source floors. Defaults to a ninth of the number of floors
+    :type source_std: Optional[float] (optional)
+    :param destination_mean_floor: The mean of the destination floors. Defaults to the middle floor
+    :type destination_mean_floor: Optional[int] (optional)
+    :param destination_std: The standard deviation of the destination floors. Defaults to a ninth of the number of floors
+    :type destination_std: Optional[float] (optional)
+    """
     if source_mean_floor is None:
         source_mean_floor = n_floors // 2
     if source_std is None:
@@ -86,19 +238,8 @@ def random_normal_floor_selection_passenger_provider(
         destination_mean_floor = n_floors // 2
     if destination_std is None:
         destination_std = n_floors // 9
-    i = 0
-    logger.info("generating randomly sampled passengers for each time step")
-    for time_step, n_passengers in enumerate(np.random.binomial(n=n, p=p, size=n_steps)):
-        source_floor = round(np.random.normal(loc=source_mean_floor, scale=source_std))
-        while not 1 <= source_floor <= n_floors:
-            source_floor = round(np.random.normal(loc=source_mean_floor, scale=source_std))
-        destination_floor = round(np.random.normal(loc=destination_mean_floor, scale=destination_std))
-        while not 1 <= destination_floor <= n_floors  or destination_floor == source_floor:
-            destination_floor = round(np.random.normal(loc=destination_mean_floor, scale=destination_std))
-        yield [Passenger(
-            id=f"passenger{i + j}",
-            source_floor=source_floor,
-            destination_floor=destination_floor,
-            request_time=time_step
-        ) for j in range(n_passengers)]
-        i += n_passengers
+    source_probabilities = _normal_floor_probabilities(n_floors, source_mean_floor, source_std)
+    destination_probabilities = _normal_floor_probabilities(n_floors, destination_mean_floor, destination_std)
+    _check_floor_probabilities(source_probabilities, destination_probabilities)
+    return _RandomFloorSelectionPassengerProvider(n, p, n_steps, source_probabilities, destination_probabilities,
+                                                  block_size, same_floors_per_step)
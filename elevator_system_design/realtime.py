@@ -0,0 +1,84 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, List
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.log import logger
+from elevator_system_design.model.passenger import Passenger
+
+
+class RealTimeElevatorController:
+    """
+    An asyncio front end which runs an `ElevatorController` in real time, fed by live passenger requests. The simulation
+    steps once per wall-clock tick, and all the passengers which arrived since the previous tick are requested together at
+    the start of the step. Steps run in a worker thread, so the event loop keeps serving the passenger request source and
+    any other task while the controller works.
+    """
+    controller: ElevatorController
+    tick: float
+    # the time in seconds between each tick's deadline and the end of its step, for the most recent ticks.
+    tick_latencies: Deque[float]
+    _arrivals: List[Passenger]
+
+    def __init__(self, controller: ElevatorController, tick: float = 1.0, latency_history: int = 1000):
+        """
+        The function initializes the real-time front end of a controller.
+
+        :param controller: The `controller` parameter is the `ElevatorController` to run in real time
+        :type controller: ElevatorController
+        :param tick: The wall-clock time in seconds of a simulation time-step. Defaults to 1 second
+        :type tick: float (optional)
+        :param latency_history: The number of most recent ticks whose latency is kept in `tick_latencies`. Defaults to 1000
+        :type latency_history: int (optional)
+        """
+        self.controller = controller
+        self.tick = tick
+        self.tick_latencies = deque(maxlen=latency_history)
+        self._arrivals = []
+
+    async def handle_passenger_requests(self, passenger_request_source: AsyncIterator[List[Passenger]]):
+        """
+        The function handles live passenger requests until the source is exhausted and every passenger has been delivered
+        to their destination. The request time of each passenger is set to the time-step at which they are requested.
+
+        :param passenger_request_source: The `passenger_request_source` parameter is an async iterator that yields batches
+        of passenger requests as they arrive. Batches arriving within the same tick are requested together
+        :type passenger_request_source: AsyncIterator[List[Passenger]]
+        """
+        loop = asyncio.get_running_loop()
+        controller = self.controller
+        if controller.time == 0:
+            controller.state_persistence_strategy.persist(controller.time, controller.elevators)
+        reader = asyncio.create_task(self._read(passenger_request_source))
+        try:
+            deadline = loop.time()
+            while not (reader.done() and len(self._arrivals) == 0 and controller.all_delivered()):
+                deadline += self.tick
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+                if reader.done():
+                    # surfaces errors raised by the passenger request source.
+                    reader.result()
+                passenger_batch, self._arrivals = self._arrivals, []
+                await asyncio.to_thread(self._step, passenger_batch)
+                self.tick_latencies.append(loop.time() - deadline)
+        finally:
+            reader.cancel()
+        logger.info(f"all {controller.acknowledged_passengers} passengers delivered to their destinations at step "
+                    f"{controller.time}")
+
+    async def _read(self, passenger_request_source: AsyncIterator[List[Passenger]]):
+        """
+        The function collects the passengers of the source as they arrive, until the next tick requests them.
+        """
+        async for passenger_batch in passenger_request_source:
+            self._arrivals.extend(passenger_batch)
+
+    def _step(self, passenger_batch: List[Passenger]):
+        """
+        The function requests an elevator for the passengers who arrived during the last tick and steps the simulation.
+        """
+        controller = self.controller
+        passenger_batch = [p if p.request_time == controller.time else p._replace(request_time=controller.time)
+                           for p in passenger_batch]
+        controller.request_passenger_batch(passenger_batch)
+        controller.step()
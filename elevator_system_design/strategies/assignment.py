@@ -1,10 +1,21 @@
 import math
 import sys
-from typing import Protocol, List, Optional
+from typing import Any, Callable, Dict, Protocol, List, Optional, Tuple
 
+import numpy as np
+
+from elevator_system_design.model.direction import Direction
 from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.elevator_floor_index import DOWN, EMPTY, IDLE, UP, ElevatorFloorIndex
+from elevator_system_design.model.elevator_stop_index import ElevatorStopIndex
+from elevator_system_design.model.fleet_state import FleetState
 from elevator_system_design.model.passenger import Passenger
 
+# the scores given by `ScoringElevatorAssignmentStrategy.score_elevator` are distances, to which `_UNAVAILABLE` is added
+# for an elevator which can't take the passengers, and `_TIER` for each tier of candidates it is behind the best one.
+_UNAVAILABLE = 1 << 40
+_TIER = 1 << 41
+
 
 class ElevatorAssignmentStrategy(Protocol):
     def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
@@ -16,11 +27,108 @@ class ElevatorAssignmentStrategy(Protocol):
         :type passenger: Passenger
         :param elevators: The `elevators` parameter is a list of `Elevator` objects
         :type elevators: List[Elevator]
+        :return: the index of the assigned elevator, or None if no elevator can take the passenger yet. A passenger who is
+        refused is only retried once the `dispatch_version` of an elevator has changed, so a strategy must not start
+        accepting a passenger it refused because of elevator movement alone. Strategies which set
+        `retry_on_availability_change` are only retried once the `availability_version` of an elevator has changed.
+        """
+        ...
+
+
+class BatchElevatorAssignmentStrategy(ElevatorAssignmentStrategy, Protocol):
+    def assign_batch(self, passengers: List[Passenger], elevators: List[Elevator]) -> List[Optional[int]]:
+        """
+        The function assigns several passengers at once, e.g. all the passengers arriving during a time-step. The
+        controller uses it instead of `assign_elevator` whenever the assignment strategy has it.
+
+        :param passengers: The passengers who need to be assigned to an elevator
+        :type passengers: List[Passenger]
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator of each passenger, or None for passengers no elevator can take yet,
+        under the same retry rules as `assign_elevator`.
+        """
+        ...
+
+
+class ScoringElevatorAssignmentStrategy(ElevatorAssignmentStrategy, Protocol):
+    def score_elevator(self, source_floor: int, direction: Direction, elevator: Elevator) -> int:
+        """
+        The function scores an elevator for the passengers calling from a floor in a direction. The score must only
+        depend on the state of the elevator counted by its `state_version`, so that `MemoizedAssignmentStrategy` can keep
+        it until that changes.
+
+        :param source_floor: The floor the passengers are calling from
+        :type source_floor: int
+        :param direction: The direction the passengers are going in
+        :type direction: Direction
+        :param elevator: The elevator to score
+        :type elevator: Elevator
+        :return: the score of the elevator, the lower the better.
         """
         ...
 
+    def pick_from_scores(self, passenger: Passenger, scores: np.ndarray, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function picks the elevator of a passenger from the score of every elevator for the passenger's source floor
+        and direction, as `assign_elevator` would. Besides the scores, the pick may only depend on the passenger's
+        destination floor and the state of the elevators counted by their `state_version`.
+
+        :param passenger: The passenger who needs to be assigned to an elevator
+        :type passenger: Passenger
+        :param scores: The score of each elevator, as given by `score_elevator`. It must not be changed
+        :type scores: np.ndarray
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
+        """
+        ...
+
+
+def _pick_lowest_score(scores: np.ndarray) -> Optional[int]:
+    """
+    The function picks the first elevator with the lowest score, unless it can't take the passenger.
+    """
+    if len(scores) == 0:
+        return None
+    elevator_index = int(np.argmin(scores))
+    return None if scores[elevator_index] >= _UNAVAILABLE else elevator_index
+
+
+def _pick_from_stop_scores(scores: np.ndarray, stops_at_destination: Callable[[int], bool]) -> Optional[int]:
+    """
+    The function picks an elevator from the scores of the `ExistingStopStrategy` family: the elevators stopping at the
+    passenger's source floor are one tier ahead of the others, and those of them also stopping at the passenger's
+    destination floor are moved another tier ahead. The best tier is picked from whether or not its elevators can take
+    the passenger.
+    """
+    with_source_floor = np.flatnonzero(scores < 2 * _TIER).tolist()
+    with_destination_floor = [i for i in with_source_floor if stops_at_destination(i)]
+    if with_destination_floor:
+        scores = scores.copy()
+        scores[with_destination_floor] -= _TIER
+    if len(scores) == 0:
+        return None
+    elevator_index = int(np.argmin(scores))
+    return None if scores[elevator_index] % _TIER >= _UNAVAILABLE else elevator_index
+
 
 class ClosestEmptyStrategy:
+    # a refused passenger can only be assigned once an elevator becomes empty.
+    retry_on_availability_change = True
+    # the index of the elevators by floor, if the controller maintains one.
+    elevator_floor_index: Optional[ElevatorFloorIndex] = None
+
+    def use_elevator_floor_index(self, elevator_floor_index: ElevatorFloorIndex):
+        """
+        The function gives the strategy an index of the elevators by floor, kept up to date by the controller, with which
+        the closest elevator is found by bisection instead of looping over the elevators.
+
+        :param elevator_floor_index: The index of the elevators the strategy is asked to pick from
+        :type elevator_floor_index: ElevatorFloorIndex
+        """
+        self.elevator_floor_index = elevator_floor_index
+
     def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
         """
         The function assigns a passenger to the closest available elevator based on the distance between the elevator's
@@ -33,6 +141,10 @@ class ClosestEmptyStrategy:
         :type elevators: List[Elevator]
         :return: the index of the closest elevator that is currently empty.
         """
+        index = self.elevator_floor_index
+        if index is not None and index.elevators is elevators:
+            nearest = index.nearest(EMPTY, passenger.source_floor)
+            return None if nearest is None else nearest[1]
         closest_elevator = None
         closest_distance = float('inf')
         for i in range(len(elevators)):
@@ -44,8 +156,36 @@ class ClosestEmptyStrategy:
                     closest_elevator = i
         return closest_elevator
 
+    def score_elevator(self, source_floor: int, direction: Direction, elevator: Elevator) -> int:
+        """
+        The function scores an elevator by its distance from the passengers' floor, if it is empty.
+        """
+        return abs(elevator.current_floor - source_floor) if elevator.is_empty() else _UNAVAILABLE
+
+    def pick_from_scores(self, passenger: Passenger, scores: np.ndarray, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function picks the closest empty elevator from the scores of `score_elevator`.
+        """
+        return _pick_lowest_score(scores)
+
 
 class DirectionalStrategy:
+    # a refused passenger can only be assigned once an elevator frees capacity or changes direction, since moving in the
+    # same direction only takes an elevator past the passenger's floor.
+    retry_on_availability_change = True
+    # the index of the elevators by floor, if the controller maintains one.
+    elevator_floor_index: Optional[ElevatorFloorIndex] = None
+
+    def use_elevator_floor_index(self, elevator_floor_index: ElevatorFloorIndex):
+        """
+        The function gives the strategy an index of the elevators by floor, kept up to date by the controller, with which
+        the closest elevators going towards the passenger are found by bisection instead of looping over the elevators.
+
+        :param elevator_floor_index: The index of the elevators the strategy is asked to pick from
+        :type elevator_floor_index: ElevatorFloorIndex
+        """
+        self.elevator_floor_index = elevator_floor_index
+
     def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
         """
         The function assigns a passenger to an elevator based on their source floor and the current state of the elevators.
@@ -58,6 +198,19 @@ class DirectionalStrategy:
         :type elevators: List[Elevator]
         :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
         """
+        index = self.elevator_floor_index
+        if index is not None and index.elevators is elevators:
+            source_floor = passenger.source_floor
+            passenger_direction = passenger.direction.value
+            # idle elevators on any floor, and the elevators heading towards the passenger's floor, or leaving it in the
+            # passenger's direction.
+            nearest = [index.nearest(IDLE, source_floor, accept=Elevator.can_accommodate),
+                       index.nearest(UP, source_floor, at=passenger_direction == 1, above=False,
+                                     accept=Elevator.can_accommodate),
+                       index.nearest(DOWN, source_floor, below=False, at=passenger_direction == -1,
+                                     accept=Elevator.can_accommodate)]
+            nearest = [n for n in nearest if n is not None]
+            return min(nearest)[1] if nearest else None
         min_distance = sys.maxsize
         assigned_elevator: Optional[int] = None
         for elevator_idx in range(len(elevators)):
@@ -65,7 +218,7 @@ class DirectionalStrategy:
             passenger_dir = round(math.copysign(1, passenger.source_floor - elevator.current_floor))
             if passenger.source_floor == elevator.current_floor:
                 passenger_dir = passenger.direction.value
-            passenger_in_same_dir_as_elevator_dir = elevator.direction.value == passenger_dir
+            passenger_in_same_dir_as_elevator_dir = elevator.direction_value == passenger_dir
             if not passenger_in_same_dir_as_elevator_dir and not elevator.is_idle():
                 continue
             elevator_distance = abs(passenger.source_floor - elevator.current_floor)
@@ -74,9 +227,39 @@ class DirectionalStrategy:
                 assigned_elevator = elevator_idx
         return assigned_elevator
 
+    def score_elevator(self, source_floor: int, direction: Direction, elevator: Elevator) -> int:
+        """
+        The function scores an elevator by its distance from the passengers' floor, if it is idle or heading towards
+        them and has room for them.
+        """
+        passenger_dir = round(math.copysign(1, source_floor - elevator.current_floor))
+        if source_floor == elevator.current_floor:
+            passenger_dir = direction.value
+        if (elevator.direction_value == passenger_dir or elevator.is_idle()) and elevator.can_accommodate():
+            return abs(source_floor - elevator.current_floor)
+        return _UNAVAILABLE
+
+    def pick_from_scores(self, passenger: Passenger, scores: np.ndarray, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function picks the closest elevator heading towards the passenger from the scores of `score_elevator`.
+        """
+        return _pick_lowest_score(scores)
+
 
 class ExistingStopStrategy:
     directional_strategy = DirectionalStrategy()
+    # the index of the elevators by target floor, if the controller maintains one.
+    elevator_stop_index: Optional[ElevatorStopIndex] = None
+
+    def use_elevator_stop_index(self, elevator_stop_index: ElevatorStopIndex):
+        """
+        The function gives the strategy an index of the elevators by target floor, kept up to date by the controller, with
+        which the elevators already stopping at the passenger's floors are looked up instead of asking every elevator.
+
+        :param elevator_stop_index: The index of the elevators the strategy is asked to pick from
+        :type elevator_stop_index: ElevatorStopIndex
+        """
+        self.elevator_stop_index = elevator_stop_index
 
     def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
         """
@@ -91,21 +274,28 @@ class ExistingStopStrategy:
         :type elevators: List[Elevator]
         :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
         """
-        candidate_elevators = range(len(elevators))
-        has_source_floor = []
-        for i in range(len(elevators)):
-            e = elevators[i]
-            if e.has_target_with_direction(passenger.source_floor, passenger.direction):
-                has_source_floor.append(i)
-        if len(has_source_floor) > 0:
-            candidate_elevators = has_source_floor
-        has_source_and_dest_floor = []
-        for i in has_source_floor:
-            e = elevators[i]
-            if e.has_target_with_direction(passenger.destination_floor, passenger.direction):
-                has_source_and_dest_floor.append(i)
-        if len(has_source_and_dest_floor) > 0:
-            candidate_elevators = has_source_and_dest_floor
+        index = self.elevator_stop_index
+        if index is not None and index.elevators is elevators:
+            has_source_floor = index.elevators_stopping_at(passenger.source_floor, passenger.direction)
+            has_source_and_dest_floor = \
+                has_source_floor & index.elevators_stopping_at(passenger.destination_floor, passenger.direction)
+            candidate_elevators = sorted(has_source_and_dest_floor or has_source_floor) or range(len(elevators))
+        else:
+            candidate_elevators = range(len(elevators))
+            has_source_floor = []
+            for i in range(len(elevators)):
+                e = elevators[i]
+                if e.has_target_with_direction(passenger.source_floor, passenger.direction):
+                    has_source_floor.append(i)
+            if len(has_source_floor) > 0:
+                candidate_elevators = has_source_floor
+            has_source_and_dest_floor = []
+            for i in has_source_floor:
+                e = elevators[i]
+                if e.has_target_with_direction(passenger.destination_floor, passenger.direction):
+                    has_source_and_dest_floor.append(i)
+            if len(has_source_and_dest_floor) > 0:
+                candidate_elevators = has_source_and_dest_floor
 
         min_distance = sys.maxsize
         assigned_elevator: Optional[int] = None
@@ -117,9 +307,38 @@ class ExistingStopStrategy:
                 assigned_elevator = elevator_idx
         return assigned_elevator
 
+    def score_elevator(self, source_floor: int, direction: Direction, elevator: Elevator) -> int:
+        """
+        The function scores an elevator by its distance from the passengers' floor, one tier ahead of the others if it
+        already stops there in their direction.
+        """
+        tier = 1 if elevator.has_target_with_direction(source_floor, direction) else 2
+        return tier * _TIER + (0 if elevator.can_accommodate() else _UNAVAILABLE) + \
+            elevator.distance_from(source_floor, direction)
+
+    def pick_from_scores(self, passenger: Passenger, scores: np.ndarray, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function picks an elevator from the scores of `score_elevator`, preferring the elevators which also stop at the
+        passenger's destination floor.
+        """
+        return _pick_from_stop_scores(scores, lambda i: elevators[i].has_target_with_direction(
+            passenger.destination_floor, passenger.direction))
+
 
 class ExistingStopPreferenceStrategy:
     directional_strategy = DirectionalStrategy()
+    # the index of the elevators by target floor, if the controller maintains one.
+    elevator_stop_index: Optional[ElevatorStopIndex] = None
+
+    def use_elevator_stop_index(self, elevator_stop_index: ElevatorStopIndex):
+        """
+        The function gives the strategy an index of the elevators by target floor, kept up to date by the controller, with
+        which the elevators already stopping at the passenger's floors are looked up instead of asking every elevator.
+
+        :param elevator_stop_index: The index of the elevators the strategy is asked to pick from
+        :type elevator_stop_index: ElevatorStopIndex
+        """
+        self.elevator_stop_index = elevator_stop_index
 
     def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
         """
@@ -135,21 +354,29 @@ class ExistingStopPreferenceStrategy:
         :type elevators: List[Elevator]
         :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
         """
-        candidate_elevators = range(len(elevators))
-        has_source_floor = []
-        for i in range(len(elevators)):
-            e = elevators[i]
-            if e.has_target_with_direction(passenger.source_floor, passenger.direction) or e.is_empty():
-                has_source_floor.append(i)
-        if len(has_source_floor) > 0:
-            candidate_elevators = has_source_floor
-        has_source_and_dest_floor = []
-        for i in has_source_floor:
-            e = elevators[i]
-            if e.has_target_with_direction(passenger.destination_floor, passenger.direction) or e.is_empty():
-                has_source_and_dest_floor.append(i)
-        if len(has_source_and_dest_floor) > 0:
-            candidate_elevators = has_source_and_dest_floor
+        index = self.elevator_stop_index
+        if index is not None and index.elevators is elevators:
+            has_source_floor = index.elevators_stopping_at(passenger.source_floor, passenger.direction)
+            has_source_and_dest_floor = \
+                has_source_floor & index.elevators_stopping_at(passenger.destination_floor, passenger.direction)
+            candidate_elevators = sorted(has_source_and_dest_floor | index.empty_elevators) or \
+                sorted(has_source_floor | index.empty_elevators) or range(len(elevators))
+        else:
+            candidate_elevators = range(len(elevators))
+            has_source_floor = []
+            for i in range(len(elevators)):
+                e = elevators[i]
+                if e.has_target_with_direction(passenger.source_floor, passenger.direction) or e.is_empty():
+                    has_source_floor.append(i)
+            if len(has_source_floor) > 0:
+                candidate_elevators = has_source_floor
+            has_source_and_dest_floor = []
+            for i in has_source_floor:
+                e = elevators[i]
+                if e.has_target_with_direction(passenger.destination_floor, passenger.direction) or e.is_empty():
+                    has_source_and_dest_floor.append(i)
+            if len(has_source_and_dest_floor) > 0:
+                candidate_elevators = has_source_and_dest_floor
 
         min_distance = sys.maxsize
         assigned_elevator: Optional[int] = None
@@ -160,3 +387,505 @@ class ExistingStopPreferenceStrategy:
                 min_distance = elevator_distance
                 assigned_elevator = elevator_idx
         return assigned_elevator
+
+    def score_elevator(self, source_floor: int, direction: Direction, elevator: Elevator) -> int:
+        """
+        The function scores an elevator by its distance from the passengers' floor, one tier ahead of the others if it is
+        empty or already stops there in their direction.
+        """
+        tier = 1 if elevator.has_target_with_direction(source_floor, direction) or elevator.is_empty() else 2
+        return tier * _TIER + (0 if elevator.can_accommodate() else _UNAVAILABLE) + \
+            elevator.distance_from(source_floor, direction)
+
+    def pick_from_scores(self, passenger: Passenger, scores: np.ndarray, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function picks an elevator from the scores of `score_elevator`, preferring the elevators which are empty or
+        also stop at the passenger's destination floor.
+        """
+        return _pick_from_stop_scores(scores, lambda i: elevators[i].is_empty() or elevators[i].has_target_with_direction(
+            passenger.destination_floor, passenger.direction))
+
+
+class VectorizedDirectionalStrategy(DirectionalStrategy):
+    """
+    The `DirectionalStrategy`, scoring every elevator at once from a `FleetState` instead of looping over the elevators.
+    It picks the same elevator as `DirectionalStrategy`, and is faster for large fleets.
+    """
+    fleet: FleetState
+    # the fleet state takes the place of the index used by `DirectionalStrategy`, so the controller needn't maintain it.
+    use_elevator_floor_index = None
+
+    def __init__(self):
+        self.fleet = FleetState()
+
+    def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function assigns a passenger to an elevator based on their source floor and the current state of the elevators,
+        as `DirectionalStrategy.assign_elevator` does.
+
+        :param passenger: The passenger who needs to be assigned to an elevator
+        :type passenger: Passenger
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
+        """
+        fleet = self.fleet
+        fleet.update(elevators)
+        passenger_dir = np.sign(passenger.source_floor - fleet.current_floor)
+        passenger_dir[passenger_dir == 0] = passenger.direction.value
+        candidates = ((fleet.direction == passenger_dir) | (fleet.direction == 0)) & (fleet.headroom > 0)
+        elevator_index = None
+        if candidates.any():
+            # argmin returns the first of the closest elevators, which is the one the looping strategy keeps.
+            elevator_index = int(np.argmin(np.where(candidates, np.abs(passenger.source_floor - fleet.current_floor),
+                                                    sys.maxsize)))
+        fleet.mark_changed(elevator_index)
+        return elevator_index
+
+    def elevators_moved(self):
+        """
+        The function is called by the controller whenever the elevators move, so that the fleet state is only read from
+        every elevator once per move instead of once per passenger.
+        """
+        self.fleet.elevators_moved()
+
+
+class VectorizedExistingStopStrategy(ExistingStopStrategy):
+    """
+    The `ExistingStopStrategy`, scoring every elevator at once from a `FleetState` instead of looping over the elevators.
+    It picks the same elevator as `ExistingStopStrategy`, and is faster for large fleets.
+    """
+    fleet: FleetState
+    # the fleet state takes the place of the index used by `ExistingStopStrategy`, so the controller needn't maintain it.
+    use_elevator_stop_index = None
+
+    def __init__(self):
+        self.fleet = FleetState()
+
+    def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function assigns a passenger to an elevator based on whether an elevator is already planning to stop at the
+        passenger's source and/or destination floors, as `ExistingStopStrategy.assign_elevator` does.
+
+        :param passenger: The passenger who needs to be assigned to an elevator
+        :type passenger: Passenger
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
+        """
+        fleet = self.fleet
+        fleet.update(elevators)
+        candidates = fleet.has_target_with_direction(passenger.source_floor, passenger.direction)
+        if candidates.any():
+            has_source_and_dest_floor = candidates & fleet.has_target_with_direction(passenger.destination_floor,
+                                                                                    passenger.direction)
+            if has_source_and_dest_floor.any():
+                candidates = has_source_and_dest_floor
+        else:
+            candidates = np.ones(len(elevators), dtype=bool)
+        candidates = np.flatnonzero(candidates & (fleet.headroom > 0))
+        elevator_index = None
+        if len(candidates) > 0:
+            # the indexes are in increasing order, so ties go to the lowest index like in the looping strategy.
+            distances = fleet.distance_from(passenger.source_floor, passenger.direction, candidates)
+            elevator_index = int(candidates[np.argmin(distances)])
+        fleet.mark_changed(elevator_index)
+        return elevator_index
+
+    def elevators_moved(self):
+        """
+        The function is called by the controller whenever the elevators move, so that the fleet state is only read from
+        every elevator once per move instead of once per passenger.
+        """
+        self.fleet.elevators_moved()
+
+
+class MinCostBatchStrategy:
+    """
+    A batch assignment strategy which assigns the passengers arriving together to elevators with the smallest total
+    distance, as measured by `Elevator.distance_from`, instead of assigning them one after the other to the closest
+    elevator. An elevator takes at most as many passengers of a batch as it has room for. Passengers with the same source
+    floor and direction cost the same, so a burst of calls from a few floors is solved as a small transportation problem
+    between those floors and the elevators.
+    """
+    # a passenger is only refused when no elevator has room left, which only changes when a passenger disembarks.
+    retry_on_availability_change = True
+    fleet: FleetState
+
+    def __init__(self):
+        self.fleet = FleetState()
+
+    def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function assigns a single passenger, as a batch of one.
+
+        :param passenger: The passenger who needs to be assigned to an elevator
+        :type passenger: Passenger
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
+        """
+        return self.assign_batch([passenger], elevators)[0]
+
+    def assign_batch(self, passengers: List[Passenger], elevators: List[Elevator]) -> List[Optional[int]]:
+        """
+        The function assigns a batch of passengers to elevators with the smallest total distance from their source floors.
+        When the elevators don't have room for every passenger, the passengers who arrived last on each floor are left
+        unassigned.
+
+        :param passengers: The passengers who need to be assigned to an elevator
+        :type passengers: List[Passenger]
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator of each passenger, or None if no elevator is assigned.
+        """
+        fleet = self.fleet
+        fleet.update(elevators)
+        groups: Dict[Tuple[int, Direction], List[int]] = {}
+        for i, passenger in enumerate(passengers):
+            groups.setdefault((passenger.source_floor, passenger.direction), []).append(i)
+        if len(groups) == 0:
+            return []
+        costs = np.array([fleet.distance_from(source_floor, direction) for source_floor, direction in groups])
+        demand = np.array([len(group) for group in groups.values()], dtype=np.int64)
+        flow = _min_cost_transport(costs, demand, np.maximum(fleet.headroom, 0))
+
+        assignments: List[Optional[int]] = [None] * len(passengers)
+        for group_flow, group in zip(flow, groups.values()):
+            for i, elevator_index in zip(group, np.repeat(np.arange(len(elevators)), group_flow).tolist()):
+                assignments[i] = elevator_index
+                fleet.mark_changed(elevator_index)
+        return assignments
+
+    def elevators_moved(self):
+        """
+        The function is called by the controller whenever the elevators move, so that the fleet state is only read from
+        every elevator once per move instead of once per batch.
+        """
+        self.fleet.elevators_moved()
+
+
+class _ElevatorScores:
+    """
+    The scores of every elevator for the passengers calling from a floor in a direction, kept by
+    `MemoizedAssignmentStrategy`.
+    """
+    __slots__ = ("scores", "tick", "picks")
+    scores: np.ndarray
+    # the change tick of the memo when the scores were last brought up to date.
+    tick: int
+    # the elevator picked from the scores for each destination floor, until a score changes.
+    picks: Dict[int, Optional[int]]
+
+    def __init__(self, scores: np.ndarray, tick: int):
+        self.scores = scores
+        self.tick = tick
+        self.picks = {}
+
+
+class MemoizedAssignmentStrategy:
+    """
+    A wrapper which remembers the score another assignment strategy gives every elevator for the passengers calling from
+    each floor in each direction. Each `Elevator` increments its `state_version` whenever its targets, direction,
+    passenger count or floor change, and on each assignment only the elevators whose state version changed since they
+    were scored are scored again. The wrapped strategy picks the elevator from the scores, and its pick is kept for the
+    passenger's destination floor until a score changes. The state versions are read from every elevator on each
+    assignment, unless the controller reports moves with `elevators_moved`: from then on, they are only read from every
+    elevator after a move, and in between from the elevator picked last. The wrapped strategy must implement the
+    `ScoringElevatorAssignmentStrategy` hooks, as the looping and vectorized strategies of this module do; other
+    strategies are asked directly on every assignment. The `hits` and `misses` counters show how many elevator scores
+    were reused and computed. The memo and counters are kept in checkpoints, along with the wrapped strategy's state if it
+    has the checkpoint hooks, so that a restored run reuses the same scores.
+    """
+    strategy: ElevatorAssignmentStrategy
+    hits: int
+    misses: int
+    # the scores of the elevators for each pair of source floor and direction value.
+    _memo: Dict[Tuple[int, int], _ElevatorScores]
+    _elevators: Optional[List[Elevator]]
+    # the state version of every elevator when it was last read, and the change tick at which it last changed. The
+    # change tick is incremented whenever the state version of some elevators is found to have changed.
+    _state_versions: np.ndarray
+    _changed_at: np.ndarray
+    _tick: int
+    # whether every move of the elevators is reported with `elevators_moved`.
+    _tracking_moves: bool
+    # the elevators which may have changed since the last assignment, or None if any of them may have.
+    _changed: Optional[List[int]]
+    # whether the memo was restored from a checkpoint, and carries on with the next list of elevators it is given.
+    _restored: bool
+
+    def __init__(self, strategy: ElevatorAssignmentStrategy):
+        """
+        The function wraps an assignment strategy.
+
+        :param strategy: The assignment strategy to memoize
+        :type strategy: ElevatorAssignmentStrategy
+        """
+        self.strategy = strategy
+        self.hits = 0
+        self.misses = 0
+        self._memo = {}
+        self._elevators = None
+        self._state_versions = np.zeros(0, dtype=np.int64)
+        self._changed_at = np.zeros(0, dtype=np.int64)
+        self._tick = 0
+        self._tracking_moves = False
+        self._changed = None
+        self._restored = False
+
+    @property
+    def retry_on_availability_change(self) -> bool:
+        return getattr(self.strategy, "retry_on_availability_change", False)
+
+    @property
+    def use_elevator_floor_index(self) -> Optional[Callable[[ElevatorFloorIndex], None]]:
+        # only a strategy which is asked directly uses the index of the elevators by floor.
+        if hasattr(self.strategy, "score_elevator"):
+            return None
+        return getattr(self.strategy, "use_elevator_floor_index", None)
+
+    @property
+    def use_elevator_stop_index(self) -> Optional[Callable[[ElevatorStopIndex], None]]:
+        # only a strategy which is asked directly uses the index of the elevators by target floor.
+        if hasattr(self.strategy, "score_elevator"):
+            return None
+        return getattr(self.strategy, "use_elevator_stop_index", None)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of the elevator scores reused from the memo, or 0 before the first assignment.
+        """
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+    def assign_elevator(self, passenger: Passenger, elevators: List[Elevator]) -> Optional[int]:
+        """
+        The function assigns a passenger to the elevator the wrapped strategy picks from the scores of the elevators for
+        the passenger's source floor and direction, scoring again only the elevators which changed since they were scored.
+
+        :param passenger: The passenger who needs to be assigned to an elevator
+        :type passenger: Passenger
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        :return: the index of the assigned elevator as an integer, or None if no elevator is assigned.
+        """
+        score_elevator = getattr(self.strategy, "score_elevator", None)
+        n = len(elevators)
+        if score_elevator is None:
+            self.misses += n
+            return self.strategy.assign_elevator(passenger, elevators)
+        self._read_state_versions(elevators)
+        source_floor, direction = passenger.source_floor, passenger.direction
+        key = (source_floor, direction.value)
+        memo = self._memo.get(key)
+        if memo is None:
+            memo = self._memo[key] = _ElevatorScores(
+                np.fromiter((score_elevator(source_floor, direction, e) for e in elevators), np.int64, n), self._tick)
+            self.misses += n
+        elif memo.tick != self._tick:
+            changed = np.flatnonzero(self._changed_at > memo.tick).tolist()
+            for i in changed:
+                memo.scores[i] = score_elevator(source_floor, direction, elevators[i])
+            memo.tick = self._tick
+            if changed:
+                memo.picks.clear()
+            self.misses += len(changed)
+            self.hits += n - len(changed)
+        else:
+            self.hits += n
+        destination_floor = passenger.destination_floor
+        if destination_floor in memo.picks:
+            elevator_index = memo.picks[destination_floor]
+        else:
+            elevator_index = memo.picks[destination_floor] = \
+                self.strategy.pick_from_scores(passenger, memo.scores, elevators)
+        # the controller only changes the elevator it is given between moves.
+        self._changed = None if not self._tracking_moves else [] if elevator_index is None else [elevator_index]
+        return elevator_index
+
+    def elevators_moved(self):
+        """
+        The function is called by the controller whenever the elevators move, so that the state versions are read from
+        every elevator once per move instead of once per assignment. It tells the wrapped strategy too if it has an
+        `elevators_moved` hook.
+        """
+        self._tracking_moves = True
+        self._changed = None
+        elevators_moved = getattr(self.strategy, "elevators_moved", None)
+        if elevators_moved is not None:
+            elevators_moved()
+
+    def get_checkpoint_state(self) -> Dict[str, Any]:
+        """
+        The function returns the memo, its counters and the state of the wrapped strategy, to be kept in a checkpoint.
+        :return: the state of the memo.
+        """
+        get_checkpoint_state = getattr(self.strategy, "get_checkpoint_state", None)
+        return {"hits": self.hits, "misses": self.misses, "memo": self._memo, "state_versions": self._state_versions,
+                "changed_at": self._changed_at, "tick": self._tick, "tracking_moves": self._tracking_moves,
+                "strategy": None if get_checkpoint_state is None else get_checkpoint_state()}
+
+    def set_checkpoint_state(self, state: Dict[str, Any]):
+        """
+        The function sets the memo back to its state at a checkpoint. The state versions of every restored elevator are
+        read again on the next assignment.
+
+        :param state: The state returned by `get_checkpoint_state`
+        :type state: Dict[str, Any]
+        """
+        self.hits = state["hits"]
+        self.misses = state["misses"]
+        self._memo = state["memo"]
+        self._state_versions = state["state_versions"]
+        self._changed_at = state["changed_at"]
+        self._tick = state["tick"]
+        self._tracking_moves = state["tracking_moves"]
+        self._changed = None
+        self._restored = True
+        set_checkpoint_state = getattr(self.strategy, "set_checkpoint_state", None)
+        if set_checkpoint_state is not None and state["strategy"] is not None:
+            set_checkpoint_state(state["strategy"])
+
+    def _read_state_versions(self, elevators: List[Elevator]):
+        """
+        The function reads the state versions of the elevators which may have changed since the last assignment, and
+        records the ones which did change at a new change tick. The memo is cleared when given a different list of
+        elevators, unless it was just restored from a checkpoint.
+        """
+        n = len(elevators)
+        if self._restored:
+            self._restored = False
+            if n == len(self._state_versions):
+                self._elevators = elevators
+        if elevators is not self._elevators or n != len(self._state_versions):
+            self._elevators = elevators
+            self._memo = {}
+            self._state_versions = np.fromiter((e.state_version for e in elevators), np.int64, n)
+            self._changed_at = np.zeros(n, dtype=np.int64)
+            self._tick = 0
+        elif self._changed is None:
+            state_versions = np.fromiter((e.state_version for e in elevators), np.int64, n)
+            changed = state_versions != self._state_versions
+            if changed.any():
+                self._tick += 1
+                self._changed_at[changed] = self._tick
+                self._state_versions = state_versions
+        else:
+            for i in self._changed:
+                state_version = elevators[i].state_version
+                if state_version != self._state_versions[i]:
+                    self._tick += 1
+                    self._changed_at[i] = self._tick
+                    self._state_versions[i] = state_version
+
+
+def _min_cost_transport(costs: np.ndarray, demand: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """
+    The function solves a transportation problem with successive shortest paths: it ships as many units from the groups
+    to the elevators as the demand and capacity allow, at the smallest total cost. Each path is found with Dijkstra's
+    algorithm on costs reduced by node potentials. Only the groups are visited one at a time: visiting a group relaxes
+    every elevator at once, and the elevators relax the groups whose units they hold, so a search takes at most one
+    visit per group however large the fleet is.
+
+    :param costs: The cost of shipping a unit from each group (rows) to each elevator (columns), all non-negative
+    :type costs: np.ndarray
+    :param demand: The number of units of each group
+    :type demand: np.ndarray
+    :param capacity: The number of units each elevator can take
+    :type capacity: np.ndarray
+    :return: the number of units shipped from each group to each elevator.
+    """
+    n_groups, n_elevators = costs.shape
+    flow = np.zeros((n_groups, n_elevators), dtype=np.int64)
+    # the (group, elevator) pairs with units shipped, which are few compared to the size of `flow`.
+    shipped_pairs = set()
+    demand = demand.copy()
+    capacity = capacity.copy()
+    # the costs are non-negative, so zero potentials keep the reduced costs of the first search non-negative.
+    group_potential = np.zeros(n_groups)
+    elevator_potential = np.zeros(n_elevators)
+    sink_potential = 0.0
+    while demand.any() and capacity.any():
+        # the source reaches each group with demand left, at a reduced cost of minus the group's potential.
+        group_dist = np.where(demand > 0, -group_potential, np.inf)
+        group_done = np.zeros(n_groups, dtype=bool)
+        group_parent = np.full(n_groups, -1)
+        elevator_dist = np.full(n_elevators, np.inf)
+        elevator_parent = np.full(n_elevators, -1)
+        sink_dist, sink_parent = np.inf, -1
+        # units already shipped to an elevator can be sent back to their group.
+        shipped_group = np.fromiter((g for g, _ in shipped_pairs), np.int64, len(shipped_pairs))
+        shipped_elevator = np.fromiter((e for _, e in shipped_pairs), np.int64, len(shipped_pairs))
+        send_back_cost = elevator_potential[shipped_elevator] - costs[shipped_group, shipped_elevator] - \
+            group_potential[shipped_group]
+        while True:
+            open_group_dist = np.where(group_done, np.inf, group_dist)
+            g = int(np.argmin(open_group_dist))
+            if open_group_dist[g] == np.inf or sink_dist <= open_group_dist[g]:
+                break
+            group_done[g] = True
+            dist = group_dist[g] + costs[g] + group_potential[g] - elevator_potential
+            shorter = dist < elevator_dist
+            elevator_dist[shorter] = dist[shorter]
+            elevator_parent[shorter] = g
+
+            to_sink = np.where(capacity > 0, elevator_dist + elevator_potential - sink_potential, np.inf)
+            e = int(np.argmin(to_sink))
+            if to_sink[e] < sink_dist:
+                sink_dist, sink_parent = to_sink[e], e
+            if len(shipped_group) > 0:
+                sent_back_dist = elevator_dist[shipped_elevator] + send_back_cost
+                # the shortest way back to each group, from the lowest elevator index among equally short ones.
+                order = np.lexsort((shipped_elevator, sent_back_dist, shipped_group))
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = shipped_group[order[1:]] != shipped_group[order[:-1]]
+                best = order[first]
+                reached, reached_dist = shipped_group[best], sent_back_dist[best]
+                shorter = ~group_done[reached] & (reached_dist < group_dist[reached])
+                group_dist[reached[shorter]] = reached_dist[shorter]
+                group_parent[reached[shorter]] = shipped_elevator[best[shorter]]
+        if sink_dist == np.inf:
+            break
+        group_potential += np.minimum(group_dist, sink_dist)
+        elevator_potential += np.minimum(elevator_dist, sink_dist)
+        sink_potential += sink_dist
+
+        # walk the path back from the sink, alternating between shipping and sending back units.
+        shipped, sent_back = [], []
+        e = sink_parent
+        amount = capacity[e]
+        while True:
+            g = elevator_parent[e]
+            shipped.append((g, e))
+            e = group_parent[g]
+            if e == -1:
+                amount = min(amount, demand[g])
+                break
+            sent_back.append((g, e))
+            amount = min(amount, flow[g, e])
+        for g, e in shipped:
+            flow[g, e] += amount
+            shipped_pairs.add((g, e))
+        for g, e in sent_back:
+            flow[g, e] -= amount
+            if flow[g, e] == 0:
+                shipped_pairs.discard((g, e))
+        capacity[sink_parent] -= amount
+        demand[shipped[-1][0]] -= amount
+
+        # every other direct path with a zero reduced cost is as short, so units are shipped on them without searching.
+        tight_elevators = (capacity > 0) & (elevator_potential == sink_potential)
+        for g in np.flatnonzero((demand > 0) & (group_potential == 0)).tolist():
+            reduced_costs = costs[g] + group_potential[g] - elevator_potential
+            for e in np.flatnonzero(tight_elevators & (reduced_costs == 0)).tolist():
+                amount = min(demand[g], capacity[e])
+                flow[g, e] += amount
+                shipped_pairs.add((g, e))
+                demand[g] -= amount
+                capacity[e] -= amount
+                if capacity[e] == 0:
+                    tight_elevators[e] = False
+                if demand[g] == 0:
+                    break
+    return flow
@@ -42,6 +42,19 @@ class NoopPersistenceStrategy:
         """
         pass
 
+    def persist_skipped(self, t: int, n_steps: int, elevators: List[Elevator]):
+        """
+        The function is called instead of `persist` when the controller skips over quiet time-steps.
+
+        :param t: An integer representing the time before the skipped time-steps
+        :type t: int
+        :param n_steps: The number of time-steps being skipped
+        :type n_steps: int
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects, as they were before the skip
+        :type elevators: List[Elevator]
+        """
+        pass
+
 
 class CsvPersistenceStrategy:
     wr: Writer
@@ -68,3 +81,23 @@ class CsvPersistenceStrategy:
             self.n_elevators = len(elevators)
             self._write_header()
         self.wr.writerow([t, *[e.current_floor for e in elevators]])
+
+    def persist_skipped(self, t: int, n_steps: int, elevators: List[Elevator]):
+        """
+        The `persist_skipped` function writes the floor of each elevator for every time-step the controller skips over. The
+        floors are read from each elevator's planned travel, which is exact over a skip since no elevator stops before its
+        end, so the elevators don't need to be moved one time-step at a time.
+
+        :param t: The parameter "t" represents the time before the skipped time-steps
+        :type t: int
+        :param n_steps: The number of time-steps being skipped
+        :type n_steps: int
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects, as they were before the skip
+        :type elevators: List[Elevator]
+        """
+        if self.n_elevators is None:
+            self.n_elevators = len(elevators)
+            self._write_header()
+        travels = [(e.current_floor, e.planned_travel()[1]) for e in elevators]
+        self.wr.writerows([t + step, *[floors[min(step, len(floors)) - 1] if len(floors) else floor
+                                       for floor, floors in travels]] for step in range(1, n_steps + 1))
@@ -1,8 +1,8 @@
-from math import floor
 import numpy as np
-from typing import Protocol, List
+from typing import Any, Dict, Optional, Protocol, List, Tuple
 
 from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
 
 
 class ElevatorIdleStrategy(Protocol):
@@ -16,7 +16,49 @@ class ElevatorIdleStrategy(Protocol):
         ...
 
 
+class LearningElevatorIdleStrategy(ElevatorIdleStrategy, Protocol):
+    def observe_request(self, passenger: Passenger) -> bool:
+        """
+        The function learns from a passenger requesting an elevator. The controller calls it once for every passenger
+        arriving, whenever the idle strategy has it.
+
+        :param passenger: The passenger requesting an elevator
+        :type passenger: Passenger
+        :return: whether the idle targets may have changed, in which case the controller asks the strategy to position the
+        idle elevators again on its next step.
+        """
+        ...
+
+
+class TimedElevatorIdleStrategy(ElevatorIdleStrategy, Protocol):
+    def set_time(self, time: int) -> bool:
+        """
+        The function tells the strategy the current time-step of the simulation. The controller calls it on every step,
+        before asking the strategy to position the idle elevators, whenever the idle strategy has it.
+
+        :param time: The current time-step of the simulation
+        :type time: int
+        :return: whether the idle targets may have changed since the last time-step.
+        """
+        ...
+
+    def steps_until_change(self, time: int) -> int:
+        """
+        The function computes for how many time-steps from `time` on the idle targets stay those of the last time-step the
+        strategy was told, so that the controller doesn't skip over a change of idle targets.
+
+        :param time: The time-step from which the controller would skip ahead
+        :type time: int
+        :return: the number of time-steps with the same idle targets, 0 if they already changed.
+        """
+        ...
+
+
 class MiddleFloorIdleStrategy:
+    # every elevator's target is the middle floor whatever the other elevators do, so it never changes once set and the
+    # controller needn't ask again on every tick.
+    position_on_idle_change = True
+
     def position_idle_elevators(self, elevators: List[Elevator]):
         """
         The function sets the idle target floor for each elevator to the middle floor of the building.
@@ -30,6 +72,31 @@ class MiddleFloorIdleStrategy:
 
 
 class EqualSpreadIdleStrategy:
+    # the floors are split evenly between the empty elevators, so the targets only change with the number of them.
+    position_on_idle_change = True
+    # the idle targets by number of floors and number of idle elevators.
+    _targets_by_idle_count: Dict[Tuple[int, int], List[int]]
+
+    def __init__(self):
+        self._targets_by_idle_count = {}
+
+    def idle_targets(self, top_floor: int, n_idle: int) -> List[int]:
+        """
+        The function calculates the idle targets spreading a number of idle elevators evenly across the floors, computing
+        them once per number of floors and number of idle elevators.
+
+        :param top_floor: The highest floor the elevators can reach
+        :type top_floor: int
+        :param n_idle: The number of idle elevators
+        :type n_idle: int
+        :return: the idle target of each idle elevator, in the order of the elevators.
+        """
+        targets = self._targets_by_idle_count.get((top_floor, n_idle))
+        if targets is None:
+            targets = [round((i + 0.5) * top_floor / n_idle) for i in range(n_idle)]
+            self._targets_by_idle_count[(top_floor, n_idle)] = targets
+        return targets
+
     def position_idle_elevators(self, elevators: List[Elevator]):
         """
         The function positions idle elevators evenly across the floors they can reach.
@@ -41,19 +108,61 @@ class EqualSpreadIdleStrategy:
         assert len(set([e.num_floors for e in elevators])) == 1
         top_floor = elevators[0].num_floors
         idle_elevators = [e for e in elevators if e.is_empty()]
-        for i in range(len(idle_elevators)):
-            elevator = idle_elevators[i]
-            target_floor = round((i + 0.5) * top_floor / (len(idle_elevators)))
+        for elevator, target_floor in zip(idle_elevators, self.idle_targets(top_floor, len(idle_elevators))):
             elevator.idle_target = target_floor
 
 
 class HistoricalDistributionIdleStrategy:
+    # the history is fixed when the strategy is created, so the targets only change with the number of empty elevators.
+    position_on_idle_change = True
+    # the number of historical passenger requests from each floor, starting with the first floor.
+    floor_counts: np.ndarray
+    # the number of historical passenger requests from each floor and the floors below it.
+    cumulative_counts: np.ndarray
+    total_obs: int
+    # the highest floor with a historical passenger request.
+    top_floor: int
+    # the idle targets by number of idle elevators.
+    _targets_by_idle_count: Dict[int, List[int]]
+
     def __init__(self, historical_counts: List[int]):
         """
-        This init allows the user to specify historical data observed prior to simulation start
+        This init allows the user to specify historical data observed prior to simulation start. Only the cumulative
+        counts are kept, so the memory used grows with the number of floors rather than with the number of observations.
         """
-        self.total_obs = sum(historical_counts)
-        self.historical_counts = [i + 1  for i, h in enumerate(historical_counts) for _ in range(h)]
+        self.floor_counts = np.asarray(historical_counts, dtype=np.int64)
+        self.cumulative_counts = np.cumsum(self.floor_counts)
+        self.total_obs = int(self.cumulative_counts[-1]) if len(self.cumulative_counts) else 0
+        self.top_floor = int(self._floor_of(self.total_obs - 1))
+        self._targets_by_idle_count = {}
+
+    def _floor_of(self, observations: np.ndarray) -> np.ndarray:
+        """
+        The function finds the floor of observations given by their rank, as if the historical passenger requests were
+        listed one by one, ordered by floor.
+        """
+        return np.searchsorted(self.cumulative_counts, observations, side="right") + 1
+
+    def quantile_floors(self, quantiles: np.ndarray) -> np.ndarray:
+        """
+        The function calculates quantiles of the historical source floors by binary search over the cumulative counts. The
+        result is the same as that of `np.quantile` with its default 'linear' method over the list of every historical
+        source floor, rounded down to a floor.
+
+        :param quantiles: The quantiles to calculate, between 0 and 1
+        :type quantiles: np.ndarray
+        :return: an integer array with the floor of each quantile.
+        """
+        virtual_indexes = (self.total_obs - 1) * quantiles
+        previous_indexes = np.floor(virtual_indexes)
+        gamma = virtual_indexes - previous_indexes
+        previous_indexes = previous_indexes.astype(np.int64)
+        below = self._floor_of(previous_indexes)
+        above = self._floor_of(np.minimum(previous_indexes + 1, self.total_obs - 1))
+        # interpolates as `np.quantile` does, from whichever end is nearest.
+        diff = above - below
+        interpolated = np.where(gamma >= 0.5, above - diff * (1 - gamma), below + diff * gamma)
+        return np.floor(interpolated).astype(np.int64)
 
     def position_idle_elevators(self, elevators: List[Elevator]):
         """
@@ -66,11 +175,252 @@ class HistoricalDistributionIdleStrategy:
         floor_counts = set([e.num_floors for e in elevators])
         assert len(elevators) > 0
         assert len(floor_counts) == 1
-        assert floor_counts.pop() >= max(self.historical_counts)
+        assert floor_counts.pop() >= self.top_floor
+        idle_elevators = [e for e in elevators if e.is_empty()]
+        targets = self._targets_by_idle_count.get(len(idle_elevators))
+        if targets is None:
+            target_quantiles = (np.arange(len(idle_elevators)) + 0.5) / len(idle_elevators)
+            targets = self.quantile_floors(target_quantiles).tolist()
+            self._targets_by_idle_count[len(idle_elevators)] = targets
+        for elevator, target_floor in zip(idle_elevators, targets):
+            elevator.idle_target = target_floor
+
+
+class StreamingDistributionIdleStrategy:
+    # the targets only depend on which elevators are empty until a request is observed, which tells the controller when
+    # they may have changed.
+    position_on_idle_change = True
+    # the exponentially decayed number of passenger requests from each floor, starting with the first floor. The weights
+    # are scaled up by `2 ** ((time - _origin) / half_life)` rather than decaying every floor as time passes.
+    floor_weights: np.ndarray
+    # the number of time-steps after which the weight of a request is halved.
+    half_life: float
+    # the largest difference between the normalized cumulative weights of the floors and those the targets were computed
+    # from past which they are computed again. It is only checked once the weight observed since the last check is more
+    # than this share of the total weight, since the distribution can't have drifted further before.
+    drift_threshold: float
+    # the number of times the cumulative weights the targets are computed from were computed.
+    recomputations: int = 0
+    _origin: int
+    _total_weight: float
+    # the weight observed since the drift was last checked.
+    _drifted_weight: float
+    # the cumulative weights the targets are computed from, or None until the targets are next needed.
+    _cumulative_weights: Optional[np.ndarray]
+    # the idle targets by number of idle elevators.
+    _targets_by_idle_count: Dict[int, List[int]]
+
+    def __init__(self, n_floors: int, half_life: float = 3600, drift_threshold: float = 0.05,
+                 prior_counts: Optional[List[int]] = None):
+        """
+        This init allows the user to specify the size of the building, how quickly old requests are forgotten, and
+        optionally historical data to start from. Without historical data, every floor starts with a weight of 1, which
+        is forgotten as requests are observed.
+        """
+        self.floor_weights = np.ones(n_floors) if prior_counts is None else np.asarray(prior_counts, dtype=np.float64)
+        assert len(self.floor_weights) == n_floors
+        self.half_life = half_life
+        self.drift_threshold = drift_threshold
+        self._origin = 0
+        self._total_weight = float(self.floor_weights.sum())
+        self._drifted_weight = 0.0
+        self._cumulative_weights = None
+        self._targets_by_idle_count = {}
+
+    def get_checkpoint_state(self) -> Dict[str, Any]:
+        """
+        The function returns the decayed histogram and the targets computed from it, to be kept in a checkpoint.
+        :return: the state of the strategy.
+        """
+        return {"floor_weights": self.floor_weights, "recomputations": self.recomputations, "origin": self._origin,
+                "total_weight": self._total_weight, "drifted_weight": self._drifted_weight,
+                "cumulative_weights": self._cumulative_weights, "targets_by_idle_count": self._targets_by_idle_count}
+
+    def set_checkpoint_state(self, state: Dict[str, Any]):
+        """
+        The function sets the decayed histogram and the targets computed from it back to their state at a checkpoint.
+
+        :param state: The state returned by `get_checkpoint_state`
+        :type state: Dict[str, Any]
+        """
+        self.floor_weights = state["floor_weights"]
+        self.recomputations = state["recomputations"]
+        self._origin = state["origin"]
+        self._total_weight = state["total_weight"]
+        self._drifted_weight = state["drifted_weight"]
+        self._cumulative_weights = state["cumulative_weights"]
+        self._targets_by_idle_count = state["targets_by_idle_count"]
+
+    def observe_request(self, passenger: Passenger) -> bool:
+        """
+        The function adds a passenger request to the decayed histogram of source floors, in constant time. Once the weight
+        observed since the drift was last checked is more than `drift_threshold` of the total weight, the normalized
+        cumulative weights of the floors are compared with those the idle targets were computed from, and the targets are
+        only computed again if they differ by more than `drift_threshold` on some floor.
+
+        :param passenger: The passenger requesting an elevator
+        :type passenger: Passenger
+        :return: whether the distribution has drifted past the threshold, and the idle targets may have changed.
+        """
+        if not 1 <= passenger.source_floor <= len(self.floor_weights):
+            raise ValueError(f"source floor {passenger.source_floor} of passenger {passenger.id} is not one of the "
+                             f"{len(self.floor_weights)} floors of the building")
+        exponent = (passenger.request_time - self._origin) / self.half_life
+        if exponent > 512:
+            # rescales the weights before they overflow, every 512 half-lives.
+            self.floor_weights *= 2.0 ** -exponent
+            self._total_weight *= 2.0 ** -exponent
+            self._drifted_weight *= 2.0 ** -exponent
+            self._origin = passenger.request_time
+            exponent = 0
+        weight = 2.0 ** exponent
+        self.floor_weights[passenger.source_floor - 1] += weight
+        self._total_weight += weight
+        self._drifted_weight += weight
+        if self._drifted_weight <= self.drift_threshold * self._total_weight:
+            return False
+        self._drifted_weight = 0.0
+        if self._cumulative_weights is not None:
+            cumulative_weights = np.cumsum(self.floor_weights)
+            drift = np.abs(cumulative_weights / cumulative_weights[-1] -
+                           self._cumulative_weights / self._cumulative_weights[-1]).max()
+            if drift <= self.drift_threshold:
+                return False
+        self._cumulative_weights = None
+        self._targets_by_idle_count = {}
+        return True
+
+    def quantile_floors(self, quantiles: np.ndarray) -> np.ndarray:
+        """
+        The function calculates quantiles of the decayed source floor distribution, by binary search over the cumulative
+        weights of the floors.
+
+        :param quantiles: The quantiles to calculate, between 0 and 1
+        :type quantiles: np.ndarray
+        :return: an integer array with the floor of each quantile.
+        """
+        if self._cumulative_weights is None:
+            self._cumulative_weights = np.cumsum(self.floor_weights)
+            self.recomputations += 1
+        cumulative_weights = self._cumulative_weights
+        floors = np.searchsorted(cumulative_weights, quantiles * cumulative_weights[-1], side="left") + 1
+        return np.minimum(floors, len(cumulative_weights))
+
+    def position_idle_elevators(self, elevators: List[Elevator]):
+        """
+        This strategy positions idle elevators across the floors, weighted by how often each floor has recently been a
+        source floor for passenger requests.
+
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        """
+        floor_counts = set([e.num_floors for e in elevators])
+        assert len(elevators) > 0
+        assert len(floor_counts) == 1
+        assert floor_counts.pop() == len(self.floor_weights)
         idle_elevators = [e for e in elevators if e.is_empty()]
-        i = 0
-        for i in range(len(idle_elevators)):
-            elevator = idle_elevators[i]
-            target_quantile = (i + 0.5) / len(idle_elevators)
-            elevator.idle_target = floor(np.quantile(self.historical_counts, target_quantile))
+        targets = self._targets_by_idle_count.get(len(idle_elevators))
+        if targets is None:
+            target_quantiles = (np.arange(len(idle_elevators)) + 0.5) / len(idle_elevators)
+            targets = self.quantile_floors(target_quantiles).tolist()
+            self._targets_by_idle_count[len(idle_elevators)] = targets
+        for elevator, target_floor in zip(idle_elevators, targets):
+            elevator.idle_target = target_floor
+
+
+class TimeOfDayIdleStrategy:
+    # the targets only depend on which elevators are empty until the time window changes, which `set_time` reports.
+    position_on_idle_change = True
+    # the number of time-steps in each time window.
+    window_length: int
+    # the idle targets by time window and number of idle elevators.
+    targets: List[List[List[int]]]
+    # the highest floor with a historical passenger request in any time window.
+    top_floor: int
+    # the time window the idle elevators are positioned for, the first one until the controller sets the time.
+    window: int = 0
+
+    def __init__(self, historical_counts_by_window: List[List[int]], window_length: int, n_elevators: int):
+        """
+        This init allows the user to specify historical data for each time window of a cycle, e.g. one list of counts by
+        floor for each hour of a day, with `window_length` time-steps per window. The cycle repeats once the last window
+        is over. The idle targets of every time window and every number of idle elevators up to `n_elevators` are
+        computed up front.
+        """
+        assert len(historical_counts_by_window) > 0
+        windows = [HistoricalDistributionIdleStrategy(historical_counts=counts) for counts in historical_counts_by_window]
+        self.window_length = window_length
+        self.targets = [[w.quantile_floors((np.arange(n_idle) + 0.5) / max(n_idle, 1)).tolist()
+                         for n_idle in range(n_elevators + 1)]
+                        for w in windows]
+        self.top_floor = max(w.top_floor for w in windows)
+
+    def window_at(self, time: int) -> int:
+        """
+        The function finds the time window a time-step falls in.
+
+        :param time: A time-step of the simulation
+        :type time: int
+        :return: the index of the time window.
+        """
+        return (time // self.window_length) % len(self.targets)
+
+    def set_time(self, time: int) -> bool:
+        """
+        The function selects the time window of the current time-step.
+
+        :param time: The current time-step of the simulation
+        :type time: int
+        :return: whether the time window changed, and with it the idle targets.
+        """
+        window = self.window_at(time)
+        changed = window != self.window
+        self.window = window
+        return changed
 
+    def get_checkpoint_state(self) -> int:
+        """
+        The function returns the selected time window, to be kept in a checkpoint.
+        :return: the index of the time window.
+        """
+        return self.window
+
+    def set_checkpoint_state(self, state: int):
+        """
+        The function selects the time window selected at a checkpoint.
+
+        :param state: The index of the time window returned by `get_checkpoint_state`
+        :type state: int
+        """
+        self.window = state
+
+    def steps_until_change(self, time: int) -> int:
+        """
+        The function computes for how many time-steps from `time` on the selected time window lasts.
+
+        :param time: The time-step from which the controller would skip ahead
+        :type time: int
+        :return: the number of time-steps left in the selected time window, 0 if `time` falls in another one.
+        """
+        if self.window_at(time) != self.window:
+            return 0
+        return self.window_length - time % self.window_length
+
+    def position_idle_elevators(self, elevators: List[Elevator]):
+        """
+        This strategy positions idle elevators across the floors, weighted by the frequency at which each floor is a
+        source floor for historical passenger requests during the selected time window, looking the targets up in the
+        tables computed up front.
+
+        :param elevators: The `elevators` parameter is a list of `Elevator` objects
+        :type elevators: List[Elevator]
+        """
+        floor_counts = set([e.num_floors for e in elevators])
+        assert len(elevators) > 0
+        assert len(floor_counts) == 1
+        assert floor_counts.pop() >= self.top_floor
+        idle_elevators = [e for e in elevators if e.is_empty()]
+        targets = self.targets[self.window]
+        assert len(idle_elevators) < len(targets)
+        for elevator, target_floor in zip(idle_elevators, targets[len(idle_elevators)]):
+            elevator.idle_target = target_floor
@@ -0,0 +1,150 @@
+import copy
+import itertools
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.strategies.elevator_controller_persistence import CsvPersistenceStrategy, \
+    NoopPersistenceStrategy
+
+PassengerProviderFactory = Callable[[Dict[str, Any]], Iterator[List[Passenger]]]
+
+
+def expand_parameter_grid(parameter_grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    The function expands a parameter grid into the list of every combination of its values, in a deterministic order.
+
+    :param parameter_grid: A dictionary mapping each `ElevatorController` parameter (e.g. `assignment_strategy`,
+    `idle_strategy`, `stop_time`, `n_elevators`) to the sequence of values it should take
+    :type parameter_grid: Dict[str, Sequence[Any]]
+    :return: a list of dictionaries, one per configuration.
+    """
+    keys = list(parameter_grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(parameter_grid[k] for k in keys))]
+
+
+def configuration_seed(base_seed: int, workload: Dict[str, Any], replicate: int = 0) -> int:
+    """
+    The function derives the random seed of a run from the base seed of a sweep, the parameters which shape its passenger
+    workload and its replicate number. Configurations which only differ in other parameters, such as their strategies,
+    get the same seed and therefore the same passengers, and a run's seed doesn't depend on the rest of the grid nor on
+    which worker runs it or when.
+
+    :param base_seed: The base seed of the sweep
+    :type base_seed: int
+    :param workload: The parameters of the configuration which the passenger provider factory reads, e.g. `n_floors`
+    :type workload: Dict[str, Any]
+    :param replicate: The replicate number of the run, for configurations run several times. Defaults to 0
+    :type replicate: int (optional)
+    :return: the seed of the run.
+    """
+    entropy = [base_seed, replicate] + [zlib.crc32(repr((k, _describe(v))).encode())
+                                        for k, v in sorted(workload.items())]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def _describe(value: Any) -> Any:
+    """
+    The function describes a parameter's value for the results table: plain values as they are, and other objects such
+    as strategies as their class name followed by their public attributes, so differently configured instances of the
+    same class can be told apart.
+    """
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    parameters = [f"{k}={v!r}" if isinstance(v, str) else f"{k}={_describe(v)}"
+                  for k, v in getattr(value, "__dict__", {}).items() if not k.startswith("_")]
+    if len(parameters) == 0:
+        return type(value).__name__
+    return f"{type(value).__name__}({', '.join(parameters)})"
+
+
+def run_configuration(task: Tuple[Dict[str, Any], int, int, PassengerProviderFactory, bool]) -> Dict[str, Any]:
+    """
+    The function runs the simulation of a single configuration of a sweep and summarizes it as a row of the results table.
+
+    :param task: A tuple of the configuration (the `ElevatorController` parameters), its replicate number, its seed, the
+    passenger provider factory and whether to record the elevator locations
+    :type task: Tuple[Dict[str, Any], int, int, PassengerProviderFactory, bool]
+    :return: a dictionary with the configuration, the replicate number, the seed, the flattened statistics of the run, and
+    its trace if recorded.
+    """
+    configuration, replicate, seed, passenger_provider_factory, record_trace = task
+    # strategies are described as configured, before the run changes their state.
+    row = {k: _describe(v) for k, v in configuration.items()}
+    # strategies may keep state between steps, so each run gets its own copy of them.
+    configuration = copy.deepcopy(configuration)
+    np.random.seed(seed)
+    random.seed(seed)
+    trace = StringIO()
+    persistence_strategy = CsvPersistenceStrategy(f=trace) if record_trace else NoopPersistenceStrategy()
+    elevator_system = ElevatorController(persistence_strategy=persistence_strategy, **configuration)
+    elevator_system.handle_passenger_requests(passenger_provider_factory(configuration))
+
+    row["replicate"] = replicate
+    row["seed"] = seed
+    row["time"] = elevator_system.time
+    for summary_name, summary in elevator_system.get_stats().items():
+        for stat_name, value in summary.items():
+            row[f"{summary_name}_{stat_name}"] = value
+    if record_trace:
+        row["trace"] = trace.getvalue()
+    return row
+
+
+def sweep(parameter_grid: Dict[str, Sequence[Any]],
+          passenger_provider_factory: PassengerProviderFactory,
+          base_seed: int = 0,
+          max_workers: Optional[int] = None,
+          record_traces: bool = False,
+          workload_parameters: Sequence[str] = ("n_floors",),
+          replicates: int = 1) -> List[Dict[str, Any]]:
+    """
+    The function runs a simulation for every configuration of a parameter grid, fanning the runs out over a process pool,
+    and gathers their statistics into one table.
+
+    :param parameter_grid: A dictionary mapping each `ElevatorController` parameter to the sequence of values it should
+    take. Strategies are passed as instances, and are copied into each run.
+    :type parameter_grid: Dict[str, Sequence[Any]]
+    :param passenger_provider_factory: A function returning the passenger request source of a configuration. It is called
+    in the worker process after seeding `numpy.random` and `random` with the run's seed, so it must be picklable (e.g. a
+    module-level function or a `functools.partial` of one).
+    :type passenger_provider_factory: PassengerProviderFactory
+    :param base_seed: The seed from which each run's seed is derived, along with its workload parameters and replicate
+    number. Defaults to 0
+    :type base_seed: int (optional)
+    :param max_workers: The number of worker processes, as for `ProcessPoolExecutor`. If 1, the runs happen in the current
+    process. Defaults to the number of CPUs
+    :type max_workers: Optional[int] (optional)
+    :param record_traces: Whether to record the CSV elevator locations of each run in the 'trace' column. Defaults to False
+    :type record_traces: bool (optional)
+    :param workload_parameters: The parameters of the grid which the passenger provider factory reads. Runs with the same
+    values for them get the same seed, so every strategy faces the same passengers. Defaults to `n_floors`
+    :type workload_parameters: Sequence[str] (optional)
+    :param replicates: The number of times to run each configuration, each time with another seed. Defaults to 1
+    :type replicates: int (optional)
+    :return: a list with one row per configuration and replicate, in the order of the expanded parameter grid.
+    """
+    configurations = expand_parameter_grid(parameter_grid)
+    tasks = [(configuration, replicate,
+              configuration_seed(base_seed, {k: configuration[k] for k in workload_parameters if k in configuration},
+                                 replicate),
+              passenger_provider_factory, record_traces)
+             for configuration in configurations for replicate in range(replicates)]
+    if max_workers == 1:
+        return [run_configuration(task) for task in tasks]
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # a few chunks per worker keeps the pool busy without pickling each task on its own.
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        return list(executor.map(run_configuration, tasks, chunksize=chunksize))
@@ -1,14 +1,19 @@
+from functools import partial
 from io import StringIO
+from typing import Any, Dict, Iterator, List
 
 import numpy as np
 
 from elevator_system_design.elevator_controller import ElevatorController
 from elevator_system_design.log import logger
+from elevator_system_design.model.passenger import Passenger
 from elevator_system_design.passenger_providers import random_normal_floor_selection_passenger_provider, \
     random_uniform_floor_selection_passenger_provider
-from elevator_system_design.strategies.assignment import ExistingStopStrategy
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy
 from elevator_system_design.strategies.elevator_controller_persistence import CsvPersistenceStrategy
-from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, HistoricalDistributionIdleStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, HistoricalDistributionIdleStrategy, \
+    MiddleFloorIdleStrategy
+from elevator_system_design.sweep import sweep
 
 
 def main():
@@ -83,6 +88,31 @@ def historical_main():
     elevator_system.print_stats()
 
 
+def uniform_passenger_provider(configuration: Dict[str, Any], n_steps: int) -> Iterator[List[Passenger]]:
+    return random_uniform_floor_selection_passenger_provider(
+        n=5,
+        p=0.2,
+        n_steps=n_steps,
+        n_floors=configuration["n_floors"]
+    )
+
+
+def sweep_main():
+    parameter_grid = {
+        "n_elevators": [2, 3, 4],
+        "n_floors": [60],
+        "max_elevator_capacity": [5],
+        "stop_time": [0, 1, 2],
+        "assignment_strategy": [DirectionalStrategy(), ExistingStopStrategy()],
+        "idle_strategy": [EqualSpreadIdleStrategy(), MiddleFloorIdleStrategy()],
+    }
+    rows = sweep(parameter_grid, passenger_provider_factory=partial(uniform_passenger_provider, n_steps=100),
+                 base_seed=1231235)
+    for row in rows:
+        logger.info(row)
+
+
 if __name__ == "__main__":
     main()
     historical_main()
+    sweep_main()
@@ -1,4 +1,7 @@
+import random
+
 from elevator_system_design.model.elevator import Elevator, Direction
+from elevator_system_design.model.hall_call import HallCall
 from elevator_system_design.model.passenger import Passenger
 
 
@@ -48,8 +51,10 @@ def test_move_moves_to_pick_up_assigned_passenger():
     e.move()
     e.move()
     assert e.current_floor == 4
-    # the target heap has the two passengers' destination  floors.
-    assert e.targets[-1] == [5, 5]
+    # the two passengers' shared destination floor is a single stop.
+    assert e.targets[-1] == [5]
+    assert e.has_target_with_direction(5, Direction.UP)
+    assert not e.has_target_with_direction(5, Direction.DOWN)
 
 
 def test_move_changes_elevator_to_idle_after_all_targets_achieved():
@@ -74,3 +79,192 @@ def test_assign_passenger_puts_current_floor_on_next_sweep():
     # next upward sweep is populated with the source and dest floors of the passenger
     assert e.targets[0] == [3, 5]
 
+
+def test_assign_passenger_on_floor_of_empty_elevator_takes_passenger_direction():
+    e = Elevator(num_floors=10, max_capacity=1)
+    e.current_floor = 5
+    e.assign(Passenger(destination_floor=2, request_time=0, id="", source_floor=5))
+    # the elevator can pick up the passenger right away instead of waiting idle forever.
+    assert e.direction == Direction.DOWN
+    assert e.embark(Passenger(destination_floor=2, request_time=0, id="", source_floor=5))
+
+
+def test_assign_passenger_on_floor_of_empty_elevator_still_moving_keeps_its_direction():
+    e = Elevator(num_floors=10, max_capacity=1)
+    e.current_floor = 5
+    # the elevator has just dropped off its last passenger on its way up.
+    e.direction = Direction.UP
+    e.assign(Passenger(destination_floor=2, request_time=0, id="", source_floor=5))
+    assert e.direction == Direction.UP
+    assert e.targets[1] == [-5, -2]
+
+
+def test_planned_travel_while_cruising_to_next_stop():
+    e = Elevator(num_floors=10, max_capacity=1)
+    e.assign(Passenger(destination_floor=8, request_time=0, id="", source_floor=4))
+    e.move()
+    assert e.current_floor == 2
+    assert e.planned_travel() == (2, range(3, 5))
+
+
+def test_planned_travel_while_resting():
+    e = Elevator(num_floors=10, max_capacity=1)
+    e.idle_target = 4
+    assert e.planned_travel() == (None, range(2, 5))
+    e.current_floor = 4
+    assert e.planned_travel() == (None, range(0))
+
+
+def test_advance_cruises_to_next_stop_in_one_call():
+    e = Elevator(num_floors=200, max_capacity=1)
+    e.assign(Passenger(destination_floor=150, request_time=0, id="", source_floor=100))
+
+    steps_to_next_stop = e.advance(99)
+
+    assert e.current_floor == 100
+    assert e.direction == Direction.UP
+    assert steps_to_next_stop == 50
+
+
+def test_advance_matches_moving_one_step_at_a_time():
+    rnd = random.Random(1231235)
+    for _ in range(500):
+        n_floors = rnd.choice([5, 20, 60])
+        moved = Elevator(num_floors=n_floors, max_capacity=5, stop_time=rnd.choice([0, 2]))
+        advanced = Elevator(num_floors=n_floors, max_capacity=5, stop_time=moved.stop_time)
+        idle_target = rnd.randint(1, n_floors)
+        moved.idle_target = advanced.idle_target = idle_target
+        for _ in range(rnd.randint(1, 4)):
+            source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+            passenger = Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+            moved.assign(passenger)
+            advanced.assign(passenger)
+            dt = rnd.randint(0, 2 * n_floors)
+            for _ in range(dt):
+                moved.move()
+            advanced.advance(dt)
+            assert (moved.current_floor, moved.direction, moved.targets, moved.current_stop_remaining) == \
+                (advanced.current_floor, advanced.direction, advanced.targets, advanced.current_stop_remaining)
+
+
+def reference_distance_from(e: Elevator, target: int, direction: Direction) -> int:
+    # the original O(targets) implementation of `Elevator.distance_from`, which scans the heaps on every call.
+    if e.direction == Direction.IDLE:
+        return abs(target - e.current_floor)
+    target_with_dir = target * direction.value
+    if e.current_floor * e.direction.value < target_with_dir:
+        return abs(target - e.current_floor) + sum({1 for t in e.targets[-1] if t <= target_with_dir}) * e.stop_time
+    end_of_current_sweep = abs(max(abs(max(e.targets[-1]) if e.targets[-1] else 0) * e.direction.value, abs(max(e.targets[1]) if e.targets[1] else 0) * e.direction.value))
+    distance_to_turn = abs(e.current_floor - abs(end_of_current_sweep)) + len(set(e.targets[-1])) * e.stop_time
+    if direction != e.direction:
+        distance_from_turn_to_target = abs(abs(end_of_current_sweep) - target) + sum({1 for t in e.targets[1] if t <= target_with_dir}) * e.stop_time
+        return distance_to_turn + distance_from_turn_to_target
+    end_of_next_sweep = abs(max(abs(max(e.targets[0]) if e.targets[0] else 0) * e.direction.value, abs(max(e.targets[1]) if e.targets[1] else 0) * e.direction.value))
+    distance_to_next_turn = abs(abs(end_of_next_sweep) - abs(end_of_current_sweep)) + len(set(e.targets[1])) * e.stop_time
+    distance_from_next_turn_to_target = abs(abs(end_of_next_sweep) - target) + sum({1 for t in e.targets[0] if t <= target_with_dir}) * e.stop_time
+    return distance_to_turn + distance_to_next_turn + distance_from_next_turn_to_target
+
+
+def test_distance_from_matches_scanning_the_targets():
+    rnd = random.Random(20240611)
+    for _ in range(300):
+        n_floors = rnd.choice([5, 20, 60])
+        e = Elevator(num_floors=n_floors, max_capacity=5, stop_time=rnd.choice([0, 1, 3]))
+        e.idle_target = rnd.randint(1, n_floors)
+        if rnd.random() < 0.3:
+            e = e.copy()
+        for _ in range(rnd.randint(1, 40)):
+            if rnd.random() < 0.3:
+                source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+                e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+            else:
+                e.move()
+            for target in rnd.sample(range(1, n_floors + 1), 5):
+                for direction in [Direction.UP, Direction.DOWN]:
+                    assert e.distance_from(target, direction) == reference_distance_from(e, target, direction)
+
+
+def test_availability_version_only_changes_when_elevator_may_take_more_passengers():
+    e = Elevator(num_floors=10, max_capacity=5)
+    e.current_floor = 1
+    passenger = Passenger(id="", source_floor=1, destination_floor=5, request_time=0)
+    e.assign(passenger)
+    assert e.embark(passenger)
+    availability_version = e.availability_version
+    e.move()
+    dispatch_version = e.dispatch_version
+
+    # cruising toward the destination changes nothing an assignment strategy relies on.
+    for _ in range(2):
+        e.move()
+    assert e.current_floor == 4
+    assert e.availability_version == availability_version
+    assert e.dispatch_version == dispatch_version
+
+    e.move()
+    e.disembark(passenger)
+    assert e.availability_version > availability_version
+    assert e.dispatch_version > dispatch_version
+
+
+def test_state_version_changes_with_the_floor_and_dispatch_version():
+    e = Elevator(num_floors=10, max_capacity=5)
+    e.idle_target = 1
+    state_version = e.state_version
+    # resting on the idle target changes nothing.
+    e.move()
+    assert e.state_version == state_version
+
+    e.idle_target = 4
+    for _ in range(3):
+        dispatch_version = e.dispatch_version
+        e.move()
+        assert e.dispatch_version == dispatch_version
+        assert e.state_version > state_version
+        state_version = e.state_version
+    e.assign(Passenger(id="", source_floor=4, destination_floor=5, request_time=0))
+    assert e.state_version > state_version
+    state_version = e.state_version
+    e.advance(3)
+    assert e.state_version > state_version
+
+
+def test_stops_shared_by_passengers_are_kept_once_per_sweep():
+    e = Elevator(num_floors=10, max_capacity=5)
+    e.current_floor = 5
+    e.direction = Direction.UP
+    e.assign(Passenger(id="1", source_floor=6, destination_floor=8, request_time=0))
+    e.assign(Passenger(id="2", source_floor=6, destination_floor=8, request_time=0))
+    # passenger 3 is picked up on the next upward sweep, which stops on floor 8 again.
+    e.assign(Passenger(id="3", source_floor=3, destination_floor=8, request_time=0))
+    e.assign(Passenger(id="4", source_floor=9, destination_floor=2, request_time=0))
+    e.assign(Passenger(id="5", source_floor=9, destination_floor=2, request_time=0))
+
+    assert sorted(e.targets[-1]) == [6, 8]
+    assert sorted(e.targets[0]) == [3, 8]
+    assert sorted(e.targets[1]) == [-9, -2]
+    for _ in range(3):
+        e.move()
+    assert e.current_floor == 8
+    assert e.has_target_with_direction(8, Direction.UP)
+    assert not e.has_target_with_direction(6, Direction.UP)
+    assert e.copy().targets == e.targets
+
+
+def test_assign_hall_call_pushes_the_same_targets_as_assigning_its_passengers():
+    passengers = [Passenger(destination_floor=d, request_time=0, id=str(i), source_floor=6)
+                  for i, d in enumerate([9, 7, 9, 8])]
+    one_by_one = Elevator(num_floors=10, max_capacity=5)
+    one_by_one.current_floor = 3
+    one_by_one.assign(Passenger(destination_floor=1, request_time=0, id="down", source_floor=3))
+    for p in passengers:
+        one_by_one.assign(p)
+    e = Elevator(num_floors=10, max_capacity=5)
+    e.current_floor = 3
+    e.assign(Passenger(destination_floor=1, request_time=0, id="down", source_floor=3))
+    dispatch_version = e.dispatch_version
+    assert e.assign_hall_call(HallCall(passengers))
+    assert [sorted(t) for t in e.targets] == [sorted(t) for t in one_by_one.targets]
+    assert e.direction == one_by_one.direction
+    # the versions change once per hall call, not once per passenger.
+    assert e.dispatch_version - dispatch_version == 2
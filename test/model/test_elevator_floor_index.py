@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.elevator_floor_index import ElevatorFloorIndex
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ClosestEmptyStrategy, DirectionalStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+class LinearClosestEmptyStrategy(ClosestEmptyStrategy):
+    use_elevator_floor_index = None
+
+
+class LinearDirectionalStrategy(DirectionalStrategy):
+    use_elevator_floor_index = None
+
+
+@pytest.mark.parametrize("strategy_type", [ClosestEmptyStrategy, DirectionalStrategy])
+def test_indexed_strategy_picks_the_same_elevator(strategy_type):
+    rnd = random.Random(1984)
+    n_floors = 12
+    # small capacities and few floors, so that elevators are often full and tied on distance.
+    elevators = [Elevator(num_floors=n_floors, max_capacity=rnd.randint(1, 3)) for _ in range(15)]
+    for e in elevators:
+        e.current_floor = rnd.randint(1, n_floors)
+    index = ElevatorFloorIndex(elevators)
+    strategy = strategy_type()
+    strategy.use_elevator_floor_index(index)
+    linear_strategy = strategy_type()
+    for _ in range(300):
+        for _ in range(rnd.randint(0, 3)):
+            source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+            passenger = Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+            elevator_index = linear_strategy.assign_elevator(passenger, elevators)
+            assert strategy.assign_elevator(passenger, elevators) == elevator_index
+            if elevator_index is not None:
+                elevators[elevator_index].assign(passenger)
+                index.update(elevator_index)
+        for i, e in enumerate(elevators):
+            if e.current_stop_remaining > 0 and e.can_accommodate() and rnd.random() < 0.3:
+                e.passenger_count += 1
+            elif e.passenger_count > 0 and rnd.random() < 0.1:
+                e.passenger_count -= 1
+            e.move()
+            index.update(i)
+    # an index of other elevators is ignored.
+    assert strategy.assign_elevator(passenger, [e.copy() for e in elevators]) == \
+        linear_strategy.assign_elevator(passenger, elevators)
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+@pytest.mark.parametrize("strategy,linear_strategy", [
+    (ClosestEmptyStrategy(), LinearClosestEmptyStrategy()),
+    (DirectionalStrategy(), LinearDirectionalStrategy()),
+])
+def test_controller_runs_the_same_with_an_elevator_floor_index(strategy, linear_strategy, event_driven):
+    np.random.seed(11)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=6, p=0.5, n_steps=150, n_floors=25))
+    stats = []
+    for assignment_strategy in [strategy, linear_strategy]:
+        elevator_system = ElevatorController(
+            n_elevators=8,
+            n_floors=25,
+            max_elevator_capacity=3,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=assignment_strategy,
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(iter(passenger_requests))
+        stats.append((elevator_system.time, elevator_system.get_stats()))
+    assert strategy.elevator_floor_index is not None
+    assert stats[0] == stats[1]
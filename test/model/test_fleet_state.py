@@ -0,0 +1,38 @@
+import random
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.fleet_state import FleetState
+from elevator_system_design.model.passenger import Passenger
+
+
+def test_fleet_state_matches_each_elevator():
+    rnd = random.Random(4412)
+    n_floors = 20
+    elevators = [Elevator(num_floors=n_floors, max_capacity=3, stop_time=rnd.choice([0, 2])) for _ in range(8)]
+    fleet = FleetState()
+    for _ in range(200):
+        for e in elevators:
+            if rnd.random() < 0.2:
+                source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+                e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+            e.move()
+        fleet.update(elevators)
+        assert fleet.headroom.tolist() == [e.max_capacity - e.passenger_count for e in elevators]
+        for target in rnd.sample(range(1, n_floors + 1), 5):
+            for direction in [Direction.UP, Direction.DOWN]:
+                assert fleet.distance_from(target, direction).tolist() == \
+                    [e.distance_from(target, direction) for e in elevators]
+                assert fleet.has_target_with_direction(target, direction).tolist() == \
+                    [e.has_target_with_direction(target, direction) for e in elevators]
+
+
+def test_fleet_state_is_rebuilt_for_other_elevators():
+    fleet = FleetState()
+    fleet.update([Elevator(num_floors=10, max_capacity=1)])
+    elevators = [Elevator(num_floors=10, max_capacity=1) for _ in range(2)]
+    elevators[1].assign(Passenger(id="", source_floor=4, destination_floor=6, request_time=0))
+
+    fleet.update(elevators)
+
+    assert fleet.has_target_with_direction(6, Direction.UP).tolist() == [False, True]
@@ -0,0 +1,61 @@
+from elevator_system_design.model.floor_passenger_index import FloorPassengerIndex
+from elevator_system_design.model.passenger import Passenger
+
+
+def passenger(i: int) -> Passenger:
+    return Passenger(id=f"passenger{i}", source_floor=1, destination_floor=10, request_time=0)
+
+
+def test_only_floors_with_passengers_are_stored():
+    # given
+    index = FloorPassengerIndex()
+
+    # when
+    index.add(0, 5, passenger(1))
+    index.add(0, 5, passenger(2))
+    index.extend(3, 4999, [passenger(3)])
+
+    # then
+    assert len(index) == 3
+    assert index.has_passengers(0, 5)
+    assert index.has_passengers(3, 4999)
+    assert not index.has_passengers(0, 4999)
+    assert not index.has_passengers(3, 5)
+    assert [p.id for p in index.get(0, 5)] == ["passenger1", "passenger2"]
+    assert index.get(1, 5) == ()
+
+
+def test_taking_a_floor_clears_it():
+    # given
+    index = FloorPassengerIndex()
+    index.extend(1, 2, [passenger(1), passenger(2)])
+    index.add(1, 3, passenger(3))
+
+    # when
+    taken = index.take(1, 2)
+
+    # then
+    assert [p.id for p in taken] == ["passenger1", "passenger2"]
+    assert not index.has_passengers(1, 2)
+    assert index.take(1, 2) == ()
+    assert len(index) == 1
+    assert [p.id for p in index] == ["passenger3"]
+
+
+def test_passengers_are_counted_per_elevator():
+    # given
+    index = FloorPassengerIndex()
+    index.extend(1, 2, [passenger(1), passenger(2)])
+    index.add(1, 3, passenger(3))
+    index.add(2, 3, passenger(4))
+
+    # when
+    index.take(1, 2)
+
+    # then
+    assert index.count(1) == 1
+    assert index.count(2) == 1
+    assert index.copy().count(1) == 1
+    index.take(1, 3)
+    assert index.count(1) == 0
+    assert index.count(0) == 0
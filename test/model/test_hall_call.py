@@ -0,0 +1,33 @@
+import pytest
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.hall_call import HallCall
+from elevator_system_design.model.passenger import Passenger
+
+
+def passenger(i: int, source_floor: int = 1, destination_floor: int = 10) -> Passenger:
+    return Passenger(id=f"passenger{i}", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+
+
+def test_hall_call_takes_the_floor_and_direction_of_its_passengers():
+    hall_call = HallCall([passenger(1), passenger(2, destination_floor=4)])
+    assert hall_call.source_floor == 1
+    assert hall_call.direction == Direction.UP
+    assert len(hall_call) == 2
+
+
+def test_hall_call_passengers_must_share_floor_and_direction():
+    with pytest.raises(ValueError):
+        HallCall([])
+    with pytest.raises(ValueError):
+        HallCall([passenger(1), passenger(2, source_floor=2)])
+    with pytest.raises(ValueError):
+        HallCall([passenger(1, source_floor=5), passenger(2, source_floor=5, destination_floor=1)])
+
+
+def test_hall_call_splits_after_its_first_passengers():
+    hall_call = HallCall([passenger(i) for i in range(5)])
+    first, rest = hall_call.split(2)
+    assert [p.id for p in first.passengers] == ["passenger0", "passenger1"]
+    assert [p.id for p in rest.passengers] == ["passenger2", "passenger3", "passenger4"]
+    assert hall_call.split(5) == (hall_call, None)
@@ -0,0 +1,38 @@
+import pickle
+
+import pytest
+from pydantic import ValidationError
+
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.passenger import Passenger, PassengerModel
+
+
+def test_passenger_direction_is_derived_from_the_floors():
+    assert Passenger(id="", source_floor=1, destination_floor=5, request_time=0).direction == Direction.UP
+    assert Passenger(id="", source_floor=5, destination_floor=1, request_time=0).direction == Direction.DOWN
+    assert Passenger(id="", source_floor=1, destination_floor=5, request_time=0).direction_value == Direction.UP.value
+    assert Passenger(id="", source_floor=5, destination_floor=1, request_time=0).direction_value == Direction.DOWN.value
+
+    # replacing a floor derives the direction again.
+    passenger = Passenger(id="", source_floor=1, destination_floor=5, request_time=0)
+    assert passenger._replace(destination_floor=0).direction == Direction.DOWN
+    assert passenger._replace(destination_floor=0).direction_value == Direction.DOWN.value
+
+
+def test_passengers_are_immutable_values():
+    passenger = Passenger(id="passenger1", source_floor=1, destination_floor=5, request_time=3)
+
+    assert passenger == Passenger("passenger1", 1, 5, 3)
+    assert hash(passenger) == hash(Passenger("passenger1", 1, 5, 3))
+    assert passenger != passenger._replace(request_time=4)
+    assert pickle.loads(pickle.dumps(passenger)) == passenger
+    with pytest.raises(AttributeError):
+        passenger.request_time = 4
+
+
+def test_passenger_model_validates_untrusted_requests():
+    passenger = PassengerModel(id="passenger1", source_floor="2", destination_floor="7", request_time="0").to_passenger()
+
+    assert passenger == Passenger(id="passenger1", source_floor=2, destination_floor=7, request_time=0)
+    with pytest.raises(ValidationError):
+        PassengerModel(id="passenger1", source_floor="ground", destination_floor=7, request_time=0)
@@ -0,0 +1,84 @@
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.model.pending_passenger_queue import PendingPassengerQueue
+
+
+def passenger(i: int, request_time: int) -> Passenger:
+    return Passenger(id=f"passenger{i}", source_floor=1, destination_floor=10, request_time=request_time)
+
+
+def test_pending_passengers_are_ordered_by_request_time_then_arrival():
+    # given
+    queue = PendingPassengerQueue()
+
+    # when
+    queue.add(passenger(1, request_time=5))
+    queue.add(passenger(2, request_time=3))
+    queue.add(passenger(3, request_time=5))
+    queue.add(passenger(4, request_time=3))
+    queue.add(passenger(1, request_time=5), refused_at=7)
+
+    # then
+    assert [p.id for p in queue] == ["passenger2", "passenger4", "passenger1", "passenger3"]
+    assert len(queue) == 4
+
+
+def test_removed_passenger_rejoins_at_the_back_of_their_request_time():
+    # given
+    queue = PendingPassengerQueue()
+    for i in range(3):
+        queue.add(passenger(i, request_time=0))
+
+    # when
+    queue.remove(passenger(0, request_time=0))
+    queue.add(passenger(0, request_time=0))
+
+    # then
+    assert [p.id for p in queue] == ["passenger1", "passenger2", "passenger0"]
+    assert passenger(0, request_time=0) in queue
+
+
+def test_only_passengers_refused_at_an_older_dispatch_version_are_retried():
+    # given
+    queue = PendingPassengerQueue()
+
+    # when
+    queue.add(passenger(1, request_time=0), refused_at=3)
+    queue.add(passenger(2, request_time=1), refused_at=4)
+    queue.add(passenger(3, request_time=2))
+
+    # then
+    assert [p.id for p in queue.to_retry(4)] == ["passenger1", "passenger3"]
+    assert [p.id for p in queue.to_retry(5)] == ["passenger1", "passenger2", "passenger3"]
+
+
+class UnexaminableBucket(dict):
+    def values(self):
+        raise AssertionError("the passengers refused at the current dispatch version were examined")
+
+
+def test_no_passenger_is_examined_while_the_dispatch_version_is_unchanged():
+    # given
+    queue = PendingPassengerQueue()
+    for i in range(1000):
+        queue.add(passenger(i, request_time=i), refused_at=5)
+    queue._buckets[5] = UnexaminableBucket(queue._buckets[5])
+
+    # then
+    assert queue.to_retry(5) == []
+
+
+def test_passengers_move_between_refusal_buckets():
+    # given
+    queue = PendingPassengerQueue()
+    queue.add(passenger(1, request_time=0), refused_at=3)
+    queue.add(passenger(2, request_time=1), refused_at=3)
+
+    # when
+    queue.add(passenger(1, request_time=0), refused_at=4)
+    queue.remove(passenger(2, request_time=1))
+
+    # then
+    assert [p.id for p in queue.to_retry(4)] == []
+    assert [p.id for p in queue.to_retry(5)] == ["passenger1"]
+    assert list(queue._buckets) == [4]
+    assert [(p.id, refused_at) for p, refused_at in queue.copy().items()] == [("passenger1", 4)]
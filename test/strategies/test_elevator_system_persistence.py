@@ -18,3 +18,19 @@ def test_csv_elevator_persistence():
     # then
     expected = "time,elevator_1,elevator_2\r\n0,1,1\r\n1,2,1\r\n"
     assert output.getvalue() == expected
+
+
+def test_csv_elevator_persistence_of_skipped_steps():
+    # given
+    elevators = [Elevator(num_floors=10, max_capacity=1), Elevator(num_floors=10, max_capacity=1)]
+    elevators[0].idle_target = 3
+    output = StringIO()
+    strategy = CsvPersistenceStrategy(output)
+
+    # when
+    strategy.persist(0, elevators)
+    strategy.persist_skipped(0, 3, elevators)
+
+    # then
+    expected = "time,elevator_1,elevator_2\r\n0,1,1\r\n1,2,1\r\n2,3,1\r\n3,3,1\r\n"
+    assert output.getvalue() == expected
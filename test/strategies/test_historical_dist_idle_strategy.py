@@ -1,3 +1,8 @@
+import random
+from math import floor
+
+import numpy as np
+
 from elevator_system_design.model.elevator import Elevator
 from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, HistoricalDistributionIdleStrategy
 
@@ -31,3 +36,15 @@ def test_historical_dist_idle_strategy_arbitrary_historical_dist():
 
     assert [3, 6, 7, 9, 13] == [e.idle_target for e in hist_dist_elevators]
 
+
+def test_historical_dist_idle_strategy_matches_numpy_quantiles_of_every_observation():
+    rnd = random.Random(31)
+    for _ in range(200):
+        historical = [rnd.choice([0, 0, 1, 3, rnd.randint(0, 200)]) for _ in range(rnd.randint(1, 20))]
+        historical[rnd.randrange(len(historical))] += 1
+        observations = [i + 1 for i, h in enumerate(historical) for _ in range(h)]
+        strategy = HistoricalDistributionIdleStrategy(historical_counts=historical)
+        for n_idle in [1, 2, 3, 7, 16]:
+            quantiles = (np.arange(n_idle) + 0.5) / n_idle
+            assert strategy.quantile_floors(quantiles).tolist() == \
+                [floor(np.quantile(observations, q)) for q in quantiles]
@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ClosestEmptyStrategy, DirectionalStrategy, \
+    ExistingStopPreferenceStrategy, ExistingStopStrategy, MemoizedAssignmentStrategy, VectorizedExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+@pytest.mark.parametrize("strategy_type", [ClosestEmptyStrategy, DirectionalStrategy, ExistingStopStrategy,
+                                           ExistingStopPreferenceStrategy, VectorizedExistingStopStrategy])
+def test_memoized_strategy_picks_the_same_elevator(strategy_type):
+    rnd = random.Random(77)
+    n_floors = 8
+    elevators = [Elevator(num_floors=n_floors, max_capacity=rnd.randint(1, 2), stop_time=1) for _ in range(5)]
+    strategy = strategy_type()
+    memoized_strategy = MemoizedAssignmentStrategy(strategy_type())
+    for _ in range(300):
+        # bursts of passengers between the same floors, some of whom are only asked about and never assigned.
+        source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+        for _ in range(rnd.randint(0, 4)):
+            passenger = Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+            elevator_index = strategy.assign_elevator(passenger, elevators)
+            assert memoized_strategy.assign_elevator(passenger, elevators) == elevator_index
+            if elevator_index is not None and rnd.random() < 0.5:
+                elevators[elevator_index].assign(passenger)
+        for e in elevators:
+            if rnd.random() < 0.5:
+                e.move()
+    assert memoized_strategy.hits > 0
+    assert memoized_strategy.hit_rate == \
+        pytest.approx(memoized_strategy.hits / (memoized_strategy.hits + memoized_strategy.misses))
+
+
+def test_memoized_strategy_only_scores_changed_elevators_again():
+    elevators = [Elevator(num_floors=10, max_capacity=5) for _ in range(4)]
+    memoized_strategy = MemoizedAssignmentStrategy(DirectionalStrategy())
+    passenger = Passenger(id="", source_floor=5, destination_floor=8, request_time=0)
+    memoized_strategy.assign_elevator(passenger, elevators)
+    assert (memoized_strategy.hits, memoized_strategy.misses) == (0, 4)
+
+    elevators[2].assign(passenger)
+    memoized_strategy.assign_elevator(Passenger(id="", source_floor=5, destination_floor=9, request_time=0), elevators)
+    assert (memoized_strategy.hits, memoized_strategy.misses) == (3, 5)
+    # passengers going the other way are scored separately.
+    memoized_strategy.assign_elevator(Passenger(id="", source_floor=5, destination_floor=1, request_time=0), elevators)
+    assert (memoized_strategy.hits, memoized_strategy.misses) == (3, 9)
+
+
+class IndexedStrategy:
+    elevator_floor_index = None
+
+    def use_elevator_floor_index(self, elevator_floor_index):
+        self.elevator_floor_index = elevator_floor_index
+
+    def assign_elevator(self, passenger, elevators):
+        return 0
+
+
+def test_memoized_strategy_only_hands_the_indexes_to_strategies_it_asks_directly():
+    assert MemoizedAssignmentStrategy(DirectionalStrategy()).use_elevator_floor_index is None
+    assert MemoizedAssignmentStrategy(ExistingStopStrategy()).use_elevator_stop_index is None
+    strategy = IndexedStrategy()
+    memoized_strategy = MemoizedAssignmentStrategy(strategy)
+    assert memoized_strategy.use_elevator_stop_index is None
+    elevator_system = ElevatorController(n_elevators=2, n_floors=10, max_elevator_capacity=5,
+                                         assignment_strategy=memoized_strategy, idle_strategy=EqualSpreadIdleStrategy())
+    assert strategy.elevator_floor_index is elevator_system._elevator_floor_index is not None
+    assert memoized_strategy.assign_elevator(Passenger(id="", source_floor=5, destination_floor=9, request_time=0),
+                                             elevator_system.elevators) == 0
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_controller_runs_the_same_with_a_memoized_strategy(event_driven):
+    np.random.seed(3)
+    # saturated elevators, so that passengers between the same floors are refused and retried together.
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=8, p=0.5, n_steps=150, n_floors=25,
+                                                                                 same_floors_per_step=True))
+    memoized_strategy = MemoizedAssignmentStrategy(DirectionalStrategy())
+    stats = []
+    for assignment_strategy in [DirectionalStrategy(), memoized_strategy]:
+        elevator_system = ElevatorController(
+            n_elevators=3,
+            n_floors=25,
+            max_elevator_capacity=2,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=assignment_strategy,
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(iter(passenger_requests))
+        stats.append((elevator_system.time, elevator_system.get_stats()))
+    assert memoized_strategy.hit_rate > 0.25
+    assert stats[0] == stats[1]
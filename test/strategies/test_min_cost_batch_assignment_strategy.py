@@ -0,0 +1,100 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import MinCostBatchStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+def best_assignment(passengers, elevators):
+    # the number of passengers assigned and their total distance, for the best of all the possible assignments.
+    best = (0, 0)
+    for assignment in itertools.product([None] + list(range(len(elevators))), repeat=len(passengers)):
+        if any(assignment.count(i) > e.max_capacity - e.passenger_count for i, e in enumerate(elevators)):
+            continue
+        n_assigned = sum(i is not None for i in assignment)
+        distance = sum(elevators[i].distance_from(p.source_floor, p.direction)
+                       for p, i in zip(passengers, assignment) if i is not None)
+        if (n_assigned, -distance) > (best[0], -best[1]):
+            best = (n_assigned, distance)
+    return best
+
+
+def test_batch_assignment_has_the_smallest_total_distance():
+    rnd = random.Random(777)
+    n_floors = 12
+    for _ in range(60):
+        elevators = [Elevator(num_floors=n_floors, max_capacity=rnd.randint(1, 3), stop_time=rnd.choice([0, 2]))
+                     for _ in range(3)]
+        for e in elevators:
+            e.current_floor = rnd.randint(1, n_floors)
+            for _ in range(rnd.randint(0, 2)):
+                source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+                e.assign(Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0))
+            for _ in range(rnd.randint(0, 4)):
+                e.move()
+        # a few source floors, so that passengers share their costs.
+        passengers = [Passenger(id=str(i), source_floor=rnd.choice([1, 5, 9]), destination_floor=rnd.choice([3, 11]),
+                                request_time=0) for i in range(rnd.randint(1, 5))]
+
+        assignment = MinCostBatchStrategy().assign_batch(passengers, elevators)
+
+        for i, e in enumerate(elevators):
+            assert assignment.count(i) <= e.max_capacity - e.passenger_count
+        n_assigned = sum(i is not None for i in assignment)
+        distance = sum(elevators[i].distance_from(p.source_floor, p.direction)
+                       for p, i in zip(passengers, assignment) if i is not None)
+        assert (n_assigned, distance) == best_assignment(passengers, elevators)
+
+
+def test_burst_of_lobby_calls_fills_the_elevators_and_leaves_the_last_arrivals_waiting():
+    elevators = [Elevator(num_floors=20, max_capacity=10) for _ in range(3)]
+    for e, floor in zip(elevators, [1, 2, 3]):
+        e.current_floor = floor
+    passengers = [Passenger(id=str(i), source_floor=1, destination_floor=15, request_time=0) for i in range(35)]
+
+    assignment = MinCostBatchStrategy().assign_batch(passengers, elevators)
+
+    assert [assignment.count(i) for i in range(3)] == [10, 10, 10]
+    # the passengers who arrived first get an elevator, starting with the closest one.
+    assert assignment[:10] == [0] * 10
+    assert assignment[30:] == [None] * 5
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_controller_assigns_each_batch_together(event_driven):
+    class CountingMinCostBatchStrategy(MinCostBatchStrategy):
+        def __init__(self):
+            super().__init__()
+            self.batch_sizes = []
+
+        def assign_batch(self, passengers, elevators):
+            self.batch_sizes.append(len(passengers))
+            return super().assign_batch(passengers, elevators)
+
+    np.random.seed(11)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=8, p=0.5, n_steps=100, n_floors=20))
+    assignment_strategy = CountingMinCostBatchStrategy()
+    elevator_system = ElevatorController(
+        n_elevators=4,
+        n_floors=20,
+        max_elevator_capacity=3,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=1,
+        event_driven=event_driven
+    )
+
+    elevator_system.handle_passenger_requests(iter(passenger_requests))
+
+    summary = elevator_system.total_time_summary
+    assert summary.n + summary.no_action_passengers == sum(len(batch) for batch in passenger_requests)
+    assert max(assignment_strategy.batch_sizes) > 1
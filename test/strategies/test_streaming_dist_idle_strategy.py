@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.strategies.idle import StreamingDistributionIdleStrategy
+
+
+def request(source_floor: int, request_time: int) -> Passenger:
+    return Passenger("passenger", source_floor=source_floor, destination_floor=source_floor % 10 + 1,
+                     request_time=request_time)
+
+
+def test_streaming_dist_idle_strategy_assign_all_to_same_floor_if_only_one_floor_requested():
+    elevators = [Elevator(num_floors=10, max_capacity=10) for _ in range(5)]
+    strategy = StreamingDistributionIdleStrategy(n_floors=10, half_life=10)
+    for t in range(200):
+        strategy.observe_request(request(5, t))
+    strategy.position_idle_elevators(elevators)
+
+    assert [5 for _ in elevators] == [e.idle_target for e in elevators]
+
+
+def test_streaming_dist_idle_strategy_matches_quantiles_of_prior_counts():
+    historical = [2, 5, 3, 5, 7, 8, 20, 12, 4, 5, 7, 3, 12]
+    elevators = [Elevator(num_floors=len(historical), max_capacity=10) for _ in range(5)]
+    strategy = StreamingDistributionIdleStrategy(n_floors=len(historical), prior_counts=historical)
+    strategy.position_idle_elevators(elevators)
+
+    assert [3, 6, 7, 9, 13] == [e.idle_target for e in elevators]
+
+
+def test_streaming_dist_idle_strategy_forgets_old_requests():
+    elevators = [Elevator(num_floors=10, max_capacity=10) for _ in range(4)]
+    strategy = StreamingDistributionIdleStrategy(n_floors=10, half_life=50)
+    for t in range(500):
+        strategy.observe_request(request(2, t))
+    strategy.position_idle_elevators(elevators)
+    assert [e.idle_target for e in elevators] == [2, 2, 2, 2]
+
+    for t in range(500, 1000):
+        strategy.observe_request(request(9, t))
+    strategy.position_idle_elevators(elevators)
+    assert [e.idle_target for e in elevators] == [9, 9, 9, 9]
+
+
+def test_streaming_dist_idle_strategy_keeps_weights_finite_over_long_runs():
+    strategy = StreamingDistributionIdleStrategy(n_floors=10, half_life=1)
+    for t in range(0, 5000, 7):
+        strategy.observe_request(request(t % 10 + 1, t))
+
+    assert np.isfinite(strategy.floor_weights).all()
+    assert strategy.quantile_floors(np.array([0.5])).tolist() == [9]
+
+
+def test_streaming_dist_idle_strategy_only_recomputes_targets_once_drifted():
+    elevators = [Elevator(num_floors=20, max_capacity=10) for _ in range(4)]
+    strategy = StreamingDistributionIdleStrategy(n_floors=20, half_life=10 ** 9, drift_threshold=0.1)
+    rng = np.random.default_rng(0)
+    drifted = 0
+    for t, source_floor in enumerate(rng.integers(1, 21, size=10_000).tolist()):
+        drifted += strategy.observe_request(request(source_floor, t))
+        strategy.position_idle_elevators(elevators)
+
+    # the targets are computed once up front, then once each time the distribution drifted.
+    assert strategy.recomputations == drifted + 1
+    assert strategy.recomputations < 100
+
+
+def test_streaming_dist_idle_strategy_keeps_targets_under_steady_traffic():
+    elevators = [Elevator(num_floors=20, max_capacity=10) for _ in range(4)]
+    strategy = StreamingDistributionIdleStrategy(n_floors=20, half_life=1000, drift_threshold=0.1)
+    rng = np.random.default_rng(1)
+    # a steady lobby-heavy pattern, which the prior of one request per floor drifts towards at first.
+    source_floors = np.where(rng.random(20_000) < 0.5, 1, rng.integers(2, 21, size=20_000)).tolist()
+    for t, source_floor in enumerate(source_floors):
+        strategy.observe_request(request(source_floor, t))
+        strategy.position_idle_elevators(elevators)
+        if t == 2_000:
+            settled = strategy.recomputations
+
+    # the drift is checked every few hundred requests, but the targets aren't computed again.
+    assert strategy.recomputations == settled
+    assert [e.idle_target for e in elevators][:2] == [1, 1]
+
+
+def test_streaming_dist_idle_strategy_rejects_floors_outside_the_building():
+    strategy = StreamingDistributionIdleStrategy(n_floors=10)
+    for source_floor in [0, 11]:
+        with pytest.raises(ValueError):
+            strategy.observe_request(request(source_floor, 0))
+    assert strategy.floor_weights.tolist() == [1.0] * 10
@@ -0,0 +1,40 @@
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.strategies.idle import HistoricalDistributionIdleStrategy, TimeOfDayIdleStrategy
+
+morning = [20, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+lunch = [10, 1, 1, 1, 1, 10, 1, 1, 1, 1]
+evening = [1, 1, 1, 1, 1, 1, 5, 8, 8, 8]
+
+
+def test_time_of_day_idle_strategy_matches_historical_dist_of_each_window():
+    strategy = TimeOfDayIdleStrategy(historical_counts_by_window=[morning, lunch, evening], window_length=100,
+                                     n_elevators=5)
+    for window, counts in enumerate([morning, lunch, evening]):
+        strategy.set_time(window * 100)
+        for n_idle in range(1, 6):
+            time_of_day_elevators = [Elevator(num_floors=10, max_capacity=10) for _ in range(n_idle)]
+            strategy.position_idle_elevators(time_of_day_elevators)
+
+            hist_dist_elevators = [Elevator(num_floors=10, max_capacity=10) for _ in range(n_idle)]
+            HistoricalDistributionIdleStrategy(historical_counts=counts).position_idle_elevators(hist_dist_elevators)
+
+            assert [e.idle_target for e in time_of_day_elevators] == [e.idle_target for e in hist_dist_elevators]
+
+
+def test_time_of_day_idle_strategy_cycles_through_the_windows():
+    strategy = TimeOfDayIdleStrategy(historical_counts_by_window=[morning, lunch, evening], window_length=100,
+                                     n_elevators=2)
+    changes = [t for t in range(700) if strategy.set_time(t)]
+
+    assert changes == [100, 200, 300, 400, 500, 600]
+    assert strategy.window_at(650) == strategy.window_at(50) == 0
+
+
+def test_time_of_day_idle_strategy_steps_until_change_stop_at_the_window_boundary():
+    strategy = TimeOfDayIdleStrategy(historical_counts_by_window=[morning, lunch], window_length=100, n_elevators=2)
+    strategy.set_time(130)
+
+    assert strategy.steps_until_change(131) == 69
+    assert strategy.steps_until_change(199) == 1
+    assert strategy.steps_until_change(200) == 0
+    assert strategy.targets[1][2] == [1, 6]
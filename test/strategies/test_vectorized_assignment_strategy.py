@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy, \
+    VectorizedDirectionalStrategy, VectorizedExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+@pytest.mark.parametrize("strategy,vectorized_strategy", [
+    (DirectionalStrategy(), VectorizedDirectionalStrategy()),
+    (ExistingStopStrategy(), VectorizedExistingStopStrategy()),
+])
+def test_vectorized_strategy_picks_the_same_elevator(strategy, vectorized_strategy):
+    rnd = random.Random(90210)
+    n_floors = 15
+    # small capacities and few floors, so that elevators are often full and tied on distance.
+    elevators = [Elevator(num_floors=n_floors, max_capacity=rnd.randint(1, 3), stop_time=1) for _ in range(12)]
+    for _ in range(300):
+        for _ in range(rnd.randint(0, 3)):
+            source_floor, destination_floor = rnd.sample(range(1, n_floors + 1), 2)
+            passenger = Passenger(id="", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+            elevator_index = strategy.assign_elevator(passenger, elevators)
+            assert vectorized_strategy.assign_elevator(passenger, elevators) == elevator_index
+            if elevator_index is not None:
+                elevators[elevator_index].assign(passenger)
+        for e in elevators:
+            if e.current_stop_remaining > 0 and e.can_accommodate() and rnd.random() < 0.3:
+                e.passenger_count += 1
+                e.dispatch_version += 1
+            elif e.passenger_count > 0 and rnd.random() < 0.1:
+                e.passenger_count -= 1
+                e.dispatch_version += 1
+            e.move()
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+@pytest.mark.parametrize("strategy,vectorized_strategy", [
+    (DirectionalStrategy(), VectorizedDirectionalStrategy()),
+    (ExistingStopStrategy(), VectorizedExistingStopStrategy()),
+])
+def test_controller_runs_the_same_with_a_vectorized_strategy(strategy, vectorized_strategy, event_driven):
+    np.random.seed(5)
+    passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=6, p=0.5, n_steps=150, n_floors=25))
+    stats = []
+    for assignment_strategy in [strategy, vectorized_strategy]:
+        elevator_system = ElevatorController(
+            n_elevators=6,
+            n_floors=25,
+            max_elevator_capacity=4,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=assignment_strategy,
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(iter(passenger_requests))
+        stats.append((elevator_system.time, elevator_system.get_stats()))
+    assert stats[0] == stats[1]
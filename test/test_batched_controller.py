@@ -0,0 +1,85 @@
+from io import StringIO
+
+import numpy as np
+
+from elevator_system_design.batched_controller import BatchedElevatorController
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import csv_passenger_provider, \
+    random_uniform_floor_selection_passenger_provider
+
+input_str = """time,id,source,dest
+0,passenger1,1,51
+0,passenger2,1,37
+10,passendar3,20,1"""
+
+
+def test_batched_controller_delivers_reference_scenario_in_every_building():
+    n_buildings = 3
+    elevator_system = BatchedElevatorController(
+        n_buildings=n_buildings,
+        n_elevators=3,
+        n_floors=51,
+        max_elevator_capacity=5,
+        stop_time=0
+    )
+    elevator_system.handle_passenger_requests([csv_passenger_provider(StringIO(input_str)) for _ in range(n_buildings)])
+
+    expected_stats = {'total_time': {'max': 57,
+                                     'mean': 41.0,
+                                     'min': 23,
+                                     'n_passengers': 3,
+                                     'no_action_passengers': 0},
+                      'wait_time': {'max': 7,
+                                    'mean': 6.0,
+                                    'min': 4,
+                                    'n_passengers': 3,
+                                    'no_action_passengers': 0}}
+    assert elevator_system.get_stats() == [expected_stats] * n_buildings
+
+
+def test_batched_controller_delivers_every_passenger_of_every_building():
+    np.random.seed(42)
+    n_floors = [2, 10, 30, 60]
+    providers = [list(random_uniform_floor_selection_passenger_provider(n=4, p=0.3, n_steps=100, n_floors=f))
+                 for f in n_floors]
+    providers[0].append([Passenger("no_action", source_floor=2, destination_floor=2, request_time=100)])
+    elevator_system = BatchedElevatorController(
+        n_buildings=4,
+        n_elevators=[1, 2, 3, 4],
+        n_floors=n_floors,
+        max_elevator_capacity=[1, 2, 5, 5],
+        stop_time=[0, 1, 2, 0]
+    )
+    elevator_system.handle_passenger_requests([iter(batches) for batches in providers])
+
+    for building, summary in enumerate(elevator_system.total_time_summaries()):
+        n_passengers = sum(len(batch) for batch in providers[building])
+        assert summary.n + summary.no_action_passengers == n_passengers
+    assert elevator_system.total_time_summaries()[0].no_action_passengers == 1
+    assert (elevator_system.passenger_count == 0).all()
+    assert not elevator_system.stops.any()
+
+
+def test_batched_controller_respects_elevator_capacity():
+    passengers = [[Passenger("passenger1", source_floor=1, destination_floor=3, request_time=0),
+                   Passenger("passenger2", source_floor=1, destination_floor=3, request_time=0)]]
+    elevator_system = BatchedElevatorController(n_buildings=1, n_elevators=1, n_floors=3, max_elevator_capacity=1)
+    elevator_system.handle_passenger_requests([iter(passengers)])
+
+    wait_time = elevator_system.wait_time_summaries()[0]
+    assert wait_time.n == 2
+    assert wait_time.min_value < wait_time.max_value
+
+
+def test_batched_controller_grows_and_compacts_its_passenger_slots():
+    np.random.seed(7)
+    # more passengers than the initial slots, with lists as sources like any `ElevatorController` source.
+    providers = [list(random_uniform_floor_selection_passenger_provider(n=10, p=0.5, n_steps=300, n_floors=20))
+                 for _ in range(2)]
+    elevator_system = BatchedElevatorController(n_buildings=2, n_elevators=4, n_floors=20, max_elevator_capacity=8)
+    elevator_system.handle_passenger_requests(providers)
+
+    for building, summary in enumerate(elevator_system.total_time_summaries()):
+        assert summary.n + summary.no_action_passengers == sum(len(batch) for batch in providers[building])
+    assert sum(len(batch) for batches in providers for batch in batches) > 1024
+    assert elevator_system._n_slots == elevator_system._n_live == 0
@@ -0,0 +1,157 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.elevator import Elevator
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ExistingStopStrategy, MemoizedAssignmentStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, StreamingDistributionIdleStrategy
+
+
+class Crash(Exception):
+    pass
+
+
+class RecordingPersistenceStrategy:
+    def __init__(self, crash_at: int = -1):
+        self.crash_at = crash_at
+        self.locations = {}
+
+    def persist(self, t: int, elevators: List[Elevator]):
+        if t == self.crash_at:
+            raise Crash()
+        self.locations[t] = [e.current_floor for e in elevators]
+
+
+def controller(persistence_strategy: RecordingPersistenceStrategy, event_driven: bool,
+               learning: bool = False) -> ElevatorController:
+    return ElevatorController(
+        n_elevators=3,
+        n_floors=25,
+        max_elevator_capacity=3,
+        assignment_strategy=MemoizedAssignmentStrategy(ExistingStopStrategy()) if learning else ExistingStopStrategy(),
+        idle_strategy=StreamingDistributionIdleStrategy(n_floors=25, half_life=50, drift_threshold=0.2) if learning
+        else EqualSpreadIdleStrategy(),
+        stop_time=1,
+        persistence_strategy=persistence_strategy,
+        event_driven=event_driven
+    )
+
+
+def passenger_provider():
+    np.random.seed(2024)
+    return random_uniform_floor_selection_passenger_provider(n=3, p=0.08, n_steps=400, n_floors=25)
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+@pytest.mark.parametrize("crash_at", [150, 405])
+def test_run_resumed_from_a_checkpoint_matches_an_uninterrupted_run(tmp_path, event_driven, crash_at):
+    # given
+    path = str(tmp_path / "run.ckpt")
+    reference = RecordingPersistenceStrategy()
+    reference_system = controller(reference, event_driven)
+    reference_system.handle_passenger_requests(passenger_provider())
+    crashing_system = controller(RecordingPersistenceStrategy(crash_at=crash_at), event_driven)
+    with pytest.raises(Crash):
+        crashing_system.handle_passenger_requests(passenger_provider(), checkpoint_path=path, checkpoint_interval=0)
+
+    # when
+    np.random.seed(0)
+    resumed = RecordingPersistenceStrategy()
+    resumed_system = controller(resumed, event_driven)
+    resumed_system.restore(path)
+    resumed_system.handle_passenger_requests(passenger_provider())
+
+    # then
+    # the event-driven run only checkpoints between quiet stretches, so it may resume a few steps before the crash.
+    resumed_at = min(resumed.locations)
+    assert crash_at - 10 < resumed_at <= crash_at
+    assert resumed.locations == {t: floors for t, floors in reference.locations.items() if t >= resumed_at}
+    assert resumed_system.time == reference_system.time
+    assert resumed_system.get_stats() == reference_system.get_stats()
+    assert resumed_system.metrics() == reference_system.metrics()
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_run_resumed_from_a_checkpoint_keeps_the_state_of_the_strategies(tmp_path, event_driven):
+    # given
+    path = str(tmp_path / "run.ckpt")
+    reference = RecordingPersistenceStrategy()
+    reference_system = controller(reference, event_driven, learning=True)
+    reference_system.handle_passenger_requests(passenger_provider())
+    crashing_system = controller(RecordingPersistenceStrategy(crash_at=250), event_driven, learning=True)
+    with pytest.raises(Crash):
+        crashing_system.handle_passenger_requests(passenger_provider(), checkpoint_path=path, checkpoint_interval=0)
+
+    # when
+    resumed = RecordingPersistenceStrategy()
+    resumed_system = controller(resumed, event_driven, learning=True)
+    resumed_system.restore(path)
+    resumed_system.handle_passenger_requests(passenger_provider())
+
+    # then
+    resumed_at = min(resumed.locations)
+    assert resumed.locations == {t: floors for t, floors in reference.locations.items() if t >= resumed_at}
+    assert resumed_system.get_stats() == reference_system.get_stats()
+    assert resumed_system.idle_strategy.recomputations == reference_system.idle_strategy.recomputations
+    assert resumed_system.idle_strategy.floor_weights.tolist() == reference_system.idle_strategy.floor_weights.tolist()
+    assert resumed_system.assignment_strategy.hits == reference_system.assignment_strategy.hits
+    assert resumed_system.assignment_strategy.misses == reference_system.assignment_strategy.misses
+
+
+class SkippableSource:
+    def __init__(self, batches):
+        self.batches = iter(batches)
+        self.skipped = 0
+
+    def __iter__(self):
+        return self.batches
+
+    def skip_batches(self, n_batches: int):
+        self.skipped += n_batches
+        for _ in range(n_batches):
+            next(self.batches)
+
+
+def test_restored_run_skips_the_handled_batches_with_the_source_hook(tmp_path):
+    # given
+    path = str(tmp_path / "run.ckpt")
+    system = controller(RecordingPersistenceStrategy(crash_at=100), event_driven=False)
+    with pytest.raises(Crash):
+        system.handle_passenger_requests(passenger_provider(), checkpoint_path=path, checkpoint_interval=0)
+
+    # when
+    restored_system = controller(RecordingPersistenceStrategy(), event_driven=False)
+    restored_system.restore(path)
+    source = SkippableSource(list(passenger_provider()))
+    restored_system.handle_passenger_requests(source)
+
+    # then
+    assert source.skipped == 99
+    assert restored_system.acknowledged_passengers == sum(len(batch) for batch in passenger_provider())
+
+
+def test_checkpoint_of_a_restored_simulation_is_identical(tmp_path):
+    # given
+    system = controller(RecordingPersistenceStrategy(crash_at=100), event_driven=False)
+    with pytest.raises(Crash):
+        system.handle_passenger_requests(passenger_provider())
+    system.checkpoint(str(tmp_path / "first.ckpt"))
+
+    # when
+    restored_system = controller(RecordingPersistenceStrategy(), event_driven=False)
+    restored_system.restore(str(tmp_path / "first.ckpt"))
+    restored_system.checkpoint(str(tmp_path / "second.ckpt"))
+
+    # then
+    assert (tmp_path / "first.ckpt").read_bytes() == (tmp_path / "second.ckpt").read_bytes()
+    assert restored_system.metrics() == system.metrics()
+
+
+def test_restore_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a.ckpt"
+    path.write_bytes(b"time,elevator_1\n")
+    with pytest.raises(ValueError):
+        controller(RecordingPersistenceStrategy(), event_driven=False).restore(str(path))
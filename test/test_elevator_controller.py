@@ -1,10 +1,19 @@
+import warnings
 from io import StringIO
 
+import numpy as np
+import pytest
+
 from elevator_system_design.elevator_controller import ElevatorController
-from elevator_system_design.passenger_providers import csv_passenger_provider
-from elevator_system_design.strategies.assignment import DirectionalStrategy
-from elevator_system_design.strategies.elevator_controller_persistence import CsvPersistenceStrategy
-from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+from elevator_system_design.model.direction import Direction
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import csv_passenger_provider, \
+    random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import ClosestEmptyStrategy, DirectionalStrategy, ExistingStopStrategy
+from elevator_system_design.strategies.elevator_controller_persistence import CsvPersistenceStrategy, \
+    NoopPersistenceStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, StreamingDistributionIdleStrategy, \
+    TimeOfDayIdleStrategy
 
 input_str = """time,id,source,dest
 0,passenger1,1,51
@@ -105,3 +114,525 @@ def test_full_system1():
                                     'no_action_passengers': 0}}
     assert csv_output.getvalue().replace("\r", "") == expected_csv_output
     assert elevator_system.get_stats() == expected_stats
+
+
+def test_empty_elevator_on_passenger_floor_picks_them_up_instead_of_livelocking():
+    # one of these passengers is assigned to an empty, idle car already standing on their floor. Without taking the
+    # passenger's direction the car refused to embark them at every step and they were reassigned to it forever.
+    requests = {0: [(15, 8), (4, 7)], 1: [(8, 12)], 7: [(10, 6), (4, 3)]}
+    elevator_system = ElevatorController(
+        n_elevators=3,
+        n_floors=20,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    for time in range(1000):
+        for i, (source_floor, destination_floor) in enumerate(requests.get(time, [])):
+            elevator_system.request_elevator(Passenger(id=f"passenger{time}_{i}", source_floor=source_floor,
+                                                       destination_floor=destination_floor, request_time=time))
+        elevator_system.step()
+        if elevator_system.total_time_summary.n == 5:
+            break
+    assert elevator_system.total_time_summary.n == 5
+    assert not elevator_system.pending_passengers
+
+
+def test_progress_log_of_long_run():
+    # the progress line is logged every 1000 steps while the last passengers are delivered.
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=1100,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    elevator_system.handle_passenger_requests(iter([[Passenger(id="passenger1", source_floor=1, destination_floor=1100,
+                                                               request_time=0)]]))
+    assert elevator_system.time > 1000
+    assert elevator_system.total_time_summary.n == 1
+
+
+def test_elevator_passing_through_does_not_livelock():
+    # passengers were sent back to pending whenever their car passed their floor going the other way, and could then be
+    # reassigned to cars that kept arriving in the wrong direction, so this workload was never delivered.
+    requests = {0: [(28, 15)], 4: [(53, 2), (55, 33), (58, 24)], 6: [(4, 35), (7, 60)], 15: [(13, 58)]}
+    elevator_system = ElevatorController(
+        n_elevators=3,
+        n_floors=60,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    for time in range(1000):
+        for i, (source_floor, destination_floor) in enumerate(requests.get(time, [])):
+            elevator_system.request_elevator(Passenger(id=f"passenger{time}_{i}", source_floor=source_floor,
+                                                       destination_floor=destination_floor, request_time=time))
+        elevator_system.step()
+        if elevator_system.total_time_summary.n == 7:
+            break
+    assert elevator_system.total_time_summary.n == 7
+    assert not elevator_system.pending_passengers
+
+
+def test_full_system1_event_driven():
+    reader_strategy = csv_passenger_provider(StringIO(input_str))
+
+    csv_output = StringIO()
+    elevator_system = ElevatorController(
+        n_elevators=3,
+        n_floors=51,
+        max_elevator_capacity=5,
+        persistence_strategy=CsvPersistenceStrategy(f=csv_output),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0,
+        event_driven=True
+    )
+    elevator_system.handle_passenger_requests(reader_strategy)
+
+    # skipping quiet steps still records the location of every elevator at every step.
+    assert csv_output.getvalue().replace("\r", "") == expected_csv_output
+    assert elevator_system.get_stats()['total_time']['mean'] == 41.0
+    assert elevator_system.get_stats()['wait_time']['mean'] == 6.0
+
+
+def test_event_driven_matches_step_by_step_simulation():
+    stats = []
+    for event_driven in [False, True]:
+        np.random.seed(1231235)
+        passenger_provider = random_uniform_floor_selection_passenger_provider(n=2, p=0.02, n_steps=2000, n_floors=30)
+        elevator_system = ElevatorController(
+            n_elevators=4,
+            n_floors=30,
+            max_elevator_capacity=5,
+            assignment_strategy=ExistingStopStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=2,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(passenger_provider)
+        stats.append((elevator_system.time, elevator_system.get_stats()))
+
+    assert stats[0] == stats[1]
+
+
+def test_event_driven_only_runs_full_steps_where_elevators_stop():
+    stats = []
+    for event_driven in [False, True]:
+        elevator_system = ElevatorController(
+            n_elevators=1,
+            n_floors=51,
+            max_elevator_capacity=5,
+            assignment_strategy=DirectionalStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=5,
+            event_driven=event_driven
+        )
+        full_steps = []
+        step = elevator_system.step
+        elevator_system.step = lambda: (full_steps.append(elevator_system.time), step())
+        elevator_system.handle_passenger_requests(iter([
+            [Passenger("passenger1", source_floor=10, destination_floor=40, request_time=0)],
+            [Passenger("passenger2", source_floor=20, destination_floor=45, request_time=1)],
+        ]))
+        stats.append((elevator_system.time, elevator_system.get_stats()))
+
+    assert stats[0] == stats[1]
+    # the elevator's travel is predicted again at the end of each stop, which doesn't take a full step.
+    assert full_steps == [0, 1, 6, 16, 31, 56, 66]
+
+
+def test_elevator_passing_through_keeps_waiting_passenger():
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=10,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    going_down = Passenger("passenger2", source_floor=7, destination_floor=2, request_time=0)
+    elevator_system.request_elevator(Passenger("passenger1", source_floor=6, destination_floor=9, request_time=0))
+    elevator_system.request_elevator(going_down)
+    for _ in range(3):
+        elevator_system.step()
+
+    # the elevator went past floor 7 on its way up, and picks passenger2 up on its way back down.
+    assert elevator_system.elevators[0].current_floor == 8
+    assert elevator_system.waiting_passengers.get(0, 7) == (going_down,)
+    assert len(elevator_system.pending_passengers) == 0
+    for _ in range(4):
+        elevator_system.step()
+    assert elevator_system.wait_time_summary.max_value == 6
+
+
+class RefuseAllStrategy:
+    calls: int = 0
+
+    def assign_elevator(self, passenger, elevators):
+        self.calls += 1
+        return None
+
+
+def test_pending_passengers_are_only_retried_when_an_elevator_changes():
+    assignment_strategy = RefuseAllStrategy()
+    elevator_system = ElevatorController(
+        n_elevators=2,
+        n_floors=10,
+        max_elevator_capacity=5,
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    for i in range(3):
+        elevator_system.request_elevator(Passenger(f"passenger{i}", source_floor=1, destination_floor=5, request_time=0))
+    for _ in range(10):
+        elevator_system.step()
+    assert assignment_strategy.calls == 3
+    assert len(elevator_system.pending_passengers) == 3
+
+    elevator_system.elevators[0].assign(Passenger("other", source_floor=9, destination_floor=10, request_time=0))
+    elevator_system.step()
+    assert assignment_strategy.calls == 6
+
+
+class MetricsCheckingPersistenceStrategy:
+    elevator_system: ElevatorController
+    checks: int = 0
+
+    def persist(self, time, elevators):
+        elevator_system = self.elevator_system
+        assert elevator_system.metrics() == {
+            "time": time,
+            "waiting_passengers": len(list(elevator_system.waiting_passengers)),
+            "embarked_passengers": len(list(elevator_system.embarked_passengers)),
+            "pending_passengers": len(list(elevator_system.pending_passengers)),
+            "delivered_passengers": elevator_system.total_time_summary.n,
+            "no_action_passengers": elevator_system.total_time_summary.no_action_passengers,
+            "idle_elevators": len([e for e in elevators if e.is_idle()]),
+        }
+        self.checks += 1
+
+
+def test_metrics_match_a_recount_at_every_step():
+    for event_driven in [False, True]:
+        np.random.seed(42)
+        passenger_provider = random_uniform_floor_selection_passenger_provider(n=3, p=0.05, n_steps=500, n_floors=20)
+        persistence_strategy = MetricsCheckingPersistenceStrategy()
+        elevator_system = ElevatorController(
+            n_elevators=3,
+            n_floors=20,
+            max_elevator_capacity=2,
+            persistence_strategy=persistence_strategy,
+            assignment_strategy=DirectionalStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1,
+            event_driven=event_driven
+        )
+        persistence_strategy.elevator_system = elevator_system
+        elevator_system.handle_passenger_requests(passenger_provider)
+
+        assert persistence_strategy.checks > 500
+        metrics = elevator_system.metrics()
+        assert metrics["waiting_passengers"] == metrics["embarked_passengers"] == metrics["pending_passengers"] == 0
+
+
+class CountingClosestEmptyStrategy(ClosestEmptyStrategy):
+    calls: int = 0
+
+    def assign_elevator(self, passenger, elevators):
+        self.calls += 1
+        return super().assign_elevator(passenger, elevators)
+
+
+def test_hall_calls_are_assigned_once_per_elevator_load():
+    assignment_strategy = CountingClosestEmptyStrategy()
+    elevator_system = ElevatorController(
+        n_elevators=4,
+        n_floors=10,
+        max_elevator_capacity=5,
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        coalesce_hall_calls=True
+    )
+    lobby_burst = [Passenger(f"passenger{i}", source_floor=1, destination_floor=2 + i % 8, request_time=0)
+                   for i in range(12)]
+    elevator_system.request_elevators(lobby_burst + [Passenger("down", source_floor=9, destination_floor=1,
+                                                               request_time=0)])
+    assert assignment_strategy.calls == 4
+    assigned = [len(elevator_system.waiting_passengers.get(i, 1)) for i in range(4)]
+    assert sorted(assigned) == [0, 2, 5, 5]
+    assert len(elevator_system.pending_passengers) == 0
+
+
+class CountingFirstElevatorStrategy(ClosestEmptyStrategy):
+    calls: int = 0
+
+    def assign_elevator(self, passenger, elevators):
+        self.calls += 1
+        return 0
+
+
+def test_hall_calls_only_fill_the_room_left_by_passengers_already_assigned():
+    assignment_strategy = CountingFirstElevatorStrategy()
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=10,
+        max_elevator_capacity=5,
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        coalesce_hall_calls=True
+    )
+    elevator_system.request_elevator(Passenger("upstairs", source_floor=5, destination_floor=8, request_time=0))
+    elevator = elevator_system.elevators[0]
+    dispatch_version = elevator.dispatch_version
+    lobby_burst = [Passenger(f"passenger{i}", source_floor=1, destination_floor=2 + i % 3, request_time=0)
+                   for i in range(6)]
+    elevator_system.request_elevators(lobby_burst)
+    # the hall call is assigned at once, to the room left by the passenger waiting upstairs, and the strategy is asked
+    # again for the passengers left over.
+    assert assignment_strategy.calls == 3
+    assert elevator.dispatch_version == dispatch_version + 2
+    assert [p.id for p in elevator_system.waiting_passengers.get(0, 1)] == [f"passenger{i}" for i in range(4)]
+    assert sorted(p.id for p in elevator_system.pending_passengers) == ["passenger4", "passenger5"]
+
+
+def test_hall_calls_for_an_elevator_without_room_go_pending():
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=10,
+        max_elevator_capacity=2,
+        assignment_strategy=CountingFirstElevatorStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        coalesce_hall_calls=True
+    )
+    elevator_system.request_elevators([Passenger(f"upstairs{i}", source_floor=5, destination_floor=8, request_time=0)
+                                       for i in range(2)])
+    elevator_system.request_elevators([Passenger(f"lobby{i}", source_floor=3, destination_floor=9, request_time=0)
+                                       for i in range(3)])
+    assert elevator_system.waiting_passengers.get(0, 3) == ()
+    assert sorted(p.id for p in elevator_system.pending_passengers) == ["lobby0", "lobby1", "lobby2"]
+
+
+def test_coalesced_hall_calls_deliver_every_passenger():
+    for event_driven in [False, True]:
+        np.random.seed(7)
+        # bursts of up to 12 passengers for elevators taking 3, so that hall calls spill over at boarding.
+        passenger_provider = random_uniform_floor_selection_passenger_provider(n=12, p=0.5, n_steps=200, n_floors=20,
+                                                                               same_floors_per_step=True)
+        persistence_strategy = MetricsCheckingPersistenceStrategy()
+        elevator_system = ElevatorController(
+            n_elevators=4,
+            n_floors=20,
+            max_elevator_capacity=3,
+            persistence_strategy=persistence_strategy,
+            assignment_strategy=ExistingStopStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1,
+            event_driven=event_driven,
+            coalesce_hall_calls=True
+        )
+        persistence_strategy.elevator_system = elevator_system
+        elevator_system.handle_passenger_requests(passenger_provider)
+
+        metrics = elevator_system.metrics()
+        assert metrics["waiting_passengers"] == metrics["embarked_passengers"] == metrics["pending_passengers"] == 0
+        assert metrics["delivered_passengers"] + metrics["no_action_passengers"] == elevator_system.acknowledged_passengers
+
+
+class CountingEqualSpreadIdleStrategy(EqualSpreadIdleStrategy):
+    calls: int = 0
+
+    def position_idle_elevators(self, elevators):
+        self.calls += 1
+        super().position_idle_elevators(elevators)
+
+
+class EveryStepEqualSpreadIdleStrategy(CountingEqualSpreadIdleStrategy):
+    position_on_idle_change = False
+
+
+def test_idle_elevators_are_only_positioned_when_the_idle_set_changes():
+    for event_driven in [False, True]:
+        results = []
+        for idle_strategy in [CountingEqualSpreadIdleStrategy(), EveryStepEqualSpreadIdleStrategy()]:
+            np.random.seed(1231235)
+            passenger_provider = random_uniform_floor_selection_passenger_provider(n=2, p=0.05, n_steps=1000,
+                                                                                   n_floors=30)
+            elevator_system = ElevatorController(
+                n_elevators=4,
+                n_floors=30,
+                max_elevator_capacity=5,
+                assignment_strategy=ExistingStopStrategy(),
+                idle_strategy=idle_strategy,
+                stop_time=2,
+                event_driven=event_driven
+            )
+            elevator_system.handle_passenger_requests(passenger_provider)
+            results.append((elevator_system.time, elevator_system.get_stats(),
+                            [(e.current_floor, e.idle_target) for e in elevator_system.elevators], idle_strategy.calls))
+
+        assert results[0][:3] == results[1][:3]
+        assert results[0][3] < results[1][3] / 2
+
+
+class CountingStreamingDistributionIdleStrategy(StreamingDistributionIdleStrategy):
+    observed: int = 0
+
+    def observe_request(self, passenger):
+        self.observed += 1
+        return super().observe_request(passenger)
+
+
+def test_streaming_idle_strategy_observes_every_arriving_passenger_once():
+    results = []
+    for event_driven in [False, True]:
+        np.random.seed(99)
+        # more passengers than the elevators can take at once, so that some are retried from the pending list.
+        passenger_provider = random_uniform_floor_selection_passenger_provider(n=6, p=0.1, n_steps=1000, n_floors=20)
+        idle_strategy = CountingStreamingDistributionIdleStrategy(n_floors=20, half_life=100)
+        elevator_system = ElevatorController(
+            n_elevators=3,
+            n_floors=20,
+            max_elevator_capacity=4,
+            assignment_strategy=ClosestEmptyStrategy(),
+            idle_strategy=idle_strategy,
+            stop_time=1,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(passenger_provider)
+
+        no_action_passengers = elevator_system.total_time_summary.no_action_passengers
+        assert idle_strategy.observed == elevator_system.acknowledged_passengers - no_action_passengers
+        results.append((elevator_system.time, elevator_system.get_stats(),
+                        [e.idle_target for e in elevator_system.elevators]))
+
+    assert results[0] == results[1]
+
+
+def test_time_of_day_idle_strategy_moves_idle_elevators_between_windows():
+    results = []
+    for event_driven in [False, True]:
+        np.random.seed(5)
+        passenger_provider = random_uniform_floor_selection_passenger_provider(n=1, p=0.01, n_steps=1000, n_floors=20)
+        # the lobby in the morning, the top floors in the evening.
+        idle_strategy = TimeOfDayIdleStrategy(historical_counts_by_window=[[50] + [1] * 19, [1] * 15 + [20] * 5],
+                                              window_length=150, n_elevators=4)
+        elevator_system = ElevatorController(
+            n_elevators=4,
+            n_floors=20,
+            max_elevator_capacity=5,
+            assignment_strategy=ExistingStopStrategy(),
+            idle_strategy=idle_strategy,
+            stop_time=2,
+            event_driven=event_driven
+        )
+        elevator_system.handle_passenger_requests(passenger_provider)
+        # runs on with every elevator idle, into the next window.
+        elevator_system.handle_passenger_requests(iter([[]] * 200))
+        assert [e.idle_target for e in elevator_system.elevators] == \
+            idle_strategy.targets[idle_strategy.window_at(elevator_system.time - 1)][4]
+        results.append((elevator_system.time, elevator_system.get_stats(),
+                        [(e.current_floor, e.idle_target) for e in elevator_system.elevators]))
+
+    assert results[0] == results[1]
+
+
+def test_stepping_with_request_passenger_batch_matches_handle_passenger_requests():
+    results = []
+    for drive_manually in [False, True]:
+        np.random.seed(17)
+        passenger_requests = list(random_uniform_floor_selection_passenger_provider(n=3, p=0.2, n_steps=300,
+                                                                                    n_floors=20))
+        elevator_system = ElevatorController(
+            n_elevators=3,
+            n_floors=20,
+            max_elevator_capacity=5,
+            assignment_strategy=ExistingStopStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=1
+        )
+        if drive_manually:
+            for passenger_batch in passenger_requests:
+                elevator_system.request_passenger_batch(passenger_batch)
+                elevator_system.step()
+        else:
+            elevator_system.handle_passenger_requests(iter(passenger_requests), until=300)
+        results.append((elevator_system.time, elevator_system.acknowledged_passengers, elevator_system.metrics()))
+
+    assert results[0] == results[1]
+
+
+def test_elevator_passing_through_returns_passenger_it_wont_come_back_for_to_pending():
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=10,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    elevator_system.request_elevator(Passenger("passenger1", source_floor=5, destination_floor=9, request_time=0))
+    elevator_system.step()
+    # a passenger waiting on floor 6 for the elevator, which has no stop for them on its way back down.
+    stranded = Passenger("passenger2", source_floor=6, destination_floor=2, request_time=1)
+    elevator_system.waiting_passengers.add(0, 6, stranded)
+    elevator_system.step()
+
+    assert elevator_system.elevators[0].current_floor == 7
+    assert len(elevator_system.waiting_passengers.get(0, 6)) == 0
+    for _ in range(20):
+        elevator_system.step()
+    assert elevator_system.total_time_summary.n == 2
+
+
+def test_empty_elevator_heading_the_other_way_delivers_passenger_on_its_floor():
+    for event_driven in [False, True]:
+        elevator_system = ElevatorController(
+            n_elevators=1,
+            n_floors=10,
+            max_elevator_capacity=5,
+            persistence_strategy=NoopPersistenceStrategy(),
+            assignment_strategy=ClosestEmptyStrategy(),
+            idle_strategy=EqualSpreadIdleStrategy(),
+            stop_time=0,
+            event_driven=event_driven
+        )
+        # the elevator has just dropped off its last passenger on its way up, and turns around on the passenger's floor.
+        elevator_system.elevators[0].direction = Direction.UP
+        elevator_system.handle_passenger_requests(iter([[Passenger("passenger1", source_floor=5, destination_floor=2,
+                                                                   request_time=0)]]))
+
+        assert elevator_system.total_time_summary.n == 1
+        assert len(elevator_system.pending_passengers) == 0
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_passenger_on_their_destination_floor_is_counted_as_no_action(event_driven):
+    elevator_system = ElevatorController(
+        n_elevators=1,
+        n_floors=10,
+        max_elevator_capacity=5,
+        persistence_strategy=NoopPersistenceStrategy(),
+        assignment_strategy=DirectionalStrategy(),
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0,
+        event_driven=event_driven
+    )
+    with warnings.catch_warnings():
+        # the passenger is logged without deprecated logging calls.
+        warnings.simplefilter("error")
+        elevator_system.handle_passenger_requests(iter([[Passenger("passenger1", source_floor=4, destination_floor=4,
+                                                                   request_time=0)]]))
+    assert elevator_system.all_delivered()
+    assert elevator_system.total_time_summary.no_action_passengers == 1
+    assert elevator_system.wait_time_summary.no_action_passengers == 1
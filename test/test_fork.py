@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, MiddleFloorIdleStrategy
+
+
+def controller(assignment_strategy, idle_strategy, event_driven: bool = False) -> ElevatorController:
+    return ElevatorController(
+        n_elevators=3,
+        n_floors=20,
+        max_elevator_capacity=4,
+        assignment_strategy=assignment_strategy,
+        idle_strategy=idle_strategy,
+        stop_time=1,
+        event_driven=event_driven
+    )
+
+
+def passenger_provider():
+    np.random.seed(7)
+    return random_uniform_floor_selection_passenger_provider(n=3, p=0.1, n_steps=300, n_floors=20)
+
+
+def summary(elevator_system: ElevatorController):
+    return elevator_system.time, elevator_system.get_stats(), elevator_system.metrics()
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_forks_continue_like_uninterrupted_runs(event_driven):
+    # given
+    expected = []
+    for idle_strategy in [EqualSpreadIdleStrategy(), MiddleFloorIdleStrategy()]:
+        elevator_system = controller(ExistingStopStrategy(), EqualSpreadIdleStrategy(), event_driven)
+        passenger_requests = passenger_provider()
+        elevator_system.handle_passenger_requests(passenger_requests, until=100)
+        elevator_system.idle_strategy = idle_strategy
+        elevator_system.handle_passenger_requests(passenger_requests)
+        expected.append(summary(elevator_system))
+
+    # when
+    warm_system = controller(ExistingStopStrategy(), EqualSpreadIdleStrategy(), event_driven)
+    passenger_requests = passenger_provider()
+    warm_system.handle_passenger_requests(passenger_requests, until=100)
+    warm_state = summary(warm_system)
+    first_requests, second_requests = itertools.tee(passenger_requests)
+    first = warm_system.fork()
+    second = warm_system.fork(idle_strategy=MiddleFloorIdleStrategy())
+    second.handle_passenger_requests(second_requests)
+    first.handle_passenger_requests(first_requests)
+
+    # then
+    assert warm_state[0] == 100
+    assert summary(warm_system) == warm_state
+    assert [summary(first), summary(second)] == expected
+
+
+def test_forked_processes_branch_from_the_same_state():
+    # given
+    elevator_system = controller(ExistingStopStrategy(), EqualSpreadIdleStrategy())
+    passenger_requests = passenger_provider()
+    elevator_system.handle_passenger_requests(passenger_requests, until=100)
+
+    def branch(assignment_strategy):
+        def run(forked_system: ElevatorController):
+            forked_system.assignment_strategy = assignment_strategy
+            forked_system.handle_passenger_requests(passenger_requests)
+            return summary(forked_system)
+        return run
+
+    # when
+    results = elevator_system.fork_processes([branch(ExistingStopStrategy()), branch(DirectionalStrategy())])
+
+    # then
+    assert elevator_system.time == 100
+    expected = []
+    for assignment_strategy in [ExistingStopStrategy(), DirectionalStrategy()]:
+        forked_system = elevator_system.fork(assignment_strategy=assignment_strategy)
+        # each child process continued the generator from the same state, which a new generator replays here.
+        branch_requests = passenger_provider()
+        next(itertools.islice(branch_requests, 100, 100), None)
+        forked_system.handle_passenger_requests(branch_requests)
+        expected.append(summary(forked_system))
+    assert results == expected
+    assert results[0] != results[1]
@@ -1,6 +1,7 @@
 from io import StringIO
 
 import numpy as np
+import pytest
 
 from elevator_system_design.model.passenger import Passenger
 from elevator_system_design.passenger_providers import csv_passenger_provider, random_normal_floor_selection_passenger_provider, \
@@ -66,3 +67,48 @@ def test_random_normal_floor_passenger_provider():
     assert destination_mean_floor - 1 <= np.mean(dests) <= destination_mean_floor + 1
     assert destination_std - 1 <= np.std(dests) <= destination_std + 1
 
+
+def test_random_uniform_floor_passenger_provider_draws_every_passenger_independently():
+    np.random.seed(42)
+    n_floors = 5
+    provider = random_uniform_floor_selection_passenger_provider(10, 0.5, 3000, n_floors, block_size=64)
+    passengers = []
+    for time_step, ps in enumerate(provider):
+        assert all(p.request_time == time_step for p in ps)
+        passengers.extend(ps)
+    assert [p.id for p in passengers] == [f"passenger{i}" for i in range(len(passengers))]
+    assert all(p.source_floor != p.destination_floor for p in passengers)
+    assert len(set((p.source_floor, p.destination_floor) for p in passengers)) == n_floors * (n_floors - 1)
+    # every pair of distinct floors is equally likely.
+    pair_counts = np.bincount([(p.source_floor - 1) * n_floors + p.destination_floor - 1 for p in passengers])
+    pair_counts = pair_counts[pair_counts > 0]
+    assert pair_counts.min() > 0.8 * len(passengers) / len(pair_counts)
+
+
+def test_random_uniform_floor_passenger_provider_can_share_floors_within_a_step():
+    np.random.seed(42)
+    provider = random_uniform_floor_selection_passenger_provider(10, 0.5, 500, 30, same_floors_per_step=True)
+    for ps in provider:
+        assert len(set((p.source_floor, p.destination_floor) for p in ps)) <= 1
+
+
+def test_random_normal_floor_passenger_provider_rejects_impossible_destinations():
+    # every source and destination floor would be the middle floor.
+    with pytest.raises(ValueError):
+        random_normal_floor_selection_passenger_provider(n=5, p=0.5, n_steps=10, n_floors=8)
+
+
+def test_random_uniform_floor_passenger_provider_rejects_single_floor_buildings():
+    with pytest.raises(ValueError):
+        random_uniform_floor_selection_passenger_provider(n=5, p=0.5, n_steps=10, n_floors=1)
+
+
+@pytest.mark.parametrize("block_size", [7, 4096])
+def test_random_passenger_provider_skips_batches_without_changing_the_next_ones(block_size):
+    np.random.seed(42)
+    batches = list(random_uniform_floor_selection_passenger_provider(4, 0.5, 50, 20, block_size=block_size))
+    for n_skipped in [0, 6, 7, 20, 50]:
+        np.random.seed(42)
+        provider = random_uniform_floor_selection_passenger_provider(4, 0.5, 50, 20, block_size=block_size)
+        provider.skip_batches(n_skipped)
+        assert list(provider) == batches[n_skipped:]
@@ -0,0 +1,74 @@
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+from elevator_system_design.elevator_controller import ElevatorController
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.realtime import RealTimeElevatorController
+from elevator_system_design.strategies.assignment import DirectionalStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy
+
+
+async def queue_passenger_provider(queue: "asyncio.Queue[Optional[List[Passenger]]]") -> AsyncIterator[List[Passenger]]:
+    # a stand-in for a live source of hall calls: batches are put on the queue until None ends the source.
+    while True:
+        passenger_batch = await queue.get()
+        if passenger_batch is None:
+            return
+        yield passenger_batch
+
+
+def passenger(i: int, source_floor: int, destination_floor: int) -> Passenger:
+    return Passenger(id=f"passenger{i}", source_floor=source_floor, destination_floor=destination_floor, request_time=0)
+
+
+class RecordingDirectionalStrategy(DirectionalStrategy):
+    def __init__(self):
+        self.request_times = {}
+
+    def assign_elevator(self, passenger, elevators):
+        self.request_times[passenger.id] = passenger.request_time
+        return super().assign_elevator(passenger, elevators)
+
+
+def test_real_time_controller_coalesces_arrivals_within_a_tick():
+    assignment_strategy = RecordingDirectionalStrategy()
+    elevator_system = ElevatorController(
+        n_elevators=2,
+        n_floors=10,
+        max_elevator_capacity=5,
+        assignment_strategy=assignment_strategy,
+        idle_strategy=EqualSpreadIdleStrategy(),
+        stop_time=0
+    )
+    real_time_system = RealTimeElevatorController(elevator_system, tick=0.005)
+    heartbeats = 0
+
+    async def heartbeat():
+        nonlocal heartbeats
+        while True:
+            heartbeats += 1
+            await asyncio.sleep(0)
+
+    async def main():
+        queue = asyncio.Queue()
+        # both batches are waiting when the first tick starts, so they are requested in the same time-step.
+        queue.put_nowait([passenger(1, 1, 5)])
+        queue.put_nowait([passenger(2, 8, 2), passenger(3, 4, 4)])
+        heartbeat_task = asyncio.create_task(heartbeat())
+        run = asyncio.create_task(real_time_system.handle_passenger_requests(queue_passenger_provider(queue)))
+        await asyncio.sleep(0.05)
+        queue.put_nowait([passenger(4, 9, 1)])
+        queue.put_nowait(None)
+        await asyncio.wait_for(run, timeout=5)
+        heartbeat_task.cancel()
+
+    asyncio.run(main())
+
+    assert elevator_system.acknowledged_passengers == 4
+    assert elevator_system.total_time_summary.n == 3
+    assert elevator_system.total_time_summary.no_action_passengers == 1
+    assert assignment_strategy.request_times["passenger1"] == assignment_strategy.request_times["passenger2"] == 0
+    assert assignment_strategy.request_times["passenger4"] > 0
+    assert len(real_time_system.tick_latencies) == elevator_system.time
+    assert all(latency >= 0 for latency in real_time_system.tick_latencies)
+    assert heartbeats > elevator_system.time
@@ -0,0 +1,72 @@
+from functools import partial
+from typing import Any, Dict, Iterator, List
+
+from elevator_system_design.model.passenger import Passenger
+from elevator_system_design.passenger_providers import random_uniform_floor_selection_passenger_provider
+from elevator_system_design.strategies.assignment import DirectionalStrategy, ExistingStopStrategy
+from elevator_system_design.strategies.idle import EqualSpreadIdleStrategy, MiddleFloorIdleStrategy, \
+    StreamingDistributionIdleStrategy
+from elevator_system_design.sweep import expand_parameter_grid, sweep
+
+
+def uniform_passenger_provider(configuration: Dict[str, Any], n_steps: int) -> Iterator[List[Passenger]]:
+    return random_uniform_floor_selection_passenger_provider(
+        n=3, p=0.2, n_steps=n_steps, n_floors=configuration["n_floors"])
+
+
+parameter_grid = {
+    "n_elevators": [1, 3],
+    "n_floors": [20],
+    "max_elevator_capacity": [5],
+    "stop_time": [0, 1],
+    "assignment_strategy": [DirectionalStrategy(), ExistingStopStrategy()],
+    "idle_strategy": [EqualSpreadIdleStrategy(), MiddleFloorIdleStrategy()],
+}
+
+
+def test_expand_parameter_grid():
+    configurations = expand_parameter_grid({"n_elevators": [1, 2], "stop_time": [0, 1, 2]})
+    assert len(configurations) == 6
+    assert configurations[0] == {"n_elevators": 1, "stop_time": 0}
+    assert configurations[-1] == {"n_elevators": 2, "stop_time": 2}
+
+
+def test_sweep_results_do_not_depend_on_scheduling():
+    provider_factory = partial(uniform_passenger_provider, n_steps=50)
+    in_process = sweep(parameter_grid, provider_factory, base_seed=7, max_workers=1, record_traces=True)
+    in_pool = sweep(parameter_grid, provider_factory, base_seed=7, max_workers=3, record_traces=True)
+
+    assert len(in_process) == 16
+    assert in_process == in_pool
+    assert in_process[0]["assignment_strategy"] == "DirectionalStrategy"
+    assert in_process[0]["trace"].startswith("time,elevator_1\r\n0,")
+    assert all(row["total_time_n_passengers"] > 0 for row in in_process)
+    assert sweep(parameter_grid, provider_factory, base_seed=8, max_workers=1)[0]["seed"] != in_process[0]["seed"]
+
+
+def test_sweep_seeds_only_depend_on_the_workload():
+    provider_factory = partial(uniform_passenger_provider, n_steps=20)
+    rows = sweep(parameter_grid, provider_factory, base_seed=7, max_workers=1, replicates=2)
+
+    assert len(rows) == 32
+    # every configuration faces the same passengers in a replicate, whatever its strategies.
+    assert len({row["seed"] for row in rows if row["replicate"] == 0}) == 1
+    assert len({row["seed"] for row in rows}) == 2
+    assert len({row["total_time_n_passengers"] for row in rows if row["replicate"] == 0}) == 1
+    # adding a value to the grid doesn't change the seeds of the other configurations.
+    wider_rows = sweep({**parameter_grid, "n_floors": [20, 30], "stop_time": [0]}, provider_factory, base_seed=7,
+                       max_workers=1)
+    assert {row["seed"] for row in wider_rows if row["n_floors"] == 20} == {rows[0]["seed"]}
+    assert {row["seed"] for row in wider_rows if row["n_floors"] == 30} != {rows[0]["seed"]}
+
+
+def test_sweep_describes_strategy_parameters():
+    grid = {**parameter_grid, "n_elevators": [1], "stop_time": [0], "assignment_strategy": [DirectionalStrategy()],
+            "idle_strategy": [StreamingDistributionIdleStrategy(20, half_life=10),
+                              StreamingDistributionIdleStrategy(20, half_life=20)]}
+    rows = sweep(grid, partial(uniform_passenger_provider, n_steps=20), max_workers=1)
+
+    assert rows[0]["assignment_strategy"] == "DirectionalStrategy"
+    assert rows[0]["idle_strategy"].startswith("StreamingDistributionIdleStrategy(")
+    assert "half_life=10" in rows[0]["idle_strategy"]
+    assert "half_life=20" in rows[1]["idle_strategy"]